@@ -0,0 +1,85 @@
+# batch.py
+
+import numpy as np
+from model import compile_model
+
+def _fill_grid(recorded, rows, states, pointer, limit):
+    # Zapíše stav states[i] do bodů mřížky pointer[i] .. limit[i] - 1 řádku rows[i]
+    counts = limit - pointer
+    total = counts.sum()
+    if total == 0:
+        return
+    repeated = np.repeat(np.arange(len(rows)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    recorded[rows[repeated], pointer[repeated] + offsets] = states[repeated]
+
+def batch_simulation(substances, reactions, t_max, n_trajectories=100, grid=None, rng=None):
+    """
+    Simuluje dávku nezávislých trajektorií Gillespieho přímou metodou
+    v jednom procesu, všechny trajektorie najednou.
+
+    Stav dávky je matice (trajektorie, látky) a v každém kroku se pro
+    všechny dosud běžící trajektorie najednou vypočítají propence, vylosují
+    časy (exponenciální rozdělení) a vyberou reakce podle kumulativních
+    propencí. Trajektorie, které dosáhly t_max nebo v nichž už žádná reakce
+    nemůže proběhnout, se z dalších kroků vyřadí. Režie interpretu se tak
+    rozloží na celou dávku.
+
+    Výsledky se zaznamenávají na časové mřížce. Objekty Substance se nemění.
+
+    Parameters:
+    - substances: dict {název: Substance}
+    - reactions: seznam reakcí
+    - t_max: maximální čas simulace
+    - n_trajectories: počet trajektorií v dávce
+    - grid: časová mřížka záznamu (výchozí 200 bodů od 0 do t_max)
+    - rng: numpy.random.Generator nebo seed (volitelné)
+
+    Returns:
+    - grid, history; history je dict {název: pole tvaru (trajektorie, časy)}
+    """
+    model = compile_model(substances, reactions)
+    rng = np.random.default_rng(rng)
+    if grid is None:
+        grid = np.linspace(0, t_max, 200)
+    grid = np.asarray(grid, dtype=float)
+    width = model.change_species.shape[1]
+    last_channel = model.n_channels - 1
+
+    state = np.tile(model.initial_state(), (n_trajectories, 1))
+    time = np.zeros(n_trajectories)
+    next_point = np.zeros(n_trajectories, dtype=np.int64)
+    active = np.ones(n_trajectories, dtype=bool)
+    recorded = np.empty((n_trajectories, len(grid), model.n_species), dtype=np.int64)
+
+    while active.any():
+        rows = np.flatnonzero(active)
+        current = state[rows]
+        cumulative = np.cumsum(model.propensities(current), axis=1)
+        total = cumulative[:, -1]
+
+        # Časy příštích reakcí (při nulové propenci nekonečno)
+        uniforms = rng.random((len(rows), 2))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            new_time = time[rows] - np.log1p(-uniforms[:, 0]) / total
+
+        # Body mřížky před příští reakcí mají dosavadní stav,
+        # u končících trajektorií všechny zbývající body
+        alive = new_time < t_max
+        limit = np.where(alive, np.searchsorted(grid, new_time, side='left'), len(grid))
+        _fill_grid(recorded, rows, current, next_point[rows], limit)
+        next_point[rows] = limit
+
+        # Výběr reakce: počet kumulativních propencí pod náhodnou hodnotou
+        channel = (cumulative <= (uniforms[:, 1] * total)[:, None]).sum(axis=1)
+        channel = np.minimum(channel, last_channel)
+
+        # Změny stavu z řídkých polí kanálů (np.add.at kvůli doplněným prvkům)
+        fired = channel[alive]
+        np.add.at(state, (np.repeat(rows[alive], width), model.change_species[fired].ravel()),
+                  model.change_deltas[fired].ravel())
+        time[rows] = new_time
+        active[rows[~alive]] = False
+
+    history = {name: recorded[:, :, i] for i, name in enumerate(model.names)}
+    return grid, history
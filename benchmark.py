@@ -0,0 +1,204 @@
+# benchmark.py
+
+import argparse
+import hashlib
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+from substance import Substance
+from reaction import (
+    UnimolecularReaction, BimolecularReaction, ReversibleReaction,
+    CatalyticReaction, MichaelisMentenReaction, AutocatalyticReaction
+)
+from simulation import simulate
+from recording import FinalStateRecorder
+
+# Příklady ze složky examples/ (látky, reakce, doba simulace)
+
+def unimolecular_network():
+    s = {'A': Substance('A', 100), 'B': Substance('B', 0)}
+    return s, [UnimolecularReaction({s['A']: 1}, {s['B']: 1}, 0.1)], 100
+
+def reversible_network():
+    s = {'A': Substance('A', 100), 'B': Substance('B', 0)}
+    return s, [ReversibleReaction({s['A']: 1}, {s['B']: 1}, 0.05, 0.02)], 100
+
+def michaelis_menten_network():
+    s = {'S': Substance('S', 100), 'P': Substance('P', 0), 'E': Substance('E', 10)}
+    return s, [MichaelisMentenReaction(s['S'], s['P'], s['E'], 1.0, 10)], 200
+
+def autocatalytic_network():
+    s = {'A': Substance('A', 50), 'B': Substance('B', 10)}
+    return s, [AutocatalyticReaction({s['A']: 1, s['B']: 1}, {s['B']: 2}, 0.02)], 100
+
+def catalytic_network():
+    s = {'A': Substance('A', 100), 'B': Substance('B', 0), 'E': Substance('E', 10)}
+    return s, [CatalyticReaction({s['A']: 1}, {s['B']: 1}, s['E'], 0.1)], 100
+
+def side_network():
+    s = {'A': Substance('A', 100), 'B': Substance('B', 0), 'D': Substance('D', 0)}
+    reactions = [
+        UnimolecularReaction({s['A']: 1}, {s['B']: 1}, 0.1),
+        UnimolecularReaction({s['A']: 1}, {s['D']: 1}, 0.03),
+    ]
+    return s, reactions, 100
+
+def sequential_network():
+    s = {'A': Substance('A', 100), 'B': Substance('B', 50), 'C': Substance('C', 0)}
+    reactions = [
+        UnimolecularReaction({s['A']: 1}, {s['B']: 1}, 0.1),
+        UnimolecularReaction({s['B']: 1}, {s['C']: 1}, 0.05),
+    ]
+    return s, reactions, 100
+
+def synthetic_network(n_species, n_reactions, amount, t_max, seed=0, rate_decades=2):
+    """
+    Vytvoří náhodnou síť unimolekulárních přeměn X_i → X_j a bimolekulárních
+    reakcí X_i + X_j → X_k + X_l. Všechny reakce zachovávají počet molekul,
+    takže simulace nediverguje. Rychlostní konstanty jsou log-rovnoměrné
+    v rozsahu rate_decades řádů a škálované tak, aby propence byly
+    srovnatelné pro zadané množství.
+
+    Returns:
+    - substances, reactions, t_max
+    """
+    rng = np.random.default_rng(seed)
+    s = {f"X{i}": Substance(f"X{i}", amount) for i in range(n_species)}
+    names = list(s)
+    reactions = []
+    for _ in range(n_reactions):
+        rate = 10 ** rng.uniform(-rate_decades, 0)
+        if rng.random() < 0.5:
+            i, j = rng.choice(n_species, 2, replace=False)
+            reactions.append(UnimolecularReaction({s[names[i]]: 1}, {s[names[j]]: 1}, rate))
+        else:
+            i, j, k, l = rng.choice(n_species, 4, replace=False)
+            reactions.append(BimolecularReaction({s[names[i]]: 1, s[names[j]]: 1},
+                                                 {s[names[k]]: 1, s[names[l]]: 1}, rate / amount))
+    return s, reactions, t_max
+
+NETWORKS = {
+    'unimolecular': unimolecular_network,
+    'reversible': reversible_network,
+    'michaelis_menten': michaelis_menten_network,
+    'autocatalytic': autocatalytic_network,
+    'catalytic': catalytic_network,
+    'side': side_network,
+    'sequential': sequential_network,
+    'synthetic_small': lambda: synthetic_network(10, 20, 1000, 1),
+    'synthetic_wide': lambda: synthetic_network(100, 500, 1000, 0.05),
+    'synthetic_abundant': lambda: synthetic_network(20, 40, 10 ** 6, 0.01),
+}
+
+# Velké sítě se spouštějí jen na vyžádání (--networks synthetic_large),
+# se všemi metodami a měřením paměti běží desítky minut
+LARGE_NETWORKS = {
+    'synthetic_large': lambda: synthetic_network(1000, 10000, 1000, 0.005, rate_decades=6),
+}
+
+ENGINES = ['gillespie', 'next_reaction', 'sum_tree', 'composition_rejection', 'compiled', 'generated', 'tau_leaping', 'slow_scale', 'hybrid', 'ode']
+
+class CountingRecorder(FinalStateRecorder):
+    # Ukládá jen koncový stav a počítá reakce (kroky)
+    def start(self, names, time, state):
+        super().start(names, time, state)
+        self.events = 0
+
+    def record(self, time, state):
+        self.events += 1
+
+def _run(network, engine, seed):
+    substances, reactions, t_max = {**NETWORKS, **LARGE_NETWORKS}[network]()
+    if engine == 'ode':
+        times, history = simulate(substances, reactions, t_max, method='ode')
+        return times, history, None
+    recorder = CountingRecorder()
+    times, history = simulate(substances, reactions, t_max, method=engine,
+                              rng=np.random.default_rng(seed), recorder=recorder)
+    return times, history, recorder.events
+
+def _checksum(times, history):
+    # Otisk koncového stavu, stejný seed a kód dávají stejný otisk
+    digest = hashlib.sha256()
+    digest.update(np.float64(times[-1]).tobytes())
+    for name in sorted(history):
+        digest.update(name.encode())
+        digest.update(np.asarray(history[name][-1:], dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16]
+
+def run_case(network, engine, seed=0, measure_memory=True):
+    """
+    Změří jeden běh simulace.
+
+    Returns:
+    - dict s názvem sítě a metody, časem, počtem reakcí, reakcemi za sekundu,
+      špičkou paměti (bajty, měřeno tracemalloc v samostatném běhu)
+      a otiskem výsledku
+    """
+    start = time.perf_counter()
+    times, history, events = _run(network, engine, seed)
+    wall_time = time.perf_counter() - start
+
+    peak_memory = None
+    if measure_memory:
+        tracemalloc.start()
+        _run(network, engine, seed)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'network': network,
+        'engine': engine,
+        'seed': seed,
+        'wall_time': wall_time,
+        'events': events,
+        'events_per_second': events / wall_time if events is not None and wall_time > 0 else None,
+        'peak_memory': peak_memory,
+        'final_time': float(times[-1]),
+        'checksum': _checksum(times, history),
+    }
+
+def _environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Výkonnostní testy simulačních metod.")
+    parser.add_argument('--networks', nargs='+', default=list(NETWORKS), choices=list(NETWORKS) + list(LARGE_NETWORKS),
+                        help="sítě (výchozí všechny kromě velkých: " + ', '.join(LARGE_NETWORKS) + ")")
+    parser.add_argument('--engines', nargs='+', default=ENGINES, choices=ENGINES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help="počet opakování každého běhu")
+    parser.add_argument('--no-memory', action='store_true', help="neměřit špičku paměti")
+    parser.add_argument('--output', help="soubor pro výsledky (JSON Lines), výchozí stdout")
+    args = parser.parse_args(argv)
+
+    environment = _environment()
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for network in args.networks:
+            for engine in args.engines:
+                for repeat in range(args.repeat):
+                    result = run_case(network, engine, args.seed, not args.no_memory)
+                    result.update(environment, repeat=repeat)
+                    output.write(json.dumps(result) + '\n')
+                    output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+# checkpoint.py
+
+import json
+import os
+import time as _time
+
+class Checkpoint:
+    def __init__(self, path=None, interval=60.0, deferred=False):
+        """
+        Kontrolní bod simulace: čas, množství látek, stav generátoru náhodných
+        čísel a vnitřní stav simulační metody (např. časy příštích reakcí
+        v metodě příští reakce).
+
+        Předává se simulační metodě parametrem checkpoint. Prázdný kontrolní
+        bod metoda průběžně naplňuje (při každé vrácené části záznamu a na
+        konci simulace). Naplněný kontrolní bod metoda na začátku obnoví
+        a pokračuje od uloženého času do nového t_max, simulaci tak lze
+        prodloužit bez opakování od času 0:
+
+            checkpoint = Checkpoint()
+            simulate(substances, reactions, 100, checkpoint=checkpoint)
+            simulate(substances, reactions, 200, checkpoint=checkpoint)
+
+        Je-li zadána cesta, kontrolní bod se ukládá do souboru nejvýše jednou
+        za interval sekund a vždy na konci simulace. Po pádu programu se
+        načte funkcí load_checkpoint a simulace pokračuje od posledního uložení.
+
+        V odloženém režimu (deferred) metoda zachycuje stav jen při vrácení
+        části záznamu a do souboru ho uloží až odběratel výstupu metodou
+        commit poté, co tuto část uložil (viz trajectory_file.write_stream).
+        Kontrolní bod v souboru tak nikdy nepředběhne zapsaný průběh.
+
+        Parameters:
+        - path: soubor pro ukládání (JSON), výchozí jen v paměti
+        - interval: nejkratší doba mezi uloženími do souboru (s)
+        - deferred: ukládat do souboru až voláním commit
+        """
+        self.path = path
+        self.interval = interval
+        self.deferred = deferred
+        self._pending = False
+        self.method = None
+        self.time = None
+        self.amounts = None
+        self.random_state = None
+        self.engine = None
+        self._saved = _time.monotonic()
+
+    @property
+    def started(self):
+        """
+        True, pokud kontrolní bod obsahuje uložený stav simulace.
+        """
+        return self.time is not None
+
+    def due(self):
+        """
+        True, pokud je čas uložit kontrolní bod do souboru. V odloženém
+        režimu vždy False, stav se zachycuje jen při vrácení části záznamu.
+        """
+        return not self.deferred and self._interval_elapsed()
+
+    def _interval_elapsed(self):
+        return self.path is not None and _time.monotonic() - self._saved >= self.interval
+
+    def capture(self, method, time, names, state, uniforms, engine=None, final=False):
+        """
+        Uloží aktuální stav simulace. Volá simulační metoda.
+
+        Parameters:
+        - method: název simulační metody
+        - time: čas simulace
+        - names, state: názvy látek a jejich množství
+        - uniforms: zásobník náhodných čísel (viz random_buffer.UniformBuffer)
+        - engine: vnitřní stav metody (hodnoty serializovatelné do JSON)
+        - final: konec simulace, do souboru se uloží vždy
+        """
+        self.method = method
+        self.time = float(time)
+        self.amounts = {name: int(amount) for name, amount in zip(names, state)}
+        self.random_state = uniforms.get_state()
+        self.engine = engine
+        if self.deferred:
+            self._pending = True
+        elif self.path is not None and (final or self.due()):
+            self.save(self.path)
+
+    def commit(self, final=False):
+        """
+        Uloží zachycený stav do souboru v odloženém režimu, pokud uplynul
+        interval nebo jde o konec simulace. Volá odběratel výstupu poté,
+        co uložil vrácenou část záznamu.
+        """
+        if self._pending and self.path is not None and (final or self._interval_elapsed()):
+            self.save(self.path)
+            self._pending = False
+
+    def restore(self, substances, uniforms):
+        """
+        Obnoví množství látek a stav generátoru. Volá simulační metoda.
+
+        Returns:
+        - čas simulace v kontrolním bodě
+        """
+        for substance in substances.values():
+            if substance.name in self.amounts:
+                substance.amount = self.amounts[substance.name]
+        uniforms.set_state(self.random_state)
+        return self.time
+
+    def engine_state(self, method):
+        """
+        Vrací vnitřní stav metody, pokud byl uložen stejnou metodou, jinak None.
+        """
+        return self.engine if self.method == method else None
+
+    def save(self, path):
+        """
+        Zapíše kontrolní bod do souboru (nejprve do dočasného souboru, aby
+        pád během zápisu nepoškodil předchozí uložení).
+        """
+        data = {
+            'method': self.method,
+            'time': self.time,
+            'amounts': self.amounts,
+            'random_state': self.random_state,
+            'engine': self.engine,
+        }
+        temporary = path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temporary, path)
+        self._saved = _time.monotonic()
+
+def load_checkpoint(path, interval=60.0, deferred=False):
+    """
+    Načte kontrolní bod ze souboru. Další ukládání půjde do téhož souboru.
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    checkpoint = Checkpoint(path, interval, deferred)
+    checkpoint.method = data['method']
+    checkpoint.time = data['time']
+    checkpoint.amounts = data['amounts']
+    checkpoint.random_state = data['random_state']
+    checkpoint.engine = data['engine']
+    return checkpoint
@@ -0,0 +1,144 @@
+# cli.py
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from model_file import load_model
+from simulation import simulate, simulation_stream, SIMULATION_METHODS, STREAM_METHODS
+from recording import EventRecorder, GridRecorder
+from trajectory_file import TrajectoryWriter, TrajectoryReader, write_stream
+from checkpoint import Checkpoint, load_checkpoint
+from stopping import AnyOf, Extinction, Stationarity
+
+def write_results(times, history, path=None):
+    """
+    Zapíše výsledek simulace do souboru CSV (sloupce time a látky), do
+    souboru NumPy .npz nebo do sloupcového záznamu .traj (viz trajectory_file),
+    podle přípony. Bez cesty se CSV vypíše na stdout.
+    """
+    names = list(history)
+    if path is not None and path.endswith('.traj'):
+        states = np.column_stack([np.asarray(history[name]) for name in names])
+        with TrajectoryWriter(path, names, states.dtype) as writer:
+            writer.write(times, states)
+        return
+    if path is not None and path.endswith('.npz'):
+        np.savez(path, time=np.asarray(times), **{name: np.asarray(history[name]) for name in names})
+        return
+    columns = np.column_stack([np.asarray(times)] + [np.asarray(history[name]) for name in names])
+    output = open(path, 'w', newline='') if path is not None else sys.stdout
+    try:
+        np.savetxt(output, columns, fmt='%.10g', delimiter=',', header=','.join(['time'] + names), comments='')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+def plot_results(times, history, path, steps=True):
+    """
+    Uloží graf průběhu simulace do souboru (formát podle přípony, např. .png).
+    """
+    # Matplotlib se načítá jen při kreslení, bez GUI backendu
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    from plotting import TrajectoryPlot
+
+    names = list(history)
+    figure = Figure(figsize=(10, 6))
+    ax = figure.add_subplot(111)
+    ax.set_xlabel("Čas")
+    ax.set_ylabel("Množství")
+    plot = TrajectoryPlot(ax, names, steps=steps)
+    plot.append(np.asarray(times, dtype=float),
+                np.column_stack([np.asarray(history[name], dtype=float) for name in names]))
+    ax.legend()
+    figure.savefig(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulace reakční kinetiky z příkazové řádky (bez GUI).")
+    parser.add_argument('model', help="soubor s modelem (JSON, viz model_file.load_model)")
+    parser.add_argument('--method', choices=list(SIMULATION_METHODS),
+                        help="simulační metoda (výchozí z modelu, jinak gillespie)")
+    parser.add_argument('--t-max', type=float, help="doba simulace (výchozí z modelu)")
+    parser.add_argument('--seed', type=int, help="seed generátoru náhodných čísel")
+    parser.add_argument('--grid', type=int, help="zaznamenat stav v tolika rovnoměrně rozložených časech")
+    parser.add_argument('--every', type=int, default=1, help="zaznamenat stav po každé N-té reakci")
+    parser.add_argument('--output', help="soubor pro výsledek (.csv, .npz nebo .traj), výchozí CSV na stdout")
+    parser.add_argument('--plot', help="uložit graf do souboru (např. graf.png)")
+    parser.add_argument('--checkpoint', help="soubor kontrolního bodu; pokud existuje, simulace pokračuje "
+                                             "od uloženého stavu do --t-max, jinak se do něj průběžně ukládá")
+    parser.add_argument('--stop-extinction', nargs='+', metavar='LÁTKA',
+                        help="ukončit simulaci, když množství některé z látek klesne na nulu")
+    parser.add_argument('--stop-stationary', type=float, metavar='OKNO',
+                        help="ukončit simulaci po ustálení (porovnání průměrů v oknech této délky)")
+    parser.add_argument('--stop-tolerance', type=float, default=0.02,
+                        help="největší relativní změna průměru mezi okny pro ustálení")
+    parser.add_argument('--checkpoint-interval', type=float, default=60.0,
+                        help="nejkratší doba mezi uloženími kontrolního bodu (s)")
+    args = parser.parse_args(argv)
+
+    substances, reactions, settings = load_model(args.model)
+    t_max = args.t_max if args.t_max is not None else settings.get('t_max')
+    if t_max is None:
+        parser.error("doba simulace není zadána (--t-max ani 't_max' v modelu)")
+    method = args.method or settings.get('method', 'gillespie')
+    if method not in SIMULATION_METHODS:
+        parser.error(f"neznámá metoda simulace: {method}")
+
+    t_start = 0
+    options = {}
+    # Průběh se zapisuje do souboru .traj už během simulace
+    streaming = args.output is not None and args.output.endswith('.traj') and method in STREAM_METHODS
+    if args.checkpoint is not None:
+        if method not in STREAM_METHODS:
+            parser.error(f"metoda {method} nepodporuje kontrolní body")
+        # Při zápisu do .traj se kontrolní bod ukládá až po zapsané části průběhu
+        if os.path.exists(args.checkpoint):
+            options['checkpoint'] = load_checkpoint(args.checkpoint, args.checkpoint_interval, deferred=streaming)
+            t_start = options['checkpoint'].time
+            print(f"Pokračování z kontrolního bodu v čase {t_start:.6g}", file=sys.stderr)
+        else:
+            options['checkpoint'] = Checkpoint(args.checkpoint, args.checkpoint_interval, deferred=streaming)
+    conditions = []
+    if args.stop_extinction:
+        conditions.append(Extinction(args.stop_extinction))
+    if args.stop_stationary:
+        conditions.append(Stationarity(window=args.stop_stationary, tolerance=args.stop_tolerance))
+    if conditions:
+        if method not in STREAM_METHODS:
+            parser.error(f"metoda {method} nepodporuje předčasné ukončení")
+        options['stop'] = AnyOf(*conditions)
+    if method == 'ode':
+        if args.grid:
+            options['n_points'] = args.grid
+    else:
+        options['rng'] = args.seed
+        if args.grid:
+            options['recorder'] = GridRecorder(np.linspace(t_start, t_max, args.grid))
+        elif args.every > 1:
+            options['recorder'] = EventRecorder(every=args.every)
+
+    start = time.perf_counter()
+    if streaming:
+        # Průběh se zapisuje do souboru už během simulace, v paměti není celý;
+        # po pokračování z kontrolního bodu se připisuje k existujícímu záznamu
+        names = [substance.name for substance in substances.values()]
+        write_stream(simulation_stream(substances, reactions, t_max, method=method, **options), args.output, names,
+                     checkpoint=options.get('checkpoint'))
+        times, history = TrajectoryReader(args.output).slice()
+    else:
+        times, history = simulate(substances, reactions, t_max, method=method, **options)
+        write_results(times, history, args.output)
+    elapsed = time.perf_counter() - start
+    print(f"Metoda {method}: {len(times)} záznamů, konečný čas {times[-1]:.6g}, "
+          f"doba výpočtu {elapsed:.3f} s", file=sys.stderr)
+    if 'stop' in options:
+        print(f"Důvod ukončení: {options['stop'].reason}", file=sys.stderr)
+
+    if args.plot:
+        plot_results(times, history, args.plot, steps=method != 'ode')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# codegen.py
+
+from model import CATALYTIC, INHIBITORY, MICHAELIS_MENTEN
+
+# Zkompilované generátory jader podle struktury sítě (viz structure_key)
+_kernel_cache = {}
+
+def structure_key(model):
+    """
+    Klíč struktury sítě: stechiometrie, řády, exponenty, typy zákonů
+    a modifikátory kanálů. Rychlostní konstanty a konstanty jmenovatelů
+    do klíče nepatří, síť se stejnou strukturou a jinými konstantami
+    (např. při průzkumu parametrů) použije stejný zkompilovaný kód.
+    """
+    arrays = (model.factor_species, model.factor_reactants, model.factor_orders, model.factor_powers,
+              model.change_species, model.change_deltas, model.kinds, model.modifiers, model.offsets <= 0)
+    return (model.n_species,) + tuple((array.shape, array.tobytes()) for array in arrays)
+
+def _propensity_expression(model, j):
+    # Výraz propence kanálu j nad lokálními proměnnými s<i> (množství látek),
+    # k<j> a c<j> jsou rychlostní konstanta a konstanta jmenovatele
+    factors = []
+    for k in range(model.factor_species.shape[1]):
+        i = int(model.factor_species[j, k])
+        order = int(model.factor_orders[j, k])
+        power = int(model.factor_powers[j, k])
+        if order:
+            factors += [f's{i}'] + [f'(s{i} - {n})' for n in range(1, order)]
+        factors += [f's{i}'] * power
+    if len(factors) > 1:
+        expression = f'k{j} * ({" * ".join(factors)})'
+    else:
+        expression = ' * '.join([f'k{j}'] + factors)
+
+    kind = int(model.kinds[j])
+    modifier = int(model.modifiers[j])
+    conditions = [f's{int(i)} >= {int(r)}' for i, r in zip(model.factor_species[j], model.factor_reactants[j]) if r > 0]
+    if kind == CATALYTIC:
+        expression += f' * s{modifier}'
+    elif kind in (INHIBITORY, MICHAELIS_MENTEN):
+        expression += f' / (c{j} + s{modifier})'
+        if model.offsets[j] <= 0:
+            conditions.append(f'c{j} + s{modifier} != 0')
+    if conditions:
+        return f'{expression} if {" and ".join(conditions)} else 0.0'
+    return expression
+
+def _read_species(model, channels):
+    # Látky, na kterých závisí propence kanálů
+    species = set()
+    for j in channels:
+        species.update(model.channel_species(j))
+    return sorted(species)
+
+def generate_source(model):
+    """
+    Vygeneruje zdrojový kód jader pro konkrétní síť.
+
+    Kód definuje funkci make_kernels(k, c), která z rychlostních konstant
+    a konstant jmenovatelů vytvoří:
+    - propensities(x, a): výpočet propencí všech kanálů do seznamu a
+    - fires: seznam funkcí fire_<j>(x, a), které provedou kanál j
+      (přímé zápisy změn do stavu x) a přepočítají propence jen závislých
+      kanálů
+
+    Propence je jeden rozvinutý výraz na kanál bez cyklů přes reaktanty,
+    bez slovníků a bez skalárů NumPy.
+
+    Parameters:
+    - model: CompiledModel (viz model.compile_model)
+
+    Returns:
+    - zdrojový kód jako řetězec
+    """
+    n_channels = model.n_channels
+    expressions = [_propensity_expression(model, j) for j in range(n_channels)]
+    lines = ['def make_kernels(k, c):']
+    lines += [f'    k{j} = k[{j}]' for j in range(n_channels)]
+    lines += [f'    c{j} = c[{j}]' for j in range(n_channels)
+              if model.kinds[j] in (INHIBITORY, MICHAELIS_MENTEN)]
+
+    lines += ['', '    def propensities(x, a):']
+    lines += [f'        s{i} = x[{i}]' for i in _read_species(model, range(n_channels))]
+    lines += [f'        a[{j}] = {expressions[j]}' for j in range(n_channels)]
+    if n_channels == 0:
+        lines.append('        pass')
+
+    for j, affected in enumerate(model.dependents()):
+        lines += ['', f'    def fire_{j}(x, a):']
+        body = []
+        for i, delta in zip(*model.changes[j]):
+            if delta > 0:
+                body.append(f'        x[{i}] += {int(delta)}')
+            elif delta < 0:
+                body.append(f'        x[{i}] -= {int(-delta)}')
+        body += [f'        s{i} = x[{i}]' for i in _read_species(model, affected)]
+        body += [f'        a[{k}] = {expressions[k]}' for k in affected]
+        lines += body or ['        pass']
+
+    fires = ', '.join(f'fire_{j}' for j in range(n_channels))
+    lines += ['', f'    return propensities, [{fires}]', '']
+    return '\n'.join(lines)
+
+def compile_kernels(model):
+    """
+    Vrací jádra (propensities, fires) pro síť (viz generate_source).
+
+    Zdrojový kód se generuje a kompiluje jen jednou pro každou strukturu
+    sítě, konstanty se dosazují při každém volání.
+    """
+    key = structure_key(model)
+    make_kernels = _kernel_cache.get(key)
+    if make_kernels is None:
+        namespace = {}
+        exec(compile(generate_source(model), '<kinetic-kernels>', 'exec'), namespace)
+        make_kernels = _kernel_cache[key] = namespace['make_kernels']
+    return make_kernels(model.rates.tolist(), model.offsets.tolist())
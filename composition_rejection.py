@@ -0,0 +1,139 @@
+# composition_rejection.py
+
+import math
+
+class PropensityGroups:
+    def __init__(self, values, resum_every=100000):
+        """
+        Propence rozdělené do skupin podle mocnin dvou (Slepoy, Thompson,
+        Plimpton 2008). Skupina s exponentem e obsahuje reakce s propencí
+        v intervalu [2^(e-1), 2^e).
+
+        Reakce se vybírá ve dvou krocích: nejprve skupina podle součtů
+        skupin (skupin je jen několik desítek), pak uvnitř skupiny náhodná
+        reakce, která se přijme s pravděpodobností propence / 2^e, jinak
+        se výběr opakuje. Pravděpodobnost přijetí je vždy aspoň 1/2, takže
+        výběr i změna propence stojí v průměru O(1) operací bez ohledu na
+        počet reakcí.
+
+        Parameters:
+        - values: počáteční propence
+        - resum_every: po tolika změnách se součty skupin sečtou znovu,
+          aby se neshromažďovaly zaokrouhlovací chyby
+        """
+        self.values = [0.0] * len(values)
+        self.group_of = [None] * len(values)
+        self.position = [0] * len(values)
+        self.groups = {}
+        self.sums = {}
+        self.resum_every = resum_every
+        self._updates = 0
+        for index, value in enumerate(values):
+            self.update(index, value)
+
+    @property
+    def total(self):
+        return sum(self.sums.values())
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def update(self, index, value):
+        """
+        Nastaví propenci reakce a přesune ji do odpovídající skupiny.
+        """
+        value = float(value)
+        old_group = self.group_of[index]
+        new_group = math.frexp(value)[1] if value > 0 else None
+
+        if old_group == new_group:
+            if new_group is not None:
+                self.sums[new_group] += value - self.values[index]
+        else:
+            if old_group is not None:
+                # Odebrání ze skupiny záměnou s posledním prvkem
+                members = self.groups[old_group]
+                last = members.pop()
+                if last != index:
+                    position = self.position[index]
+                    members[position] = last
+                    self.position[last] = position
+                if members:
+                    self.sums[old_group] -= self.values[index]
+                else:
+                    del self.groups[old_group]
+                    del self.sums[old_group]
+            if new_group is not None:
+                members = self.groups.setdefault(new_group, [])
+                self.position[index] = len(members)
+                members.append(index)
+                self.sums[new_group] = self.sums.get(new_group, 0.0) + value
+            self.group_of[index] = new_group
+        self.values[index] = value
+
+        self._updates += 1
+        if self._updates >= self.resum_every:
+            self.resum()
+
+    def resum(self):
+        """
+        Sečte součty skupin znovu přímo z propencí.
+        """
+        values = self.values
+        self.sums = {group: math.fsum(values[i] for i in members) for group, members in self.groups.items()}
+        self._updates = 0
+
+    def get_state(self):
+        """
+        Vrací rozložení skupin (pořadí skupin a reakcí v nich a součty),
+        serializovatelné do JSON. Výběr reakce závisí na tomto pořadí, které
+        je dané historií změn, proto je součástí kontrolního bodu simulace.
+        """
+        return {
+            'groups': [[group, self.sums[group], list(members)] for group, members in self.groups.items()],
+            'updates': self._updates,
+        }
+
+    def set_state(self, state):
+        """
+        Obnoví rozložení skupin uložené metodou get_state. Propence musí
+        odpovídat stavu, ve kterém bylo rozložení uloženo.
+        """
+        self.groups = {}
+        self.sums = {}
+        for group, group_sum, members in state['groups']:
+            self.groups[group] = list(members)
+            self.sums[group] = group_sum
+            for position, index in enumerate(members):
+                self.group_of[index] = group
+                self.position[index] = position
+        self._updates = state['updates']
+
+    def sample(self, uniforms):
+        """
+        Vybere reakci s pravděpodobností úměrnou její propenci.
+
+        Parameters:
+        - uniforms: zdroj náhodných čísel (viz random_buffer.UniformBuffer)
+
+        Returns:
+        - index reakce
+        """
+        sums = self.sums
+        target = uniforms.next() * sum(sums.values())
+        for group, group_sum in sums.items():
+            target -= group_sum
+            if target < 0:
+                break
+
+        # Výběr uvnitř skupiny zamítáním
+        members = self.groups[group]
+        bound = math.ldexp(1.0, group)
+        values = self.values
+        while True:
+            index = members[int(uniforms.next() * len(members))]
+            if uniforms.next() * bound < values[index]:
+                return index
@@ -0,0 +1,177 @@
+# ensemble.py
+
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from simulation import simulate
+from recording import GridRecorder
+from online_stats import GridAccumulator
+
+class EnsembleResult:
+    def __init__(self, grid, names, samples, percentiles, stops=None):
+        """
+        Souhrnné statistiky souboru nezávislých trajektorií.
+
+        Parameters:
+        - grid: společná časová mřížka
+        - names: názvy látek
+        - samples: pole tvaru (replikace, látky, časy) s hodnotami na mřížce
+        - percentiles: percentily, které se mají spočítat (0-100)
+        - stops: dvojice (důvod, čas) ukončení každé replikace, pokud byla
+          zadána podmínka ukončení (viz stopping)
+        """
+        self.grid = grid
+        self.names = names
+        self.n_replicates = len(samples)
+        self.stop_reasons = [reason for reason, _ in stops] if stops else []
+        self.stop_times = np.array([time for _, time in stops] if stops else [], dtype=float)
+
+        mean = samples.mean(axis=0)
+        variance = samples.var(axis=0, ddof=1) if len(samples) > 1 else np.zeros_like(mean)
+        bands = np.percentile(samples, percentiles, axis=0)
+
+        self.mean = {name: mean[i] for i, name in enumerate(names)}
+        self.variance = {name: variance[i] for i, name in enumerate(names)}
+        self.percentiles = {
+            q: {name: band[i] for i, name in enumerate(names)}
+            for q, band in zip(percentiles, bands)
+        }
+
+    def __repr__(self):
+        return f"EnsembleResult({self.n_replicates} replikací, {len(self.names)} látek, {len(self.grid)} časů)"
+
+def _run_replicates(substances, reactions, t_max, method, options, seeds, grid):
+    # Spouští se v pracovním procesu, každá replikace má vlastní kopii sítě
+    # i parametrů (podmínka ukončení si pamatuje důvod ukončení)
+    names = [substance.name for substance in substances.values()]
+    samples = np.empty((len(seeds), len(names), len(grid)))
+    stops = []
+    for i, seed in enumerate(seeds):
+        replicate_substances, replicate_reactions, replicate_options = \
+            copy.deepcopy((substances, reactions, options))
+        _, history = simulate(replicate_substances, replicate_reactions, t_max, method=method,
+                              rng=np.random.default_rng(seed), recorder=GridRecorder(grid), **replicate_options)
+        samples[i] = [history[name] for name in names]
+        stop = replicate_options.get('stop')
+        if stop is not None:
+            stops.append((stop.reason, stop.time))
+    return samples, stops
+
+def run_ensemble(substances, reactions, t_max, n_replicates=100, method='gillespie',
+                 grid=None, percentiles=(5, 50, 95), seed=None, n_workers=None, **options):
+    """
+    Spustí n_replicates nezávislých simulací paralelně ve více procesech
+    a spočítá střední hodnotu, rozptyl a percentilová pásma.
+
+    Každá replikace dostane vlastní generátor z numpy.random.SeedSequence(seed),
+    výsledek je proto při stejném seed reprodukovatelný bez ohledu na počet
+    procesů. Látky a reakce se do procesů předávají jako kopie, vstupní
+    objekty zůstanou nezměněny. Na systémech bez fork je nutné volat funkci
+    pod podmínkou if __name__ == '__main__'.
+
+    Parameters:
+    - substances: dict {název: Substance}
+    - reactions: seznam reakcí
+    - t_max: maximální čas simulace
+    - n_replicates: počet replikací
+    - method: název stochastické metody ze SIMULATION_METHODS
+    - grid: společná časová mřížka (výchozí 200 bodů od 0 do t_max)
+    - percentiles: percentily pásem (0-100)
+    - seed: počáteční entropie pro SeedSequence
+    - n_workers: počet procesů (výchozí počet jader, 1 = bez paralelizace)
+    - options: další parametry předané simulační metodě
+
+    Returns:
+    - EnsembleResult
+    """
+    if n_replicates < 1:
+        raise ValueError("Počet replikací musí být alespoň 1.")
+    if method == 'ode':
+        raise ValueError("Deterministický model dává vždy stejný výsledek, soubor replikací nemá smysl.")
+    if grid is None:
+        grid = np.linspace(0, t_max, 200)
+    grid = np.asarray(grid, dtype=float)
+    names = [substance.name for substance in substances.values()]
+    seeds = np.random.SeedSequence(seed).spawn(n_replicates)
+    n_workers = n_workers or os.cpu_count() or 1
+
+    if n_workers == 1:
+        samples, stops = _run_replicates(substances, reactions, t_max, method, options, seeds, grid)
+    else:
+        # Několik dávek na proces kvůli vyrovnání zátěže
+        n_chunks = min(n_replicates, 4 * n_workers)
+        chunks = [chunk.tolist() for chunk in np.array_split(np.arange(n_replicates), n_chunks)]
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = [
+                executor.submit(_run_replicates, substances, reactions, t_max, method,
+                                options, [seeds[i] for i in chunk], grid)
+                for chunk in chunks
+            ]
+            results = [future.result() for future in futures]
+        samples = np.concatenate([chunk_samples for chunk_samples, _ in results])
+        stops = [stop for _, chunk_stops in results for stop in chunk_stops]
+
+    return EnsembleResult(grid, names, samples, list(percentiles), stops)
+
+def _accumulate_replicates(substances, reactions, t_max, method, options, seeds, grid,
+                           percentiles, sketch_size, sketch_seed):
+    # Jako _run_replicates, ale trajektorie se hned přidávají do akumulátoru
+    names = [substance.name for substance in substances.values()]
+    accumulator = GridAccumulator(grid, names, percentiles, sketch_size, np.random.default_rng(sketch_seed))
+    for seed in seeds:
+        replicate_substances, replicate_reactions, replicate_options = \
+            copy.deepcopy((substances, reactions, options))
+        _, history = simulate(replicate_substances, replicate_reactions, t_max, method=method,
+                              rng=np.random.default_rng(seed), recorder=GridRecorder(grid), **replicate_options)
+        accumulator.add_grid(history)
+    return accumulator
+
+def accumulate_ensemble(substances, reactions, t_max, n_replicates=1000, method='gillespie',
+                        grid=None, percentiles=(5, 50, 95), seed=None, n_workers=None,
+                        sketch_size=128, **options):
+    """
+    Spustí n_replicates nezávislých simulací paralelně jako run_ensemble,
+    ale trajektorie neukládá. Každý proces přidává trajektorie do vlastního
+    akumulátoru (viz online_stats.GridAccumulator) a akumulátory se nakonec
+    spojí, paměť je proto O(mřížka × látky) bez ohledu na počet replikací.
+
+    Replikace dostávají stejné generátory jako v run_ensemble, střední
+    hodnota a rozptyl jsou tedy při stejném seed shodné. Percentily jsou
+    přibližné (přesné do sketch_size replikací).
+
+    Parameters:
+    - stejné jako run_ensemble
+    - sketch_size: přesnost odhadu percentilů (viz online_stats.QuantileSketch)
+
+    Returns:
+    - GridAccumulator se stejnými vlastnostmi mean, variance a percentiles
+      jako EnsembleResult, navíc minimum a maximum
+    """
+    if n_replicates < 1:
+        raise ValueError("Počet replikací musí být alespoň 1.")
+    if method == 'ode':
+        raise ValueError("Deterministický model dává vždy stejný výsledek, soubor replikací nemá smysl.")
+    if grid is None:
+        grid = np.linspace(0, t_max, 200)
+    grid = np.asarray(grid, dtype=float)
+    n_workers = n_workers or os.cpu_count() or 1
+    n_chunks = 1 if n_workers == 1 else min(n_replicates, 4 * n_workers)
+    # Prvních n_replicates generátorů je stejných jako v run_ensemble
+    seeds = np.random.SeedSequence(seed).spawn(n_replicates + n_chunks)
+    sketch_seeds = seeds[n_replicates:]
+    chunks = [chunk.tolist() for chunk in np.array_split(np.arange(n_replicates), n_chunks)]
+    arguments = [
+        (substances, reactions, t_max, method, options, [seeds[i] for i in chunk], grid,
+         list(percentiles), sketch_size, sketch_seeds[c])
+        for c, chunk in enumerate(chunks)
+    ]
+
+    if n_workers == 1:
+        return _accumulate_replicates(*arguments[0])
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [executor.submit(_accumulate_replicates, *args) for args in arguments]
+        accumulator = futures[0].result()
+        for future in futures[1:]:
+            accumulator.merge(future.result())
+    return accumulator
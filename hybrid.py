@@ -0,0 +1,221 @@
+# hybrid.py
+
+import math
+import numpy as np
+from model import compile_model
+from recording import StreamOutput, collect
+from substance import SubstanceState
+from random_buffer import UniformBuffer, select_linear
+
+def partition(model, x, propensities, threshold=100, separation=10.0):
+    """
+    Rozdělí kanály na spojité (řešené diferenciálními rovnicemi) a diskrétní
+    (přesné stochastické kroky) podle Salise a Kaznessise (2005).
+
+    Kanál je spojitý, pokud všechny látky, které mění, mají aspoň threshold
+    molekul a jeho propence je aspoň separation-krát větší než součet
+    propencí kanálů, které mění málo početné látky. Látky, na kterých
+    propence jen závisí (katalyzátor, inhibitor), podmínku splňovat nemusí,
+    mezi diskrétními reakcemi jsou konstantní.
+
+    Parameters:
+    - model: CompiledModel
+    - x: spojitý stavový vektor
+    - propensities: propence kanálů ve stavu x
+    - threshold: nejmenší počet molekul měněných látek spojitého kanálu
+    - separation: poměr propence spojitého kanálu a součtu propencí málo početných kanálů
+
+    Returns:
+    - pole bool tvaru (kanály,), True pro spojité kanály
+    """
+    changed = model.change_deltas != 0
+    abundant = np.all(~changed | (x[model.change_species] >= threshold), axis=1)
+    rare_total = propensities[~abundant].sum()
+    return abundant & (propensities > 0) & (propensities >= separation * rare_total)
+
+def _drift(model, x, continuous):
+    # Rychlost změny látek působením spojitých kanálů
+    return model.net_change(np.where(continuous, model.propensities(x), 0.0))
+
+def _heun(model, x, dt, continuous, drift):
+    # Krok Heunovy metody (2. řád), množství nemohou klesnout pod nulu
+    predicted = np.maximum(x + dt * drift, 0.0)
+    return np.maximum(x + 0.5 * dt * (drift + _drift(model, predicted, continuous)), 0.0)
+
+def _fraction(start, end, remaining):
+    # Část kroku, po které integrál lineárně se měnící propence a(s)
+    # = start + (end - start) s dosáhne remaining (integrál celého kroku = 1)
+    slope = end - start
+    if abs(slope) < 1e-12 * max(start, end):
+        return remaining / start
+    # Zaokrouhlením může diskriminant vyjít nepatrně záporný
+    return (math.sqrt(max(start * start + 2 * slope * remaining, 0.0)) - start) / slope
+
+def hybrid_stream(substances, reactions, t_max, threshold=100, separation=10.0, epsilon=0.03,
+                  discrete_steps=100, rng=None, recorder=None, instrumentation=None, checkpoint=None, stop=None):
+    """
+    Hybridní stochasticko-deterministická simulace jako generátor průběžných
+    výsledků (viz simulation.gillespie_stream).
+
+    Kanály se v každém kroku znovu rozdělí funkcí partition. Spojité kanály
+    (četné reakce mezi početnými látkami) se řeší jako diferenciální rovnice
+    Heunovou metodou s krokem, ve kterém se žádná látka nezmění relativně
+    o víc než epsilon. Diskrétní kanály (málo početné látky, např. enzymy
+    a inhibitory) probíhají po jedné jako v přesné simulaci: čas příští
+    diskrétní reakce se určí integrálem jejich propence podél řešení rovnic
+    (Haseltine, Rawlings 2002), propence se tak mění i během čekání na reakci.
+
+    Počet kroků už nezávisí na počtech molekul početných látek. Množství
+    látek ve spojité části jsou reálná čísla, v záznamu a v objektech
+    Substance se zaokrouhlují. Je-li spojitá část prázdná, jde o přesnou
+    Gillespieho metodu: provede se až discrete_steps kroků nad čísly
+    Pythonu s přepočtem propencí jen závislých kanálů a teprve potom se
+    kanály znovu rozdělí. Jsou-li spojité všechny kanály, jde o řešení
+    rovnic reakční rychlosti (viz ode.ode_simulation).
+
+    Parameters:
+    - substances: dict {název: Substance}
+    - reactions: seznam reakcí
+    - t_max: maximální čas simulace
+    - threshold, separation: podmínky spojitého kanálu (viz partition)
+    - epsilon: povolená relativní změna látek během kroku rovnic
+    - discrete_steps: nejvyšší počet přesných kroků mezi rozděleními kanálů,
+      je-li spojitá část prázdná
+    - rng, recorder, instrumentation, checkpoint, stop: viz simulation.gillespie_stream
+      (záznam výchozí po každém kroku)
+    """
+    model = compile_model(substances, reactions)
+    uniforms = UniformBuffer(rng)
+    changes = model.changes
+    channel_changes = model.channel_changes
+    dependents = model.dependents()
+    channel_propensity = model.channel_propensity
+
+    # Stav sdílený s objekty Substance, změny se do látek zapisují přímo
+    # (kroky rovnic přes pole NumPy, přesné kroky přes prvky values)
+    shared = SubstanceState(model.substances)
+    state = shared.array
+    values = shared.values
+    time = 0
+    saved = None
+    if checkpoint is not None and checkpoint.started:
+        time = checkpoint.restore(substances, uniforms)
+        saved = checkpoint.engine_state('hybrid')
+
+    # Spojitý stav, integrál diskrétní propence a jeho cíl pro příští diskrétní reakci
+    if saved is not None:
+        x = np.array(saved['continuous'], dtype=float)
+        integral, target = saved['integral'], saved['target']
+    else:
+        x = state.astype(float)
+        integral, target = 0.0, -math.log1p(-uniforms.next())
+    # Spojitý stav jako seznam během přesných kroků (jinak None)
+    xs = None
+
+    def engine_state():
+        # Stav pro kontrolní bod, sestavuje se jen při jeho zachycení
+        continuous = xs if xs is not None else x.tolist()
+        return {'continuous': list(continuous), 'integral': integral, 'target': target}
+
+    output = StreamOutput('hybrid', model.names, uniforms, recorder, checkpoint, stop, engine_state)
+    output.start(time, state)
+    if instrumentation is not None:
+        instrumentation.start(reactions, wrap=False)
+        sources = model.sources
+        n_reactions = len(reactions)
+        # Zlomky proběhnutí spojitých kanálů, instrumentace počítá celé reakce
+        expected = np.zeros(n_reactions)
+
+    while time < t_max:
+        propensities = model.propensities(x)
+        continuous = partition(model, x, propensities, threshold, separation)
+        discrete = np.where(continuous, 0.0, propensities)
+        total_discrete = discrete.sum()
+        fired = None
+
+        if not continuous.any():
+            # Přesné kroky nad čísly Pythonu, po proběhnutí kanálu se
+            # přepočítají jen propence závislých kanálů
+            xs = x.tolist()
+            exact = discrete.tolist()
+            for _ in range(discrete_steps):
+                total_discrete = sum(exact)
+                if total_discrete <= 0:
+                    break
+                dt = (target - integral) / total_discrete
+                if time + dt > t_max:
+                    integral += (t_max - time) * total_discrete
+                    time = t_max
+                else:
+                    time += dt
+                    channel = select_linear(exact, uniforms.next() * total_discrete)
+                    for i, delta in channel_changes[channel]:
+                        xs[i] += delta
+                        values[i] = round(xs[i])
+                    for k in dependents[channel]:
+                        exact[k] = channel_propensity(xs, k)
+                    if instrumentation is not None:
+                        instrumentation.event(time, total_discrete, sources[channel])
+                    integral, target = 0.0, -math.log1p(-uniforms.next())
+                if output.step(time, state) and (yield from output.emit()):
+                    break
+                if time >= t_max:
+                    break
+            x[:] = xs
+            xs = None
+            if output.stopped or total_discrete <= 0:
+                break
+            continue
+
+        drift = model.net_change(np.where(continuous, propensities, 0.0))
+        flux = model.gross_change(np.where(continuous, propensities, 0.0))
+        with np.errstate(divide='ignore'):
+            dt = float(np.min(epsilon * np.maximum(x, 1.0) / flux))
+        dt = min(dt, t_max - time)
+        new_x = _heun(model, x, dt, continuous, drift)
+        end_discrete = np.where(continuous, 0.0, model.propensities(new_x)).sum()
+        step_integral = 0.5 * dt * (total_discrete + end_discrete)
+
+        if integral + step_integral >= target:
+            # Diskrétní reakce proběhne uvnitř kroku, krok se zkrátí k jejímu času
+            theta = min(_fraction(total_discrete * dt, end_discrete * dt, target - integral), 1.0)
+            dt *= theta
+            new_x = _heun(model, x, dt, continuous, drift)
+            fired = np.where(continuous, 0.0, model.propensities(new_x))
+        else:
+            integral += step_integral
+        if instrumentation is not None:
+            previous = np.floor(expected)
+            expected += np.bincount(sources, np.where(continuous, propensities, 0.0) * dt, n_reactions)
+            instrumentation.leap(time + dt, propensities.sum(), np.floor(expected) - previous)
+        x = new_x
+        time += dt
+
+        if fired is not None:
+            cumulative = np.cumsum(fired)
+            if cumulative[-1] > 0:
+                channel = min(int(np.searchsorted(cumulative, uniforms.next() * cumulative[-1], side='right')),
+                              len(cumulative) - 1)
+                species, deltas = changes[channel]
+                x[species] += deltas
+                if instrumentation is not None:
+                    instrumentation.event(time, propensities.sum(), sources[channel])
+            integral, target = 0.0, -math.log1p(-uniforms.next())
+
+        state[:] = np.rint(x)
+        if output.step(time, state) and (yield from output.emit()):
+            break
+
+    if instrumentation is not None:
+        instrumentation.finish(time)
+    yield from output.finish(time, state, t_max)
+
+def hybrid_simulation(substances, reactions, t_max, **options):
+    """
+    Hybridní stochasticko-deterministická simulace (viz hybrid_stream).
+
+    Returns:
+    - times, history ve stejném tvaru jako gillespie_simulation
+    """
+    names = [substance.name for substance in substances.values()]
+    return collect(hybrid_stream(substances, reactions, t_max, **options), names)
@@ -0,0 +1,171 @@
+# instrumentation.py
+
+import time as _time
+
+class ReactionStats:
+    __slots__ = ('label', 'firings', 'propensity_calls', 'propensity_time',
+                 'update_calls', 'update_time')
+
+    def __init__(self, label):
+        self.label = label
+        self.firings = 0
+        self.propensity_calls = 0
+        self.propensity_time = 0.0
+        self.update_calls = 0
+        self.update_time = 0.0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class InstrumentedReaction:
+    def __init__(self, reaction, stats):
+        """
+        Obal reakce, který měří počet a dobu volání propensity()
+        a update_substances(). Ostatní atributy předává původní reakci.
+        """
+        self._reaction = reaction
+        self._stats = stats
+
+    def propensity(self):
+        start = _time.perf_counter()
+        value = self._reaction.propensity()
+        self._stats.propensity_time += _time.perf_counter() - start
+        self._stats.propensity_calls += 1
+        return value
+
+    def update_substances(self, *args):
+        start = _time.perf_counter()
+        self._reaction.update_substances(*args)
+        self._stats.update_time += _time.perf_counter() - start
+        self._stats.update_calls += 1
+
+    def __getattr__(self, name):
+        return getattr(self._reaction, name)
+
+class Instrumentation:
+    def __init__(self, callback=None, sample_every=1000):
+        """
+        Volitelné měření průběhu simulace. Předává se simulační metodě
+        parametrem instrumentation; bez něj metoda neměří nic a nemá
+        žádnou režii navíc.
+
+        Zaznamenává počet proběhnutí každé reakce, dobu strávenou
+        v propensity() a update_substances() (jen metody nad objekty reakcí),
+        a každých sample_every reakcí vzorek s časem simulace, reálným
+        časem, rychlostí (reakce za sekundu) a součtem propencí.
+
+        Parameters:
+        - callback: funkce volaná s každým vzorkem (dict), např. pro průběžný výpis
+        - sample_every: počet reakcí mezi vzorky
+        """
+        self.callback = callback
+        self.sample_every = sample_every
+
+    def start(self, reactions, wrap=True):
+        """
+        Připraví měření pro daný seznam reakcí. Volá simulační metoda.
+
+        Parameters:
+        - reactions: seznam reakcí
+        - wrap: obalit reakce měřením doby volání
+
+        Returns:
+        - seznam reakcí, který má metoda dále používat
+        """
+        self.reactions = [ReactionStats(f"{i}: {type(r).__name__}") for i, r in enumerate(reactions)]
+        self.types = [type(reaction).__name__ for reaction in reactions]
+        self.samples = []
+        self.events = 0
+        self.time = 0
+        self._started = _time.perf_counter()
+        self._last_sample = (self._started, 0)
+        if wrap:
+            return [InstrumentedReaction(r, stats) for r, stats in zip(reactions, self.reactions)]
+        return reactions
+
+    def event(self, time, total_propensity, reaction_index):
+        """
+        Zaznamená proběhnutí jedné reakce. Volá simulační metoda.
+        """
+        self.reactions[reaction_index].firings += 1
+        self.events += 1
+        self.time = time
+        if self.events % self.sample_every == 0:
+            self._sample(time, total_propensity)
+
+    def leap(self, time, total_propensity, counts):
+        """
+        Zaznamená krok, ve kterém proběhlo více reakcí najednou (tau-leaping).
+
+        Parameters:
+        - counts: počty proběhnutí podle indexu reakce
+        """
+        fired = 0
+        for index, count in enumerate(counts):
+            count = int(count)
+            self.reactions[index].firings += count
+            fired += count
+        previous = self.events
+        self.events += fired
+        self.time = time
+        if self.events // self.sample_every > previous // self.sample_every:
+            self._sample(time, total_propensity)
+
+    def finish(self, time):
+        self.time = time
+        self._finished = _time.perf_counter()
+
+    def _sample(self, time, total_propensity):
+        now = _time.perf_counter()
+        last_wall, last_events = self._last_sample
+        sample = {
+            'wall_time': now - self._started,
+            'time': time,
+            'events': self.events,
+            'events_per_second': (self.events - last_events) / (now - last_wall) if now > last_wall else None,
+            'total_propensity': float(total_propensity),
+        }
+        self._last_sample = (now, self.events)
+        self.samples.append(sample)
+        if self.callback is not None:
+            self.callback(sample)
+
+    def report(self):
+        """
+        Vrací souhrnnou zprávu o měření.
+
+        Returns:
+        - dict s celkovým počtem reakcí, reálným časem, průměrnou rychlostí,
+          statistikami jednotlivých reakcí ('reactions'), součty podle typu
+          reakce ('by_type') a průběžnými vzorky ('samples')
+        """
+        wall_time = getattr(self, '_finished', _time.perf_counter()) - self._started
+        by_type = {}
+        for reaction_type, stats in zip(self.types, self.reactions):
+            totals = by_type.setdefault(reaction_type, {
+                'firings': 0, 'propensity_calls': 0, 'propensity_time': 0.0,
+                'update_calls': 0, 'update_time': 0.0,
+            })
+            for name in totals:
+                totals[name] += getattr(stats, name)
+        return {
+            'events': self.events,
+            'time': float(self.time),
+            'wall_time': wall_time,
+            'events_per_second': self.events / wall_time if wall_time > 0 else None,
+            'reactions': [stats.as_dict() for stats in self.reactions],
+            'by_type': by_type,
+            'samples': list(self.samples),
+        }
+
+    def summary(self, top=10):
+        """
+        Vrací textový přehled reakcí seřazených podle celkové naměřené doby.
+        """
+        report = self.report()
+        lines = [f"Reakcí: {report['events']}, reálný čas: {report['wall_time']:.3f} s"]
+        ranked = sorted(report['reactions'], key=lambda r: -(r['propensity_time'] + r['update_time']))
+        for r in ranked[:top]:
+            lines.append(f"{r['label']:30s} proběhla {r['firings']:10d}x  "
+                         f"propensity {r['propensity_time']:.4f} s  update {r['update_time']:.4f} s")
+        return '\n'.join(lines)
@@ -1,384 +1,496 @@
-# main.py
-
-import matplotlib
-matplotlib.use('TkAgg')
-
-import tkinter as tk
-from tkinter import ttk
-from tkinter import messagebox
-from substance import Substance
-from reaction import (
-    Reaction, UnimolecularReaction, BimolecularReaction,
-    TrimolecularReaction, ReversibleReaction, CatalyticReaction,
-    EnzymaticReaction, MichaelisMentenReaction, AutocatalyticReaction,
-    InhibitoryReaction
-)
-from simulation import gillespie_simulation
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
-def main():
-    root = tk.Tk()
-    root.title("Simulace reakční kinetiky")
-    root.geometry("1200x800")
-
-    # Rámec pro vstupní parametry
-    input_frame = ttk.Frame(root)
-    input_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
-
-    # Definice látek
-    substance_info = []
-
-    # Aktualizované názvy látek
-    initial_substances = ['A', 'B', 'C', 'D', 'E', 'F', 'S', 'P', 'E', 'I']  # S = Substrát, P = Produkt, E = Enzym, I = Inhibitor
-    for name in initial_substances:
-        substance_info.append({'name': name, 'label': name, 'default': '0'})
-
-    # Rámec pro látky
-    substance_frame = ttk.LabelFrame(input_frame, text="Látky")
-    substance_frame.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
-
-    # Funkce pro aktualizaci vstupních polí látek
-    def update_substance_entries():
-        for widget in substance_frame.winfo_children():
-            widget.destroy()
-        row = 0
-        ttk.Label(substance_frame, text="Počáteční množství látek:").grid(row=row, column=0, columnspan=2)
-        row += 1
-        for info in substance_info:
-            ttk.Label(substance_frame, text=f"{info['label']}:").grid(row=row, column=0, sticky=tk.E)
-            entry = ttk.Entry(substance_frame)
-            entry.insert(0, info['default'])
-            entry.grid(row=row, column=1)
-            info['entry'] = entry
-            row += 1
-
-    update_substance_entries()
-
-    # Definice předdefinovaných reakcí, včetně bočných a následných
-    predefined_reactions = [
-        {
-            'label': 'Unimolekulární rozklad A → B',
-            'description': 'Jednoduchá unimolekulární reakce, kde se látka A přemění na látku B.',
-            'type': 'Unimolecular',
-            'reactants': {'A': 1},
-            'products': {'B': 1},
-            'default_k': '0.1'
-        },
-        {
-            'label': 'Bimolekulární reakce A + B → C',
-            'description': 'Bimolekulární reakce, kde se látky A a B spojí za vzniku látky C.',
-            'type': 'Bimolecular',
-            'reactants': {'A': 1, 'B': 1},
-            'products': {'C': 1},
-            'default_k': '0.01'
-        },
-        {
-            'label': 'Následná reakce B → C',
-            'description': 'Následná reakce, kde látka B se přemění na látku C.',
-            'type': 'Unimolecular',
-            'reactants': {'B': 1},
-            'products': {'C': 1},
-            'default_k': '0.05'
-        },
-        {
-            'label': 'Bočná reakce A → D',
-            'description': 'Bočná reakce, kde látka A se přemění na D.',
-            'type': 'Unimolecular',
-            'reactants': {'A': 1},
-            'products': {'D': 1},
-            'default_k': '0.03'
-        },
-        {
-            'label': 'Vratná reakce A ⇌ B',
-            'description': 'Vratná reakce mezi látkami A a B.',
-            'type': 'Reversible',
-            'reactants': {'A': 1},
-            'products': {'B': 1},
-            'default_k_forward': '0.05',
-            'default_k_reverse': '0.02'
-        },
-        {
-            'label': 'Katalytická reakce A → B (katalyzátor E)',
-            'description': 'Reakce, kde katalyzátor E urychluje přeměnu látky A na B.',
-            'type': 'Catalytic',
-            'reactants': {'A': 1},
-            'products': {'B': 1},
-            'catalyst': 'E',
-            'default_k': '0.1'
-        },
-        {
-            'label': 'Autokatalytická reakce A + B → 2B',
-            'description': 'Reakce, kde produkt B katalyzuje svou vlastní tvorbu.',
-            'type': 'Autocatalytic',
-            'reactants': {'A': 1, 'B': 1},
-            'products': {'B': 2},
-            'default_k': '0.02'
-        },
-        {
-            'label': 'Enzymatická reakce S + E → P + E',
-            'description': 'Enzymatická reakce, kde enzym E katalyzuje přeměnu substrátu S na produkt P.',
-            'type': 'Enzymatic',
-            'substrate': 'S',
-            'product': 'P',
-            'enzyme': 'E',
-            'default_k': '0.05'
-        },
-        {
-            'label': 'Michaelis-Menten kinetika S → P',
-            'description': 'Enzymatická reakce podle Michaelis-Mentenovy kinetiky.',
-            'type': 'MichaelisMenten',
-            'substrate': 'S',
-            'product': 'P',
-            'enzyme': 'E',
-            'default_vmax': '1.0',
-            'default_km': '10'
-        },
-        {
-            'label': 'Inhibovaná reakce A → B (inhibitor I)',
-            'description': 'Reakce, kde inhibitor I snižuje rychlost přeměny látky A na B.',
-            'type': 'Inhibitory',
-            'reactants': {'A': 1},
-            'products': {'B': 1},
-            'inhibitor': 'I',
-            'default_k': '0.1'
-        }
-    ]
-
-    # Rámec pro reakce
-    reaction_frame = ttk.LabelFrame(input_frame, text="Reakce")
-    reaction_frame.grid(row=0, column=1, padx=5, pady=5, sticky="nsew")
-
-    selected_reactions = []
-
-    # Funkce pro vytvoření tooltipu
-    def create_tooltip(widget, text):
-        tooltip = tk.Toplevel(widget)
-        tooltip.withdraw()
-        tooltip.overrideredirect(True)
-        label = ttk.Label(tooltip, text=text, background="lightyellow", relief="solid", borderwidth=1, wraplength=300)
-        label.pack()
-
-        def enter(event):
-            tooltip.deiconify()
-            x = widget.winfo_rootx() + 20
-            y = widget.winfo_rooty() + 20
-            tooltip.geometry(f"+{x}+{y}")
-
-        def leave(event):
-            tooltip.withdraw()
-
-        widget.bind("<Enter>", enter)
-        widget.bind("<Leave>", leave)
-
-    # Funkce pro aktualizaci vstupních polí reakcí
-    def update_reaction_entries():
-        for widget in reaction_frame.winfo_children():
-            widget.destroy()
-        ttk.Label(reaction_frame, text="Vyberte reakce pro simulaci:").grid(row=0, column=0, columnspan=5)
-        row = 1
-        for info in predefined_reactions:  # Opraveno, odstraněn idx
-            var = tk.BooleanVar()
-            chk = ttk.Checkbutton(reaction_frame, text=info['label'], variable=var)
-            chk.grid(row=row, column=0, sticky=tk.W)
-            info['selected'] = var
-
-            # Tooltip s popisem reakce
-            create_tooltip(chk, info['description'])
-
-            if info['type'] == 'Reversible':
-                ttk.Label(reaction_frame, text="k_forward:").grid(row=row, column=1)
-                entry_k_forward = ttk.Entry(reaction_frame, width=7)
-                entry_k_forward.insert(0, info['default_k_forward'])
-                entry_k_forward.grid(row=row, column=2)
-                info['entry_k_forward'] = entry_k_forward
-
-                ttk.Label(reaction_frame, text="k_reverse:").grid(row=row, column=3)
-                entry_k_reverse = ttk.Entry(reaction_frame, width=7)
-                entry_k_reverse.insert(0, info['default_k_reverse'])
-                entry_k_reverse.grid(row=row, column=4)
-                info['entry_k_reverse'] = entry_k_reverse
-            elif info['type'] == 'MichaelisMenten':
-                ttk.Label(reaction_frame, text="Vmax:").grid(row=row, column=1)
-                entry_vmax = ttk.Entry(reaction_frame, width=7)
-                entry_vmax.insert(0, info['default_vmax'])
-                entry_vmax.grid(row=row, column=2)
-                info['entry_vmax'] = entry_vmax
-
-                ttk.Label(reaction_frame, text="Km:").grid(row=row, column=3)
-                entry_km = ttk.Entry(reaction_frame, width=7)
-                entry_km.insert(0, info['default_km'])
-                entry_km.grid(row=row, column=4)
-                info['entry_km'] = entry_km
-
-                # Přidání vysvětlujícího popisku
-                ttk.Label(reaction_frame, text="(S = Substrát, P = Produkt, E = Enzym)").grid(row=row+1, column=0, columnspan=5)
-                row += 1
-
-                # Přidání tooltipů
-                create_tooltip(entry_vmax, "Vmax: Maximální rychlost reakce při plné saturaci enzymu substrátem.")
-                create_tooltip(entry_km, "Km: Michaelisova konstanta, koncentrace substrátu při polovině maximální rychlosti reakce.")
-            elif info['type'] == 'Catalytic':
-                ttk.Label(reaction_frame, text="k:").grid(row=row, column=1)
-                entry_k = ttk.Entry(reaction_frame, width=7)
-                entry_k.insert(0, info['default_k'])
-                entry_k.grid(row=row, column=2)
-                info['entry_k'] = entry_k
-
-                ttk.Label(reaction_frame, text=f"Katalyzátor: {info['catalyst']}").grid(row=row, column=3, columnspan=2)
-                # Přidání tooltipu
-                create_tooltip(chk, f"{info['description']} Katalyzátor: {info['catalyst']}")
-            elif info['type'] == 'Enzymatic':
-                ttk.Label(reaction_frame, text="k:").grid(row=row, column=1)
-                entry_k = ttk.Entry(reaction_frame, width=7)
-                entry_k.insert(0, info['default_k'])
-                entry_k.grid(row=row, column=2)
-                info['entry_k'] = entry_k
-
-                # Přidání vysvětlujícího popisku
-                ttk.Label(reaction_frame, text="(S = Substrát, P = Produkt, E = Enzym)").grid(row=row+1, column=0, columnspan=5)
-                row += 1
-
-                # Přidání tooltipu
-                create_tooltip(chk, info['description'])
-            else:
-                ttk.Label(reaction_frame, text="k:").grid(row=row, column=1)
-                entry_k = ttk.Entry(reaction_frame, width=7)
-                entry_k.insert(0, info.get('default_k', '0.1'))
-                entry_k.grid(row=row, column=2)
-                info['entry_k'] = entry_k
-
-                # Přidání tooltipu
-                create_tooltip(entry_k, "k: Rychlostní konstanta reakce.")
-            row += 1
-
-    update_reaction_entries()
-
-    # Parametry simulace
-    params_frame = ttk.LabelFrame(input_frame, text="Parametry simulace")
-    params_frame.grid(row=0, column=2, padx=5, pady=5, sticky="nsew")
-
-    ttk.Label(params_frame, text="Maximální čas simulace:").grid(row=0, column=0, sticky=tk.E)
-    entry_t_max = ttk.Entry(params_frame)
-    entry_t_max.insert(0, "100")
-    entry_t_max.grid(row=0, column=1)
-
-    # Tlačítko pro spuštění simulace
-    simulate_button = ttk.Button(input_frame, text="Spustit simulaci", command=lambda: run_simulation())
-    simulate_button.grid(row=1, column=0, columnspan=3, pady=10)
-
-    # Rámec pro graf
-    plot_frame = ttk.Frame(root)
-    plot_frame.pack(side=tk.BOTTOM, fill=tk.BOTH, expand=True)
-
-    def run_simulation():
-        try:
-            # Vytvoření látek
-            substances = {}
-            for info in substance_info:
-                amount = int(info['entry'].get())
-                substances[info['name']] = Substance(info['name'], amount)
-
-            # Doba simulace
-            t_max = float(entry_t_max.get())
-
-            # Vytvoření reakcí
-            reactions = []
-            for info in predefined_reactions:
-                if info['selected'].get():
-                    reaction_type = info['type']
-                    if reaction_type == 'Unimolecular':
-                        reactants = {substances[name]: coeff for name, coeff in info['reactants'].items()}
-                        products = {substances[name]: coeff for name, coeff in info['products'].items()}
-                        k = float(info['entry_k'].get())
-                        reaction = UnimolecularReaction(reactants, products, k)
-                    elif reaction_type == 'Bimolecular':
-                        reactants = {substances[name]: coeff for name, coeff in info['reactants'].items()}
-                        products = {substances[name]: coeff for name, coeff in info['products'].items()}
-                        k = float(info['entry_k'].get())
-                        reaction = BimolecularReaction(reactants, products, k)
-                    elif reaction_type == 'Trimolecular':
-                        reactants = {substances[name]: coeff for name, coeff in info['reactants'].items()}
-                        products = {substances[name]: coeff for name, coeff in info['products'].items()}
-                        k = float(info['entry_k'].get())
-                        reaction = TrimolecularReaction(reactants, products, k)
-                    elif reaction_type == 'Reversible':
-                        reactants = {substances[name]: coeff for name, coeff in info['reactants'].items()}
-                        products = {substances[name]: coeff for name, coeff in info['products'].items()}
-                        k_forward = float(info['entry_k_forward'].get())
-                        k_reverse = float(info['entry_k_reverse'].get())
-                        reaction = ReversibleReaction(reactants, products, k_forward, k_reverse)
-                    elif reaction_type == 'Catalytic':
-                        reactants = {substances[name]: coeff for name, coeff in info['reactants'].items()}
-                        products = {substances[name]: coeff for name, coeff in info['products'].items()}
-                        catalyst = substances[info['catalyst']]
-                        k = float(info['entry_k'].get())        
-                        reaction = CatalyticReaction(reactants, products, catalyst, k)
-                    elif reaction_type == 'Autocatalytic':
-                        reactants = {substances[name]: coeff for name, coeff in info['reactants'].items()}
-                        products = {substances[name]: coeff for name, coeff in info['products'].items()}
-                        k = float(info['entry_k'].get())
-                        reaction = AutocatalyticReaction(reactants, products, k)
-                    elif reaction_type == 'Enzymatic':
-                        substrate = substances[info['substrate']]
-                        product = substances[info['product']]
-                        enzyme = substances[info['enzyme']]
-                        k = float(info['entry_k'].get())
-                        reaction = EnzymaticReaction(substrate, product, enzyme, k)
-                    elif reaction_type == 'MichaelisMenten':
-                        substrate = substances[info['substrate']]
-                        product = substances[info['product']]
-                        enzyme = substances[info['enzyme']] 
-                        vmax = float(info['entry_vmax'].get())
-                        km = float(info['entry_km'].get())
-                        reaction = MichaelisMentenReaction(substrate, product, enzyme, vmax, km)
-                    elif reaction_type == 'Inhibitory':
-                        reactants = {substances[name]: coeff for name, coeff in info['reactants'].items()}
-                        products = {substances[name]: coeff for name, coeff in info['products'].items()}
-                        inhibitor = substances[info['inhibitor']]
-                        k = float(info['entry_k'].get())
-                        reaction = InhibitoryReaction(reactants, products, inhibitor, k)
-                    else:
-                        messagebox.showerror("Chyba", f"Neznámý typ reakce: {reaction_type}")
-                        return
-                    reactions.append(reaction)
-
-            if not reactions:
-                messagebox.showwarning("Upozornění", "Nevybrali jste žádné reakce pro simulaci.")
-                return
-
-        except Exception as e:
-            messagebox.showerror("Chyba", str(e))
-            return
-
-        # Spuštění simulace
-        times, history = gillespie_simulation(substances, reactions, t_max)
-
-        # Zobrazení výsledků
-        plot_results(times, history)
-
-    def plot_results(times, history):
-        # Vyčištění starého grafu
-        for widget in plot_frame.winfo_children():
-            widget.destroy()
-
-        # Vytvoření nového grafu
-        fig, ax = plt.subplots(figsize=(8, 4))
-
-        for substance_name, amounts in history.items():
-            ax.plot(times, amounts, label=substance_name)
-
-        ax.set_xlabel('Čas')
-        ax.set_ylabel('Množství molekul')
-        ax.legend()
-        ax.set_title('Simulace reakční kinetiky')
-
-        # Vložení grafu do Tkinter okna
-        canvas = FigureCanvasTkAgg(fig, master=plot_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-    root.mainloop()
-
-if __name__ == '__main__':
-    main()
+# main.py
+
+import matplotlib
+matplotlib.use('TkAgg')
+
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+from tkinter import messagebox
+from tkinter import filedialog
+import numpy as np
+from substance import Substance
+from model_file import build_reaction
+from simulation import simulate, simulation_stream, STREAM_METHODS
+from plotting import TrajectoryPlot
+from trajectory_file import TrajectoryReader
+from checkpoint import Checkpoint
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+# Interval dotazování na výsledky simulace (ms) a velikost části výstupu
+POLL_INTERVAL = 100
+CHUNK_SIZE = 2000
+
+def main():
+    root = tk.Tk()
+    root.title("Simulace reakční kinetiky")
+    root.geometry("1200x800")
+
+    # Rámec pro vstupní parametry
+    input_frame = ttk.Frame(root)
+    input_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
+
+    # Definice látek
+    substance_info = []
+
+    # Aktualizované názvy látek
+    initial_substances = ['A', 'B', 'C', 'D', 'E', 'F', 'S', 'P', 'E', 'I']  # S = Substrát, P = Produkt, E = Enzym, I = Inhibitor
+    for name in initial_substances:
+        substance_info.append({'name': name, 'label': name, 'default': '0'})
+
+    # Rámec pro látky
+    substance_frame = ttk.LabelFrame(input_frame, text="Látky")
+    substance_frame.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
+
+    # Funkce pro aktualizaci vstupních polí látek
+    def update_substance_entries():
+        for widget in substance_frame.winfo_children():
+            widget.destroy()
+        row = 0
+        ttk.Label(substance_frame, text="Počáteční množství látek:").grid(row=row, column=0, columnspan=2)
+        row += 1
+        for info in substance_info:
+            ttk.Label(substance_frame, text=f"{info['label']}:").grid(row=row, column=0, sticky=tk.E)
+            entry = ttk.Entry(substance_frame)
+            entry.insert(0, info['default'])
+            entry.grid(row=row, column=1)
+            info['entry'] = entry
+            row += 1
+
+    update_substance_entries()
+
+    # Definice předdefinovaných reakcí, včetně bočných a následných
+    predefined_reactions = [
+        {
+            'label': 'Unimolekulární rozklad A → B',
+            'description': 'Jednoduchá unimolekulární reakce, kde se látka A přemění na látku B.',
+            'type': 'Unimolecular',
+            'reactants': {'A': 1},
+            'products': {'B': 1},
+            'default_k': '0.1'
+        },
+        {
+            'label': 'Bimolekulární reakce A + B → C',
+            'description': 'Bimolekulární reakce, kde se látky A a B spojí za vzniku látky C.',
+            'type': 'Bimolecular',
+            'reactants': {'A': 1, 'B': 1},
+            'products': {'C': 1},
+            'default_k': '0.01'
+        },
+        {
+            'label': 'Následná reakce B → C',
+            'description': 'Následná reakce, kde látka B se přemění na látku C.',
+            'type': 'Unimolecular',
+            'reactants': {'B': 1},
+            'products': {'C': 1},
+            'default_k': '0.05'
+        },
+        {
+            'label': 'Bočná reakce A → D',
+            'description': 'Bočná reakce, kde látka A se přemění na D.',
+            'type': 'Unimolecular',
+            'reactants': {'A': 1},
+            'products': {'D': 1},
+            'default_k': '0.03'
+        },
+        {
+            'label': 'Vratná reakce A ⇌ B',
+            'description': 'Vratná reakce mezi látkami A a B.',
+            'type': 'Reversible',
+            'reactants': {'A': 1},
+            'products': {'B': 1},
+            'default_k_forward': '0.05',
+            'default_k_reverse': '0.02'
+        },
+        {
+            'label': 'Katalytická reakce A → B (katalyzátor E)',
+            'description': 'Reakce, kde katalyzátor E urychluje přeměnu látky A na B.',
+            'type': 'Catalytic',
+            'reactants': {'A': 1},
+            'products': {'B': 1},
+            'catalyst': 'E',
+            'default_k': '0.1'
+        },
+        {
+            'label': 'Autokatalytická reakce A + B → 2B',
+            'description': 'Reakce, kde produkt B katalyzuje svou vlastní tvorbu.',
+            'type': 'Autocatalytic',
+            'reactants': {'A': 1, 'B': 1},
+            'products': {'B': 2},
+            'default_k': '0.02'
+        },
+        {
+            'label': 'Enzymatická reakce S + E → P + E',
+            'description': 'Enzymatická reakce, kde enzym E katalyzuje přeměnu substrátu S na produkt P.',
+            'type': 'Enzymatic',
+            'substrate': 'S',
+            'product': 'P',
+            'enzyme': 'E',
+            'default_k': '0.05'
+        },
+        {
+            'label': 'Michaelis-Menten kinetika S → P',
+            'description': 'Enzymatická reakce podle Michaelis-Mentenovy kinetiky.',
+            'type': 'MichaelisMenten',
+            'substrate': 'S',
+            'product': 'P',
+            'enzyme': 'E',
+            'default_vmax': '1.0',
+            'default_km': '10'
+        },
+        {
+            'label': 'Inhibovaná reakce A → B (inhibitor I)',
+            'description': 'Reakce, kde inhibitor I snižuje rychlost přeměny látky A na B.',
+            'type': 'Inhibitory',
+            'reactants': {'A': 1},
+            'products': {'B': 1},
+            'inhibitor': 'I',
+            'default_k': '0.1'
+        }
+    ]
+
+    # Rámec pro reakce
+    reaction_frame = ttk.LabelFrame(input_frame, text="Reakce")
+    reaction_frame.grid(row=0, column=1, padx=5, pady=5, sticky="nsew")
+
+    selected_reactions = []
+
+    # Funkce pro vytvoření tooltipu
+    def create_tooltip(widget, text):
+        tooltip = tk.Toplevel(widget)
+        tooltip.withdraw()
+        tooltip.overrideredirect(True)
+        label = ttk.Label(tooltip, text=text, background="lightyellow", relief="solid", borderwidth=1, wraplength=300)
+        label.pack()
+
+        def enter(event):
+            tooltip.deiconify()
+            x = widget.winfo_rootx() + 20
+            y = widget.winfo_rooty() + 20
+            tooltip.geometry(f"+{x}+{y}")
+
+        def leave(event):
+            tooltip.withdraw()
+
+        widget.bind("<Enter>", enter)
+        widget.bind("<Leave>", leave)
+
+    # Funkce pro aktualizaci vstupních polí reakcí
+    def update_reaction_entries():
+        for widget in reaction_frame.winfo_children():
+            widget.destroy()
+        ttk.Label(reaction_frame, text="Vyberte reakce pro simulaci:").grid(row=0, column=0, columnspan=5)
+        row = 1
+        for info in predefined_reactions:  # Opraveno, odstraněn idx
+            var = tk.BooleanVar()
+            chk = ttk.Checkbutton(reaction_frame, text=info['label'], variable=var)
+            chk.grid(row=row, column=0, sticky=tk.W)
+            info['selected'] = var
+
+            # Tooltip s popisem reakce
+            create_tooltip(chk, info['description'])
+
+            if info['type'] == 'Reversible':
+                ttk.Label(reaction_frame, text="k_forward:").grid(row=row, column=1)
+                entry_k_forward = ttk.Entry(reaction_frame, width=7)
+                entry_k_forward.insert(0, info['default_k_forward'])
+                entry_k_forward.grid(row=row, column=2)
+                info['entry_k_forward'] = entry_k_forward
+
+                ttk.Label(reaction_frame, text="k_reverse:").grid(row=row, column=3)
+                entry_k_reverse = ttk.Entry(reaction_frame, width=7)
+                entry_k_reverse.insert(0, info['default_k_reverse'])
+                entry_k_reverse.grid(row=row, column=4)
+                info['entry_k_reverse'] = entry_k_reverse
+            elif info['type'] == 'MichaelisMenten':
+                ttk.Label(reaction_frame, text="Vmax:").grid(row=row, column=1)
+                entry_vmax = ttk.Entry(reaction_frame, width=7)
+                entry_vmax.insert(0, info['default_vmax'])
+                entry_vmax.grid(row=row, column=2)
+                info['entry_vmax'] = entry_vmax
+
+                ttk.Label(reaction_frame, text="Km:").grid(row=row, column=3)
+                entry_km = ttk.Entry(reaction_frame, width=7)
+                entry_km.insert(0, info['default_km'])
+                entry_km.grid(row=row, column=4)
+                info['entry_km'] = entry_km
+
+                # Přidání vysvětlujícího popisku
+                ttk.Label(reaction_frame, text="(S = Substrát, P = Produkt, E = Enzym)").grid(row=row+1, column=0, columnspan=5)
+                row += 1
+
+                # Přidání tooltipů
+                create_tooltip(entry_vmax, "Vmax: Maximální rychlost reakce při plné saturaci enzymu substrátem.")
+                create_tooltip(entry_km, "Km: Michaelisova konstanta, koncentrace substrátu při polovině maximální rychlosti reakce.")
+            elif info['type'] == 'Catalytic':
+                ttk.Label(reaction_frame, text="k:").grid(row=row, column=1)
+                entry_k = ttk.Entry(reaction_frame, width=7)
+                entry_k.insert(0, info['default_k'])
+                entry_k.grid(row=row, column=2)
+                info['entry_k'] = entry_k
+
+                ttk.Label(reaction_frame, text=f"Katalyzátor: {info['catalyst']}").grid(row=row, column=3, columnspan=2)
+                # Přidání tooltipu
+                create_tooltip(chk, f"{info['description']} Katalyzátor: {info['catalyst']}")
+            elif info['type'] == 'Enzymatic':
+                ttk.Label(reaction_frame, text="k:").grid(row=row, column=1)
+                entry_k = ttk.Entry(reaction_frame, width=7)
+                entry_k.insert(0, info['default_k'])
+                entry_k.grid(row=row, column=2)
+                info['entry_k'] = entry_k
+
+                # Přidání vysvětlujícího popisku
+                ttk.Label(reaction_frame, text="(S = Substrát, P = Produkt, E = Enzym)").grid(row=row+1, column=0, columnspan=5)
+                row += 1
+
+                # Přidání tooltipu
+                create_tooltip(chk, info['description'])
+            else:
+                ttk.Label(reaction_frame, text="k:").grid(row=row, column=1)
+                entry_k = ttk.Entry(reaction_frame, width=7)
+                entry_k.insert(0, info.get('default_k', '0.1'))
+                entry_k.grid(row=row, column=2)
+                info['entry_k'] = entry_k
+
+                # Přidání tooltipu
+                create_tooltip(entry_k, "k: Rychlostní konstanta reakce.")
+            row += 1
+
+    update_reaction_entries()
+
+    # Parametry simulace
+    params_frame = ttk.LabelFrame(input_frame, text="Parametry simulace")
+    params_frame.grid(row=0, column=2, padx=5, pady=5, sticky="nsew")
+
+    ttk.Label(params_frame, text="Maximální čas simulace:").grid(row=0, column=0, sticky=tk.E)
+    entry_t_max = ttk.Entry(params_frame)
+    entry_t_max.insert(0, "100")
+    entry_t_max.grid(row=0, column=1)
+
+    # Výběr simulační metody
+    simulation_methods = {
+        'Gillespieho algoritmus': 'gillespie',
+        'Metoda příští reakce': 'next_reaction',
+        'Přímá metoda se stromem součtů': 'sum_tree',
+        'Složení a zamítání (velké sítě)': 'composition_rejection',
+        'Kompilovaný model (NumPy)': 'compiled',
+        'Generovaný kód pro síť': 'generated',
+        'Tau-leaping (přibližná)': 'tau_leaping',
+        'Pomalá škála (rychlé rovnováhy)': 'slow_scale',
+        'Hybridní (rovnice + přesné kroky)': 'hybrid',
+        'Deterministický model (ODR)': 'ode',
+    }
+    ttk.Label(params_frame, text="Metoda simulace:").grid(row=1, column=0, sticky=tk.E)
+    method_var = tk.StringVar(value='Gillespieho algoritmus')
+    method_combo = ttk.Combobox(params_frame, textvariable=method_var, values=list(simulation_methods), state='readonly')
+    method_combo.grid(row=1, column=1)
+    create_tooltip(method_combo, "Deterministický model řeší rovnice reakční rychlosti a vrací střední průběh bez náhodných fluktuací.")
+
+    # Tlačítka pro spuštění a zrušení simulace, průběh simulace
+    control_frame = ttk.Frame(input_frame)
+    control_frame.grid(row=1, column=0, columnspan=3, pady=10)
+
+    simulate_button = ttk.Button(control_frame, text="Spustit simulaci", command=lambda: run_simulation())
+    simulate_button.grid(row=0, column=0, padx=5)
+
+    cancel_button = ttk.Button(control_frame, text="Zrušit", state='disabled', command=lambda: cancel_event.set())
+    cancel_button.grid(row=0, column=1, padx=5)
+
+    continue_button = ttk.Button(control_frame, text="Pokračovat", state='disabled', command=lambda: continue_simulation())
+    continue_button.grid(row=0, column=2, padx=5)
+    create_tooltip(continue_button, "Prodlouží poslední simulaci o zadanou dobu od místa, kde skončila.")
+
+    progress = ttk.Progressbar(control_frame, length=300, maximum=100)
+    progress.grid(row=0, column=3, padx=5)
+
+    status_label = ttk.Label(control_frame, text="")
+    status_label.grid(row=0, column=4, padx=5)
+
+    open_button = ttk.Button(control_frame, text="Otevřít záznam...", command=lambda: open_trajectory())
+    open_button.grid(row=0, column=5, padx=5)
+
+    # Rámec pro graf
+    plot_frame = ttk.Frame(root)
+    plot_frame.pack(side=tk.BOTTOM, fill=tk.BOTH, expand=True)
+
+    # Graf se vytvoří jednou a při simulaci se do něj jen přidávají data
+    fig = Figure(figsize=(8, 4))
+    ax = fig.add_subplot()
+    canvas = FigureCanvasTkAgg(fig, master=plot_frame)
+    # Panel nástrojů pro přiblížení a posun grafu
+    toolbar = NavigationToolbar2Tk(canvas, plot_frame)
+    toolbar.update()
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    # Výsledky předávané z pracovního vlákna a graf aktuální simulace
+    results = queue.Queue()
+    cancel_event = threading.Event()
+    plot_state = {'plot': None}
+    # Poslední simulace (model, metoda a kontrolní bod) pro pokračování
+    last_run = {'run': None}
+
+    def run_simulation():
+        try:
+            # Vytvoření látek
+            substances = {}
+            for info in substance_info:
+                amount = int(info['entry'].get())
+                substances[info['name']] = Substance(info['name'], amount)
+
+            # Doba simulace
+            t_max = float(entry_t_max.get())
+            method = simulation_methods[method_var.get()]
+
+            # Vytvoření reakcí z nabídky a zadaných rychlostních konstant
+            reactions = []
+            for info in predefined_reactions:
+                if info['selected'].get():
+                    spec = {key: value for key, value in info.items() if not key.startswith(('entry_', 'default_'))}
+                    for key in ('k', 'k_forward', 'k_reverse', 'vmax', 'km'):
+                        if f'entry_{key}' in info:
+                            spec[key] = float(info[f'entry_{key}'].get())
+                    reactions.append(build_reaction(spec, substances))
+
+            if not reactions:
+                messagebox.showwarning("Upozornění", "Nevybrali jste žádné reakce pro simulaci.")
+                return
+
+        except Exception as e:
+            messagebox.showerror("Chyba", str(e))
+            return
+
+        # Stochastické metody průběžně ukládají kontrolní bod, simulaci lze prodloužit
+        checkpoint = Checkpoint() if method in STREAM_METHODS else None
+        last_run['run'] = {'substances': substances, 'reactions': reactions, 'method': method,
+                           'checkpoint': checkpoint}
+        start_plot([substance.name for substance in substances.values()], steps=method != 'ode')
+        start_worker(0, t_max)
+
+    def continue_simulation():
+        # Prodloužení poslední simulace od uloženého kontrolního bodu, graf se doplňuje
+        run = last_run['run']
+        try:
+            duration = float(entry_t_max.get())
+        except ValueError as e:
+            messagebox.showerror("Chyba", str(e))
+            return
+        checkpoint = run['checkpoint']
+        start_worker(checkpoint.time, checkpoint.time + duration)
+
+    def start_worker(t_start, t_max):
+        # Spuštění simulace v pracovním vlákně, okno zůstává ovladatelné
+        run = last_run['run']
+        cancel_event.clear()
+        # Během simulace nelze otevřít záznam, části výsledků by se přidaly do jeho grafu
+        simulate_button.config(state='disabled')
+        continue_button.config(state='disabled')
+        open_button.config(state='disabled')
+        cancel_button.config(state='normal')
+        progress['value'] = 0
+        status_label.config(text="Simulace běží...")
+
+        worker = threading.Thread(target=simulation_worker,
+                                  args=(run['substances'], run['reactions'], t_max, run['method'], run['checkpoint']),
+                                  daemon=True)
+        worker.start()
+        root.after(POLL_INTERVAL, poll_results, t_start, t_max)
+
+    def simulation_worker(substances, reactions, t_max, method, checkpoint):
+        # Běží mimo hlavní vlákno, s Tkinterem a grafem komunikuje jen přes frontu
+        try:
+            if method in STREAM_METHODS:
+                stream = simulation_stream(substances, reactions, t_max, method=method, chunk_size=CHUNK_SIZE,
+                                           checkpoint=checkpoint)
+                try:
+                    for chunk in stream:
+                        results.put(('chunk', chunk))
+                        if cancel_event.is_set():
+                            break
+                finally:
+                    stream.close()
+            else:
+                times, history = simulate(substances, reactions, t_max, method=method)
+                states = np.column_stack([history[name] for name in history])
+                results.put(('chunk', (np.asarray(times), states)))
+        except Exception as e:
+            results.put(('error', str(e)))
+        results.put(('done', None))
+
+    def poll_results(t_start, t_max):
+        chunks = []
+        finished = False
+        try:
+            while True:
+                kind, payload = results.get_nowait()
+                if kind == 'chunk':
+                    chunks.append(payload)
+                elif kind == 'error':
+                    messagebox.showerror("Chyba", payload)
+                else:
+                    finished = True
+        except queue.Empty:
+            pass
+
+        if chunks:
+            times = np.concatenate([chunk[0] for chunk in chunks])
+            states = np.concatenate([chunk[1] for chunk in chunks])
+            plot_results(times, states)
+            if t_max > t_start:
+                progress['value'] = min(100, 100 * (times[-1] - t_start) / (t_max - t_start))
+
+        if finished:
+            simulate_button.config(state='normal')
+            open_button.config(state='normal')
+            cancel_button.config(state='disabled')
+            run = last_run['run']
+            if run is not None and run['checkpoint'] is not None and run['checkpoint'].started:
+                continue_button.config(state='normal')
+            if cancel_event.is_set():
+                status_label.config(text="Simulace zrušena")
+            else:
+                progress['value'] = 100
+                status_label.config(text="Simulace dokončena")
+        else:
+            root.after(POLL_INTERVAL, poll_results, t_start, t_max)
+
+    def start_plot(names, steps):
+        # Vyčištění grafu a vytvoření prázdných čar pro všechny látky
+        if plot_state['plot'] is not None:
+            plot_state['plot'].disconnect()
+        ax.clear()
+        plot_state['plot'] = TrajectoryPlot(ax, names, steps=steps)
+
+        ax.set_xlabel('Čas')
+        ax.set_ylabel('Množství molekul')
+        ax.legend()
+        ax.set_title('Simulace reakční kinetiky')
+        canvas.draw_idle()
+
+    def plot_results(times, states):
+        # Připojení nové části výsledků, čáry dostanou jen body pro šířku grafu
+        plot_state['plot'].append(times, states)
+        canvas.draw_idle()
+
+    def open_trajectory():
+        # Zobrazení uloženého záznamu (viz trajectory_file), data zůstávají v souboru
+        path = filedialog.askdirectory(title="Otevřít záznam simulace")
+        if not path:
+            return
+        try:
+            reader = TrajectoryReader(path)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Chyba", f"Záznam nelze otevřít: {e}")
+            return
+        last_run['run'] = None
+        continue_button.config(state='disabled')
+        start_plot(reader.names, steps=reader.dtype.kind in 'iu')
+        plot_state['plot'].set_data(reader.times, list(reader.history.values()))
+        canvas.draw_idle()
+        status_label.config(text=f"Záznam: {len(reader)} řádků")
+
+    root.mainloop()
+
+if __name__ == '__main__':
+    main()
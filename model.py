@@ -0,0 +1,491 @@
+# model.py
+
+import numpy as np
+from substance import SubstanceState
+from reaction import (
+    UnimolecularReaction, BimolecularReaction, TrimolecularReaction,
+    ReversibleReaction, CatalyticReaction, EnzymaticReaction,
+    MichaelisMentenReaction, AutocatalyticReaction, InhibitoryReaction
+)
+
+# Kódy typů rychlostních zákonů
+MASS_ACTION = 0        # k * součin klesajících faktoriálů množství reaktantů
+CATALYTIC = 1          # jako MASS_ACTION, navíc krát množství katalyzátoru
+POWER = 2              # k * součin mocnin množství reaktantů
+INHIBITORY = 3         # k * součin množství reaktantů / (1 + inhibitor)
+MICHAELIS_MENTEN = 4   # vmax * S / (km + S)
+
+class CompiledModel:
+    def __init__(self, substances, names):
+        """
+        Inicializuje prázdný kompilovaný model. Kanály reakcí se přidávají
+        metodou add_channel a model se dokončí metodou finalize.
+
+        Reakční kanál odpovídá jedné reakci, vratná reakce se rozkládá na dva
+        kanály (přímý a zpětný). Husté matice mají tvar (kanály, látky).
+
+        Parameters:
+        - substances: seznam objektů Substance v pořadí stavového vektoru
+        - names: seznam názvů látek ve stejném pořadí
+        """
+        self.substances = substances
+        self.names = names
+        self.index = {substance: i for i, substance in enumerate(substances)}
+        self._channels = []
+
+    def add_channel(self, kind, rate, reactants, products, source,
+                    orders=None, powers=None, modifier=None, offset=0.0):
+        """
+        Přidá reakční kanál.
+
+        Parameters:
+        - kind: kód typu rychlostního zákona
+        - rate: rychlostní konstanta (u Michaelis-Menten vmax)
+        - reactants, products: dict {Substance: koeficient}
+        - source: index původní reakce v seznamu reakcí
+        - orders: dict {Substance: řád} pro klesající faktoriál (výchozí reactants)
+        - powers: dict {Substance: exponent} pro mocninný zákon
+        - modifier: katalyzátor, inhibitor nebo substrát Michaelis-Menten
+        - offset: aditivní konstanta jmenovatele (1 u inhibice, km u Michaelis-Menten)
+        """
+        for substance in list(reactants) + list(products) + ([modifier] if modifier is not None else []):
+            if substance not in self.index:
+                raise ValueError(f"Látka {substance.name} reakce není mezi simulovanými látkami.")
+        self._channels.append({
+            'kind': kind,
+            'rate': rate,
+            'reactants': reactants,
+            'products': products,
+            'source': source,
+            'orders': orders if orders is not None else ({} if powers is not None else reactants),
+            'powers': powers if powers is not None else {},
+            'modifier': modifier,
+            'offset': offset,
+        })
+
+    def finalize(self):
+        """
+        Převede přidané kanály na pole NumPy.
+
+        Kanál závisí jen na několika látkách, pole proto obsahují pro každý
+        kanál jen jeho látky, doplněné na společnou šířku (látka 0 s nulovým
+        řádem, exponentem a změnou, která výsledek neovlivní). Výpočet
+        propencí a změn stavu tak stojí O(nenulových prvků), ne O(kanály × látky).
+        Husté matice tvaru (kanály, látky) se vytvoří až při prvním použití.
+        """
+        n_channels = len(self._channels)
+
+        self.kinds = np.zeros(n_channels, dtype=np.int64)
+        self.rates = np.zeros(n_channels)
+        self.modifiers = np.full(n_channels, -1, dtype=np.int64)
+        self.offsets = np.zeros(n_channels)
+        self.sources = np.zeros(n_channels, dtype=np.int64)
+
+        # Faktory propence (látka, řád, exponent, potřebné množství)
+        # a čisté změny stavu jednotlivých kanálů, látky vzestupně
+        factors = []
+        changes = []
+        for j, channel in enumerate(self._channels):
+            terms = {}
+            for key, values in (('reactants', channel['reactants']), ('orders', channel['orders']),
+                                ('powers', channel['powers'])):
+                for substance, value in values.items():
+                    entry = terms.setdefault(self.index[substance], {'reactants': 0, 'orders': 0, 'powers': 0})
+                    if key == 'reactants':
+                        entry[key] += value
+                    else:
+                        entry[key] = value
+            factors.append(sorted(terms.items()))
+            delta = {}
+            for substance, stoich in channel['reactants'].items():
+                delta[self.index[substance]] = delta.get(self.index[substance], 0) - stoich
+            for substance, stoich in channel['products'].items():
+                delta[self.index[substance]] = delta.get(self.index[substance], 0) + stoich
+            changes.append(sorted((i, d) for i, d in delta.items() if d != 0))
+
+            self.kinds[j] = channel['kind']
+            self.rates[j] = channel['rate']
+            if channel['modifier'] is not None:
+                self.modifiers[j] = self.index[channel['modifier']]
+            self.offsets[j] = channel['offset']
+            self.sources[j] = channel['source']
+        del self._channels
+
+        width = max((len(terms) for terms in factors), default=0)
+        self.factor_species = np.zeros((n_channels, width), dtype=np.int64)
+        self.factor_reactants = np.zeros((n_channels, width), dtype=np.int64)
+        self.factor_orders = np.zeros((n_channels, width), dtype=np.int64)
+        self.factor_powers = np.zeros((n_channels, width), dtype=np.int64)
+        for j, terms in enumerate(factors):
+            for k, (i, entry) in enumerate(terms):
+                self.factor_species[j, k] = i
+                self.factor_reactants[j, k] = entry['reactants']
+                self.factor_orders[j, k] = entry['orders']
+                self.factor_powers[j, k] = entry['powers']
+
+        # Čistá změna stavu po proběhnutí kanálu: doplněná pole tvaru
+        # (kanály, šířka) pro vektorové výpočty, seznam polí bez doplnění
+        # pro zápis do stavu a ploché pole nenulových změn pro součty přes kanály
+        width = max((len(delta) for delta in changes), default=0)
+        self.change_species = np.zeros((n_channels, width), dtype=np.int64)
+        self.change_deltas = np.zeros((n_channels, width), dtype=np.int64)
+        for j, delta in enumerate(changes):
+            for k, (i, d) in enumerate(delta):
+                self.change_species[j, k] = i
+                self.change_deltas[j, k] = d
+        self.changes = [(np.array([i for i, _ in delta], dtype=np.int64),
+                         np.array([d for _, d in delta], dtype=np.int64)) for delta in changes]
+        # Kanály jako n-tice čísel Pythonu pro výpočet po jednotlivých kanálech
+        # (viz channel_propensity) a zápis změn do stavu bez skalárů NumPy
+        self.channel_terms = [tuple((i, entry['reactants'], entry['orders'], entry['powers'])
+                                    for i, entry in terms) for terms in factors]
+        self.channel_changes = [tuple(delta) for delta in changes]
+        nonzero = self.change_deltas != 0
+        self._change_channels = np.nonzero(nonzero)[0]
+        self._change_species = self.change_species[nonzero]
+        self._change_deltas = self.change_deltas[nonzero]
+
+        self.max_order = int(self.factor_orders.max()) if self.factor_orders.size else 0
+        self._order_masks = [self.factor_orders > i for i in range(self.max_order)]
+        self._dense = {}
+
+        # Předpočítané masky podle typu zákona
+        self._multiplied = self.kinds == CATALYTIC
+        self._divided = (self.kinds == INHIBITORY) | (self.kinds == MICHAELIS_MENTEN)
+        self._has_powers = bool(self.factor_powers.any())
+        self._kinds = self.kinds.tolist()
+        self._rates = self.rates.tolist()
+        self._modifiers = self.modifiers.tolist()
+        self._offsets = self.offsets.tolist()
+        return self
+
+    def _dense_matrix(self, name, species, values):
+        # Hustá matice tvaru (kanály, látky) z doplněných polí, vytvoří se jednou
+        if name not in self._dense:
+            matrix = np.zeros((self.n_channels, self.n_species), dtype=np.int64)
+            rows = np.repeat(np.arange(self.n_channels), species.shape[1])
+            np.add.at(matrix, (rows, species.ravel()), values.ravel())
+            self._dense[name] = matrix
+        return self._dense[name]
+
+    @property
+    def reactant_matrix(self):
+        """
+        Hustá matice stechiometrických koeficientů reaktantů tvaru (kanály, látky).
+        """
+        return self._dense_matrix('reactants', self.factor_species, self.factor_reactants)
+
+    @property
+    def orders(self):
+        return self._dense_matrix('orders', self.factor_species, self.factor_orders)
+
+    @property
+    def powers(self):
+        return self._dense_matrix('powers', self.factor_species, self.factor_powers)
+
+    @property
+    def stoichiometry(self):
+        """
+        Hustá matice čistých změn stavu tvaru (kanály, látky). Simulační
+        metody místo ní používají řídká pole (changes, net_change).
+        """
+        return self._dense_matrix('stoichiometry', self.change_species, self.change_deltas)
+
+    @property
+    def product_matrix(self):
+        return self.stoichiometry + self.reactant_matrix
+
+    def net_change(self, counts):
+        """
+        Vrací změnu stavu po counts[j] proběhnutích kanálu j (counts @ stoichiometry)
+        bez husté matice.
+
+        Parameters:
+        - counts: pole tvaru (kanály,), může být reálné (např. rychlosti)
+
+        Returns:
+        - reálné pole tvaru (látky,)
+        """
+        weights = np.asarray(counts, dtype=float)[self._change_channels] * self._change_deltas
+        return np.bincount(self._change_species, weights, self.n_species)
+
+    def gross_change(self, counts, power=1):
+        """
+        Vrací součet counts[j] * |změna|^power přes kanály pro každou látku
+        (např. rozptyl změny stavu v tau-leapingu pro power=2).
+        """
+        weights = np.asarray(counts, dtype=float)[self._change_channels] * np.abs(self._change_deltas) ** power
+        return np.bincount(self._change_species, weights, self.n_species)
+
+    def channel_species(self, channel):
+        """
+        Vrací látky, na kterých závisí propence kanálu (reaktanty, látky
+        zákona a modifikátor), vzestupně.
+        """
+        used = (self.factor_reactants[channel] > 0) | (self.factor_orders[channel] > 0) | \
+               (self.factor_powers[channel] > 0)
+        species = set(self.factor_species[channel, used].tolist())
+        if self.modifiers[channel] >= 0:
+            species.add(int(self.modifiers[channel]))
+        return sorted(species)
+
+    def dependents(self):
+        """
+        Pro každý kanál vrací kanály, jejichž propence se změní jeho
+        proběhnutím (kanály, které čtou některou ze změněných látek), vzestupně.
+        """
+        # Pro každou látku kanály, jejichž propence na ní závisí
+        readers = {}
+        for k in range(self.n_channels):
+            for i in self.channel_species(k):
+                readers.setdefault(i, set()).add(k)
+
+        graph = []
+        for delta in self.channel_changes:
+            affected = set()
+            for i, _ in delta:
+                affected |= readers.get(i, set())
+            graph.append(sorted(affected))
+        return graph
+
+    def channel_propensity(self, values, channel):
+        """
+        Vypočítá propenci jednoho kanálu z množství látek bez NumPy
+        (pro průběžný přepočet jen závislých kanálů po proběhnutí reakce).
+
+        Parameters:
+        - values: množství látek indexovatelná čísly látek (např. SubstanceState.values)
+        - channel: index kanálu
+
+        Returns:
+        - propence kanálu (stejná jako prvek propensities)
+        """
+        # Součiny ve stejném pořadí jako v propensities, výsledek je shodný
+        product = 1.0
+        for i, reactants, order, power in self.channel_terms[channel]:
+            amount = values[i]
+            if amount < reactants:
+                return 0.0
+            factor = 1.0
+            for n in range(order):
+                factor *= amount - n
+            if power:
+                factor *= amount ** power
+            product *= factor
+        propensity = self._rates[channel] * product
+        kind = self._kinds[channel]
+        if kind == CATALYTIC:
+            propensity *= values[self._modifiers[channel]]
+        elif kind == INHIBITORY or kind == MICHAELIS_MENTEN:
+            denominator = self._offsets[channel] + values[self._modifiers[channel]]
+            if denominator == 0:
+                return 0.0
+            propensity /= denominator
+        return propensity
+
+    @property
+    def n_species(self):
+        return len(self.names)
+
+    @property
+    def n_channels(self):
+        return len(self.kinds)
+
+    def initial_state(self):
+        """
+        Vrací stavový vektor s aktuálním množstvím látek.
+        """
+        return np.array([substance.amount for substance in self.substances], dtype=np.int64)
+
+    def shared_state(self):
+        """
+        Naváže látky na společné pole (viz substance.SubstanceState) a vrací
+        ho jako stavový vektor bez kopírování. Změny vektoru se přímo
+        projeví v množství látek.
+        """
+        return SubstanceState(self.substances).array
+
+    def store(self, state):
+        """
+        Zapíše stavový vektor zpět do objektů Substance.
+        """
+        for substance, amount in zip(self.substances, state):
+            substance.amount = int(amount)
+
+    def propensities(self, state):
+        """
+        Vypočítá propence všech kanálů jedním vektorizovaným průchodem.
+
+        Parameters:
+        - state: stavový vektor tvaru (látky,) nebo dávka stavů (..., látky)
+
+        Returns:
+        - pole propencí tvaru (kanály,) nebo (..., kanály)
+        """
+        x = np.asarray(state, dtype=float)
+        # Množství látek faktorů, tvar (..., kanály, šířka)
+        xs = x[..., self.factor_species]
+
+        # Klesající faktoriál x (x - 1) ... (x - řád + 1)
+        factors = np.ones(xs.shape)
+        for i, mask in enumerate(self._order_masks):
+            factors *= np.where(mask, xs - i, 1.0)
+        if self._has_powers:
+            factors *= xs ** self.factor_powers
+        prop = self.rates * np.prod(factors, axis=-1)
+
+        # Reakce může proběhnout jen při dostatku reaktantů
+        prop *= np.all(xs >= self.factor_reactants, axis=-1)
+
+        if self.modifiers.size:
+            modifier = x[..., self.modifiers]
+            prop *= np.where(self._multiplied, modifier, 1.0)
+            denominator = np.where(self._divided, self.offsets + modifier, 1.0)
+            prop = np.divide(prop, denominator, out=np.zeros_like(prop), where=denominator != 0)
+        return prop
+
+    def _factor_terms(self, x, deterministic=False):
+        """
+        Vrací hodnoty a derivace součinových faktorů propence pro spojitý
+        stav x (bez prahu dostatku reaktantů), obojí tvaru (kanály, šířka)
+        jako factor_species. V deterministickém režimu se klesající
+        faktoriál x (x - 1) ... nahradí mocninou x^řád (limita velkého
+        počtu molekul).
+        """
+        xs = x[self.factor_species]
+        if deterministic:
+            exponents = self.factor_orders + self.factor_powers
+            value = xs ** exponents
+            derivative = exponents * xs ** np.maximum(exponents - 1, 0)
+            return value, derivative
+
+        value = np.ones(xs.shape)
+        derivative = np.zeros(xs.shape)
+        for i, mask in enumerate(self._order_masks):
+            term = np.where(mask, xs - i, 1.0)
+            derivative = derivative * term + np.where(mask, value, 0.0)
+            value = value * term
+        if self._has_powers:
+            powers = self.factor_powers
+            term = xs ** powers
+            derivative = derivative * term + value * powers * xs ** np.maximum(powers - 1, 0)
+            value = value * term
+        return value, derivative
+
+    def _modifier_terms(self, x):
+        # Násobitel (katalyzátor) a jmenovatel (inhibitor, Michaelis-Menten)
+        modifier = x[self.modifiers]
+        multiplier = np.where(self._multiplied, modifier, 1.0)
+        denominator = np.where(self._divided, self.offsets + modifier, 1.0)
+        denominator = np.where(denominator != 0, denominator, np.inf)
+        return multiplier, denominator
+
+    def deterministic_rates(self, state):
+        """
+        Vypočítá rychlosti kanálů deterministického (středního) modelu.
+
+        Parameters:
+        - state: spojitý stavový vektor tvaru (látky,)
+
+        Returns:
+        - pole rychlostí tvaru (kanály,)
+        """
+        x = np.asarray(state, dtype=float)
+        value, _ = self._factor_terms(x, deterministic=True)
+        multiplier, denominator = self._modifier_terms(x)
+        return self.rates * np.prod(value, axis=1) * multiplier / denominator
+
+    def propensity_jacobian(self, state, deterministic=False):
+        """
+        Vypočítá analytickou Jacobiho matici propencí podle stavu.
+
+        Stav se bere jako spojitý a práh dostatku reaktantů se neuplatňuje,
+        matice je tedy derivací hladkého rychlostního zákona.
+
+        Parameters:
+        - state: stavový vektor tvaru (látky,)
+        - deterministic: derivovat rychlosti deterministic_rates místo propencí
+
+        Returns:
+        - matice tvaru (kanály, látky) s prvky d a_j / d x_s
+        """
+        x = np.asarray(state, dtype=float)
+        value, derivative = self._factor_terms(x, deterministic)
+        n_channels = self.n_channels
+
+        # Součin faktorů všech ostatních látek kanálu (zleva a zprava)
+        ones = np.ones((n_channels, 1))
+        left = np.cumprod(np.hstack([ones, value[:, :-1]]), axis=1)
+        right = np.cumprod(np.hstack([ones, value[:, :0:-1]]), axis=1)[:, ::-1]
+        product = np.prod(value, axis=1)
+        multiplier, denominator = self._modifier_terms(x)
+
+        scale = self.rates * multiplier / denominator
+        jacobian = np.zeros((n_channels, self.n_species))
+        rows = np.repeat(np.arange(n_channels), self.factor_species.shape[1])
+        np.add.at(jacobian, (rows, self.factor_species.ravel()),
+                  ((scale[:, None] * derivative) * left * right).ravel())
+
+        # Příspěvek katalyzátoru, inhibitoru a jmenovatele Michaelis-Menten
+        rows = np.flatnonzero(self._multiplied)
+        np.add.at(jacobian, (rows, self.modifiers[rows]),
+                  self.rates[rows] * product[rows] / denominator[rows])
+        rows = np.flatnonzero(self._divided)
+        np.add.at(jacobian, (rows, self.modifiers[rows]),
+                  -scale[rows] * product[rows] / denominator[rows])
+        return jacobian
+
+def compile_model(substances, reactions):
+    """
+    Převede látky a reakce na kompilovaný model nad poli NumPy.
+
+    Parameters:
+    - substances: dict {název: Substance}
+    - reactions: seznam reakcí
+
+    Returns:
+    - CompiledModel
+    """
+    model = CompiledModel(list(substances.values()), [s.name for s in substances.values()])
+
+    for source, reaction in enumerate(reactions):
+        if isinstance(reaction, ReversibleReaction):
+            model.add_channel(MASS_ACTION, reaction.k_forward, reaction.reactants,
+                              reaction.products, source)
+            model.add_channel(MASS_ACTION, reaction.k_reverse, reaction.products,
+                              reaction.reactants, source)
+        elif isinstance(reaction, CatalyticReaction):
+            model.add_channel(CATALYTIC, reaction.k, reaction.reactants, reaction.products,
+                              source, modifier=reaction.catalyst)
+        elif isinstance(reaction, InhibitoryReaction):
+            powers = {substance: 1 for substance in reaction.reactants}
+            model.add_channel(INHIBITORY, reaction.k, reaction.reactants, reaction.products,
+                              source, powers=powers, modifier=reaction.inhibitor, offset=1.0)
+        elif isinstance(reaction, MichaelisMentenReaction):
+            model.add_channel(MICHAELIS_MENTEN, reaction.vmax, reaction.reactants,
+                              reaction.products, source, powers={reaction.substrate: 1},
+                              modifier=reaction.substrate, offset=reaction.km)
+        elif isinstance(reaction, BimolecularReaction):
+            if len(reaction.reactants) != 2:
+                raise ValueError("Bimolekulární reakce musí mít přesně dva reaktanty.")
+            powers = {substance: 1 for substance in reaction.reactants}
+            model.add_channel(POWER, reaction.k, reaction.reactants, reaction.products,
+                              source, powers=powers)
+        elif isinstance(reaction, TrimolecularReaction):
+            if len(reaction.reactants) != 3:
+                raise ValueError("Trimolekulární reakce musí mít přesně tři reaktanty.")
+            model.add_channel(POWER, reaction.k, reaction.reactants, reaction.products,
+                              source, powers=reaction.reactants)
+        elif isinstance(reaction, AutocatalyticReaction):
+            if len(reaction.reactants) != 2 or len(reaction.products) != 1:
+                raise ValueError("Autokatalytická reakce musí mít 2 reaktanty a 1 produkt.")
+            orders = {substance: 1 for substance in reaction.reactants}
+            model.add_channel(MASS_ACTION, reaction.k, reaction.reactants, reaction.products,
+                              source, orders=orders)
+        elif isinstance(reaction, (UnimolecularReaction, EnzymaticReaction)):
+            model.add_channel(MASS_ACTION, reaction.k, reaction.reactants, reaction.products,
+                              source)
+        else:
+            raise TypeError(f"Reakci typu {type(reaction).__name__} nelze zkompilovat.")
+
+    return model.finalize()
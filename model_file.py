@@ -0,0 +1,95 @@
+# model_file.py
+
+import json
+from substance import Substance
+from reaction import (
+    UnimolecularReaction, BimolecularReaction, TrimolecularReaction,
+    ReversibleReaction, CatalyticReaction, EnzymaticReaction,
+    MichaelisMentenReaction, AutocatalyticReaction, InhibitoryReaction
+)
+
+# Typy reakcí (stejné názvy jako v nabídce reakcí v GUI)
+REACTION_TYPES = [
+    'Unimolecular', 'Bimolecular', 'Trimolecular', 'Reversible', 'Catalytic',
+    'Autocatalytic', 'Enzymatic', 'MichaelisMenten', 'Inhibitory',
+]
+
+def build_reaction(spec, substances):
+    """
+    Vytvoří reakci z popisu.
+
+    Parameters:
+    - spec: dict s klíčem 'type' (viz REACTION_TYPES) a parametry reakce:
+      'reactants' a 'products' ({název: koeficient}), rychlostní konstanty
+      'k', 'k_forward', 'k_reverse', 'vmax', 'km' a názvy látek 'catalyst',
+      'inhibitor', 'substrate', 'product', 'enzyme' podle typu reakce
+    - substances: dict {název: Substance}
+
+    Returns:
+    - objekt reakce
+    """
+    reaction_type = spec.get('type')
+    try:
+        if reaction_type in ('Unimolecular', 'Bimolecular', 'Trimolecular', 'Reversible',
+                             'Catalytic', 'Autocatalytic', 'Inhibitory'):
+            reactants = {substances[name]: coeff for name, coeff in spec['reactants'].items()}
+            products = {substances[name]: coeff for name, coeff in spec['products'].items()}
+        if reaction_type == 'Unimolecular':
+            return UnimolecularReaction(reactants, products, float(spec['k']))
+        if reaction_type == 'Bimolecular':
+            return BimolecularReaction(reactants, products, float(spec['k']))
+        if reaction_type == 'Trimolecular':
+            return TrimolecularReaction(reactants, products, float(spec['k']))
+        if reaction_type == 'Reversible':
+            return ReversibleReaction(reactants, products, float(spec['k_forward']), float(spec['k_reverse']))
+        if reaction_type == 'Catalytic':
+            return CatalyticReaction(reactants, products, substances[spec['catalyst']], float(spec['k']))
+        if reaction_type == 'Autocatalytic':
+            return AutocatalyticReaction(reactants, products, float(spec['k']))
+        if reaction_type == 'Inhibitory':
+            return InhibitoryReaction(reactants, products, substances[spec['inhibitor']], float(spec['k']))
+        if reaction_type == 'Enzymatic':
+            return EnzymaticReaction(substances[spec['substrate']], substances[spec['product']],
+                                     substances[spec['enzyme']], float(spec['k']))
+        if reaction_type == 'MichaelisMenten':
+            return MichaelisMentenReaction(substances[spec['substrate']], substances[spec['product']],
+                                           substances[spec['enzyme']], float(spec['vmax']), float(spec['km']))
+    except KeyError as e:
+        raise ValueError(f"Reakce typu {reaction_type}: chybí parametr nebo neznámá látka {e}") from None
+    raise ValueError(f"Neznámý typ reakce: {reaction_type}")
+
+def parse_model(data):
+    """
+    Sestaví látky a reakce z popisu modelu.
+
+    Parameters:
+    - data: dict s klíči 'substances' ({název: počáteční množství}),
+      'reactions' (seznam popisů reakcí, viz build_reaction) a volitelně
+      nastavením simulace ('t_max', 'method', ...)
+
+    Returns:
+    - substances: dict {název: Substance}
+    - reactions: seznam reakcí
+    - settings: ostatní položky popisu
+    """
+    substances = {name: Substance(name, int(amount)) for name, amount in data['substances'].items()}
+    reactions = [build_reaction(spec, substances) for spec in data.get('reactions', [])]
+    settings = {key: value for key, value in data.items() if key not in ('substances', 'reactions')}
+    return substances, reactions, settings
+
+def load_model(path):
+    """
+    Načte model ze souboru JSON (viz parse_model).
+
+    Příklad:
+        {
+            "substances": {"S": 100, "P": 0, "E": 10},
+            "reactions": [
+                {"type": "MichaelisMenten", "substrate": "S", "product": "P",
+                 "enzyme": "E", "vmax": 1.0, "km": 10}
+            ],
+            "t_max": 200
+        }
+    """
+    with open(path, encoding='utf-8') as f:
+        return parse_model(json.load(f))
@@ -0,0 +1,260 @@
+# online_stats.py
+
+import numpy as np
+
+class QuantileSketch:
+    def __init__(self, shape, size=128, rng=None):
+        """
+        Přibližné kvantily pro pole hodnot bez ukládání všech vzorků
+        (kompaktory podle Karnina, Langa a Libertyho, KLL).
+
+        Vzorky se ukládají do úrovní. Když se úroveň naplní, seřadí se
+        a každý druhý prvek (s náhodným posunem) se přesune o úroveň výš
+        s dvojnásobnou vahou. Paměť roste jen logaritmicky s počtem vzorků,
+        chyba pořadí kvantilu je řádově 1/size. Do size vzorků jsou kvantily
+        přesné. Všechny prvky pole (např. látky a časy mřížky) dostávají
+        vzorky současně, úrovně se proto kompaktují vektorově pro celé pole.
+
+        Parameters:
+        - shape: tvar pole, pro jehož prvky se kvantily počítají
+        - size: kapacita úrovně (přesnost kvantilů)
+        - rng: numpy.random.Generator nebo seed pro posuny kompaktorů
+        """
+        self.shape = tuple(shape)
+        self.size = size
+        self.rng = np.random.default_rng(rng)
+        self.count = 0
+        # Úroveň i obsahuje pole tvaru (*shape, počet) s vahou 2^i
+        self.levels = [np.empty(self.shape + (0,))]
+
+    def add(self, values):
+        """
+        Přidá jeden vzorek pro každý prvek pole.
+        """
+        values = np.asarray(values, dtype=float).reshape(self.shape + (1,))
+        self.levels[0] = np.concatenate([self.levels[0], values], axis=-1)
+        self.count += 1
+        self._compress()
+
+    def merge(self, other):
+        """
+        Připojí vzorky jiného náčrtu stejného tvaru (např. z jiného procesu).
+        """
+        if other.shape != self.shape:
+            raise ValueError("Náčrty kvantilů mají různý tvar.")
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(self.shape + (0,)))
+            self.levels[level] = np.concatenate([self.levels[level], items], axis=-1)
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.shape[-1] >= self.size:
+                # Sudý počet seřazených prvků se zkompaktuje, lichý zbytek zůstane
+                items = np.sort(items, axis=-1)
+                n_pairs = items.shape[-1] // 2
+                offset = int(self.rng.integers(2))
+                promoted = items[..., offset:2 * n_pairs:2]
+                self.levels[level] = items[..., 2 * n_pairs:]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(self.shape + (0,)))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted], axis=-1)
+            level += 1
+
+    def quantiles(self, qs):
+        """
+        Vrací odhad kvantilů.
+
+        Parameters:
+        - qs: kvantily v intervalu [0, 1]
+
+        Returns:
+        - pole tvaru (len(qs), *shape)
+        """
+        values = np.concatenate(self.levels, axis=-1)
+        weights = np.concatenate([np.full(items.shape[-1], 2.0 ** level) for level, items in enumerate(self.levels)])
+        if values.shape[-1] == 0:
+            return np.full((len(qs),) + self.shape, np.nan)
+        order = np.argsort(values, axis=-1)
+        values = np.take_along_axis(values, order, axis=-1)
+        cumulative = np.cumsum(weights[order], axis=-1)
+        total = cumulative[..., -1:]
+        result = []
+        for q in qs:
+            # První hodnota, jejíž kumulativní váha dosáhne q-násobku celku
+            index = np.sum(cumulative < q * total, axis=-1, keepdims=True)
+            index = np.minimum(index, values.shape[-1] - 1)
+            result.append(np.take_along_axis(values, index, axis=-1)[..., 0])
+        return np.array(result)
+
+class GridSampler:
+    def __init__(self, grid, n_species):
+        """
+        Převádí průběžný výstup jedné trajektorie (části times, states) na
+        hodnoty v časech mřížky, stejně jako recording.GridRecorder: hodnota
+        v čase mřížky je stav po poslední reakci nejpozději v tomto čase.
+
+        Parameters:
+        - grid: rostoucí posloupnost časů
+        - n_species: počet látek
+        """
+        self.grid = np.asarray(grid, dtype=float)
+        self.values = np.zeros((n_species, len(self.grid)))
+        self._next = 0
+        self._last = None
+
+    def add(self, times, states):
+        """
+        Zpracuje další část trajektorie.
+
+        Parameters:
+        - times: pole časů tvaru (řádky,)
+        - states: pole stavů tvaru (řádky, látky)
+        """
+        if len(times) == 0:
+            return
+        grid = self.grid
+        # Body mřížky před posledním časem části jsou už určené
+        end = np.searchsorted(grid, times[-1], side='left')
+        if end > self._next:
+            rows = np.searchsorted(times, grid[self._next:end], side='right') - 1
+            resolved = np.asarray(states, dtype=float)[np.maximum(rows, 0)].T
+            if self._last is not None:
+                resolved[:, rows < 0] = self._last[:, None]
+            self.values[:, self._next:end] = resolved
+            self._next = end
+        self._last = np.asarray(states[-1], dtype=float)
+
+    def finish(self):
+        """
+        Doplní zbývající body mřížky posledním stavem a vrací hodnoty
+        tvaru (látky, časy).
+        """
+        if self._last is not None:
+            self.values[:, self._next:] = self._last[:, None]
+        self._next = len(self.grid)
+        return self.values
+
+class GridAccumulator:
+    def __init__(self, grid, names, percentiles=(5, 50, 95), sketch_size=128, rng=None):
+        """
+        Průběžné statistiky souboru trajektorií na pevné časové mřížce bez
+        ukládání jednotlivých trajektorií.
+
+        Pro každou látku a čas mřížky se udržuje střední hodnota a rozptyl
+        (Welfordův algoritmus, numericky stabilní), minimum, maximum
+        a přibližné kvantily (viz QuantileSketch). Paměť je O(mřížka × látky)
+        bez ohledu na počet replikací. Akumulátory z více procesů se spojí
+        metodou merge.
+
+        Parameters:
+        - grid: společná časová mřížka
+        - names: názvy látek
+        - percentiles: percentily vlastnosti percentiles (0-100)
+        - sketch_size: přesnost odhadu kvantilů (viz QuantileSketch)
+        - rng: seed pro náčrt kvantilů
+        """
+        self.grid = np.asarray(grid, dtype=float)
+        self.names = list(names)
+        self.percentile_levels = list(percentiles)
+        shape = (len(self.names), len(self.grid))
+        self.n_replicates = 0
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self._min = np.full(shape, np.inf)
+        self._max = np.full(shape, -np.inf)
+        self.sketch = QuantileSketch(shape, sketch_size, rng)
+
+    def add_grid(self, values):
+        """
+        Přidá jednu trajektorii danou hodnotami na mřížce.
+
+        Parameters:
+        - values: pole tvaru (látky, časy) nebo dict {název: pole na mřížce}
+        """
+        if isinstance(values, dict):
+            values = [values[name] for name in self.names]
+        values = np.asarray(values, dtype=float)
+        self.n_replicates += 1
+        delta = values - self._mean
+        self._mean += delta / self.n_replicates
+        self._m2 += delta * (values - self._mean)
+        np.minimum(self._min, values, out=self._min)
+        np.maximum(self._max, values, out=self._max)
+        self.sketch.add(values)
+
+    def add(self, times, history):
+        """
+        Přidá trajektorii ve tvaru výsledku simulace (times, history).
+        """
+        sampler = GridSampler(self.grid, len(self.names))
+        sampler.add(np.asarray(times), np.column_stack([np.asarray(history[name]) for name in self.names]))
+        self.add_grid(sampler.finish())
+
+    def add_stream(self, stream):
+        """
+        Přidá trajektorii z proudové simulace (viz simulation.simulation_stream),
+        části se zpracují průběžně a neukládají se. Sloupce musí odpovídat names.
+        """
+        sampler = GridSampler(self.grid, len(self.names))
+        for times, states in stream:
+            sampler.add(times, states)
+        self.add_grid(sampler.finish())
+
+    def merge(self, other):
+        """
+        Připojí statistiky jiného akumulátoru se stejnou mřížkou a látkami
+        (Chanův vzorec pro spojení středních hodnot a rozptylů).
+        """
+        if other.names != self.names or not np.array_equal(other.grid, self.grid):
+            raise ValueError("Akumulátory mají různé látky nebo mřížku.")
+        if other.n_replicates == 0:
+            return self
+        n_a, n_b = self.n_replicates, other.n_replicates
+        n = n_a + n_b
+        delta = other._mean - self._mean
+        self._mean += delta * (n_b / n)
+        self._m2 += other._m2 + delta ** 2 * (n_a * n_b / n)
+        self.n_replicates = n
+        np.minimum(self._min, other._min, out=self._min)
+        np.maximum(self._max, other._max, out=self._max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def _by_name(self, values):
+        return {name: values[i] for i, name in enumerate(self.names)}
+
+    @property
+    def mean(self):
+        return self._by_name(self._mean)
+
+    @property
+    def variance(self):
+        # Výběrový rozptyl jako v ensemble.EnsembleResult
+        if self.n_replicates < 2:
+            return self._by_name(np.zeros_like(self._mean))
+        return self._by_name(self._m2 / (self.n_replicates - 1))
+
+    @property
+    def minimum(self):
+        return self._by_name(self._min)
+
+    @property
+    def maximum(self):
+        return self._by_name(self._max)
+
+    @property
+    def percentiles(self):
+        """
+        Přibližná percentilová pásma {percentil: {název: pole}} ve stejném
+        tvaru jako ensemble.EnsembleResult.percentiles.
+        """
+        bands = self.sketch.quantiles([q / 100 for q in self.percentile_levels])
+        return {q: self._by_name(band) for q, band in zip(self.percentile_levels, bands)}
+
+    def __repr__(self):
+        return f"GridAccumulator({self.n_replicates} replikací, {len(self.names)} látek, {len(self.grid)} časů)"
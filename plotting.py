@@ -0,0 +1,297 @@
+# plotting.py
+
+import numpy as np
+
+def decimate(times, values, t_start, t_end, n_buckets):
+    """
+    Zmenší počet bodů trajektorie pro vykreslení na šířku n_buckets pixelů.
+
+    Časový úsek se rozdělí na n_buckets stejně širokých přihrádek a z každé
+    se ponechá první, poslední, nejmenší a největší bod (metoda M4). Graf
+    tak zachová všechny extrémy a vypadá stejně jako graf ze všech bodů.
+    Ponechá se i poslední bod před t_start a první bod za t_end, aby
+    schodovitý průběh navazoval na okraje zobrazeného úseku.
+
+    Parameters:
+    - times: rostoucí pole časů
+    - values: pole hodnot stejné délky
+    - t_start, t_end: zobrazený časový úsek
+    - n_buckets: počet přihrádek (obvykle šířka grafu v pixelech)
+
+    Returns:
+    - times, values: vybrané body v časovém pořadí
+    """
+    low = max(np.searchsorted(times, t_start, side='right') - 1, 0)
+    high = min(np.searchsorted(times, t_end, side='left') + 1, len(times))
+    times = times[low:high]
+    values = values[low:high]
+    if len(times) <= 4 * n_buckets or t_end <= t_start:
+        return times, values
+
+    # Hranice přihrádek v indexech (časy jsou seřazené)
+    buckets = ((times - t_start) * (n_buckets / (t_end - t_start))).astype(np.int64)
+    buckets = np.clip(buckets, -1, n_buckets)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(times)] - 1
+
+    first_min, first_max = _segment_extremes(values, starts)
+    keep = np.unique(np.concatenate([starts, ends, first_min, first_max]))
+    return times[keep], values[keep]
+
+def _segment_extremes(values, starts):
+    # Indexy prvního minima a maxima v každém úseku začínajícím na indexu ze starts
+    segment = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(values)]))
+    minima = np.minimum.reduceat(values, starts)
+    maxima = np.maximum.reduceat(values, starts)
+    at_min = np.flatnonzero(values == minima[segment])
+    at_max = np.flatnonzero(values == maxima[segment])
+    first_min = at_min[np.unique(segment[at_min], return_index=True)[1]]
+    first_max = at_max[np.unique(segment[at_max], return_index=True)[1]]
+    return first_min, first_max
+
+def _pick(values, left, right, better):
+    # Z dvojic indexů (-1 = prázdná přihrádka) vybere lepší hodnotu, při shodě levý
+    take_right = (right >= 0) & ((left < 0) | better(values[np.maximum(right, 0)], values[np.maximum(left, 0)]))
+    return np.where(take_right, right, left)
+
+class _Buckets:
+    def __init__(self, t_start, t_end, n_buckets, n_columns):
+        """
+        Výběr bodů metodou M4 (viz decimate) udržovaný průběžně. Pro každou
+        přihrádku úseku [t_start, t_end) se pamatují indexy prvního
+        a posledního bodu a prvního minima a maxima každého sloupce, nová
+        část trajektorie se tak zahrne bez procházení starších bodů.
+        Přihrádka 0 patří bodům před t_start, přihrádka n_buckets + 1 bodům
+        od t_end dál; z nich se kreslí jen bod nejbližší úseku.
+
+        Parameters:
+        - t_start, t_end: úsek rozdělený na přihrádky
+        - n_buckets: počet přihrádek
+        - n_columns: počet sloupců (čar)
+        """
+        self.t_start = t_start
+        self.t_end = t_end
+        self.n_buckets = n_buckets
+        self.first = np.full(n_buckets + 2, -1, dtype=np.int64)
+        self.last = np.full(n_buckets + 2, -1, dtype=np.int64)
+        self.minimum = np.full((n_buckets + 2, n_columns), -1, dtype=np.int64)
+        self.maximum = np.full((n_buckets + 2, n_columns), -1, dtype=np.int64)
+        # Index prvního dosud nezahrnutého řádku
+        self.rows = 0
+
+    def add(self, times, columns, stop):
+        """
+        Zahrne řádky od self.rows do stop.
+
+        Parameters:
+        - times: rostoucí pole časů
+        - columns: pole hodnot jednotlivých sloupců
+        - stop: konec zahrnovaných řádků
+        """
+        start = self.rows
+        if stop <= start:
+            return
+        scale = self.n_buckets / (self.t_end - self.t_start)
+        buckets = np.clip(np.floor((times[start:stop] - self.t_start) * scale), -1, self.n_buckets).astype(np.int64) + 1
+        # Časy jsou seřazené, každá přihrádka je souvislý úsek řádků
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ids = buckets[starts]
+        first = self.first[ids]
+        self.first[ids] = np.where(first < 0, starts + start, first)
+        self.last[ids] = np.r_[starts[1:], stop - start] - 1 + start
+        for i, values in enumerate(columns):
+            first_min, first_max = _segment_extremes(values[start:stop], starts)
+            self.minimum[ids, i] = _pick(values, self.minimum[ids, i], first_min + start, np.less)
+            self.maximum[ids, i] = _pick(values, self.maximum[ids, i], first_max + start, np.greater)
+        self.rows = stop
+
+    def coarsen(self, columns):
+        """
+        Prodlouží úsek na dvojnásobek a sloučí sousední dvojice přihrádek,
+        výsledek je stejný, jako kdyby se body rozdělily rovnou do širších
+        přihrádek. Body za koncem úseku ještě nesmí být zahrnuté.
+        """
+        n = self.n_buckets
+        half = n // 2
+        left, right = slice(1, n + 1, 2), slice(2, n + 2, 2)
+        self.first[1:half + 1] = np.where(self.first[left] >= 0, self.first[left], self.first[right])
+        self.last[1:half + 1] = np.where(self.last[right] >= 0, self.last[right], self.last[left])
+        for i, values in enumerate(columns):
+            self.minimum[1:half + 1, i] = _pick(values, self.minimum[left, i], self.minimum[right, i], np.less)
+            self.maximum[1:half + 1, i] = _pick(values, self.maximum[left, i], self.maximum[right, i], np.greater)
+        for array in (self.first, self.last, self.minimum, self.maximum):
+            array[half + 1:n + 1] = -1
+        self.t_end = self.t_start + 2 * (self.t_end - self.t_start)
+
+    def points(self, i):
+        """
+        Vrací seřazené indexy bodů vybraných pro sloupec i.
+        """
+        inner = slice(1, self.n_buckets + 1)
+        keep = np.unique(np.concatenate([self.last[:1], self.first[inner], self.last[inner],
+                                         self.minimum[inner, i], self.maximum[inner, i], self.first[-1:]]))
+        return keep[keep >= 0]
+
+class TrajectoryPlot:
+    def __init__(self, ax, names, steps=True):
+        """
+        Graf trajektorií, který drží data v plném rozlišení a do čar předává
+        jen body potřebné pro aktuální šířku grafu v pixelech. Při přiblížení
+        nebo posunu osy x se body vyberou znovu z plných dat, doba vykreslení
+        tak závisí na šířce grafu, ne na počtu reakcí.
+
+        Parameters:
+        - ax: matplotlib Axes
+        - names: názvy látek (jedna čára pro každou)
+        - steps: kreslit schodovitě (stochastické simulace), jinak lomenou čarou
+        """
+        self.ax = ax
+        drawstyle = 'steps-post' if steps else 'default'
+        self.lines = [ax.plot([], [], drawstyle=drawstyle, label=name)[0] for name in names]
+        self._times = np.empty(1024)
+        self._states = np.empty((1024, len(names)))
+        # Sloupce zobrazené bez kopírování (viz set_data), jinak None
+        self._columns = None
+        self._count = 0
+        # Průběžně udržované přihrádky pro celý průběh a pro přiblížený úsek
+        self._whole = None
+        self._window = None
+        self._callback = ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+    def disconnect(self):
+        """
+        Odpojí graf od změn osy x (před vytvořením nového grafu v téže ose).
+        """
+        self.ax.callbacks.disconnect(self._callback)
+
+    @property
+    def times(self):
+        return self._times[:self._count]
+
+    @property
+    def states(self):
+        if self._columns is not None:
+            return np.column_stack(self._columns)
+        return self._states[:self._count]
+
+    def _column(self, i):
+        if self._columns is not None:
+            return self._columns[i][:self._count]
+        return self._states[:self._count, i]
+
+    def append(self, times, states):
+        """
+        Připojí další část trajektorie a aktualizuje čáry.
+
+        Parameters:
+        - times: pole časů tvaru (řádky,)
+        - states: pole stavů tvaru (řádky, látky)
+        """
+        if self._columns is not None:
+            # Připojení k průběhu zobrazenému bez kopírování, data se převezmou
+            self._times, self._states = np.array(self.times, dtype=float), self.states.astype(float)
+            self._columns = None
+        count = self._count
+        needed = count + len(times)
+        if needed > len(self._times):
+            size = max(needed, 2 * len(self._times))
+            new_times = np.empty(size)
+            new_states = np.empty((size, self._states.shape[1]))
+            new_times[:count] = self._times[:count]
+            new_states[:count] = self._states[:count]
+            self._times, self._states = new_times, new_states
+        self._times[count:needed] = times
+        self._states[count:needed] = states
+        self._count = needed
+
+        if self.ax.get_autoscalex_on():
+            # Celý průběh, osy se přizpůsobí datům
+            self.refresh(self._times[0], self._times[needed - 1])
+            self.ax.relim()
+            self.ax.autoscale_view()
+        else:
+            # Uživatel graf přiblížil, zachová se zobrazený úsek
+            self.refresh(*self.ax.get_xlim())
+
+    def set_data(self, times, columns):
+        """
+        Zobrazí hotový průběh bez kopírování dat, např. záznam mapovaný
+        do paměti (viz trajectory_file). Body pro čáry se vybírají přímo
+        ze zadaných polí.
+
+        Parameters:
+        - times: pole časů
+        - columns: pole množství pro jednotlivé čáry (v pořadí názvů)
+        """
+        self._columns = list(columns)
+        self._times = times
+        self._count = len(times)
+        self._whole = None
+        self._window = None
+        if self._count:
+            self.refresh(self._times[0], self._times[self._count - 1])
+            self.ax.relim()
+            self.ax.autoscale_view()
+
+    def refresh(self, t_start, t_end):
+        """
+        Vybere body pro zobrazený úsek a předá je čarám.
+
+        Přihrádky se při připojení další části trajektorie jen doplní o nové
+        body. Zobrazuje-li se celý průběh, přihrádky pokrývají úsek, který
+        se při překročení zdvojnásobí (sloučením sousedních přihrádek),
+        takže na graf připadá vždy aspoň tolik přihrádek, kolik má pixelů.
+        Znovu ze všech bodů se přihrádky sestavují jen po přiblížení nebo
+        posunu osy x a po změně šířky grafu.
+        """
+        if self._count == 0:
+            return
+        n_buckets = max(int(self.ax.bbox.width), 1)
+        times = self.times
+        columns = [self._column(i) for i in range(len(self.lines))]
+        if t_start <= times[0] and times[-1] <= t_end:
+            buckets = self._whole_buckets(times, columns, n_buckets)
+        else:
+            buckets = self._window_buckets(times, columns, t_start, t_end, n_buckets)
+
+        if buckets is None:
+            # Málo bodů, kreslí se všechny
+            low = max(np.searchsorted(times, t_start, side='right') - 1, 0)
+            high = min(np.searchsorted(times, t_end, side='left') + 1, len(times))
+            for line, values in zip(self.lines, columns):
+                line.set_data(times[low:high], values[low:high])
+            return
+        for i, (line, values) in enumerate(zip(self.lines, columns)):
+            keep = buckets.points(i)
+            line.set_data(times[keep], values[keep])
+
+    def _whole_buckets(self, times, columns, n_buckets):
+        # Přihrádky pro celý průběh; úsek začíná prvním časem a roste s daty
+        if len(times) <= 4 * n_buckets or times[-1] <= times[0]:
+            return None
+        buckets = self._whole
+        if buckets is None or buckets.n_buckets != 2 * n_buckets:
+            buckets = _Buckets(times[0], times[-1], 2 * n_buckets, len(columns))
+            self._whole = buckets
+        while times[-1] >= buckets.t_end:
+            buckets.coarsen(columns)
+        buckets.add(times, columns, len(times))
+        return buckets
+
+    def _window_buckets(self, times, columns, t_start, t_end, n_buckets):
+        # Přihrádky pro přiblížený úsek, sestaví se znovu při jeho změně
+        low = max(np.searchsorted(times, t_start, side='right') - 1, 0)
+        high = min(np.searchsorted(times, t_end, side='left') + 1, len(times))
+        if high - low <= 4 * n_buckets or t_end <= t_start:
+            return None
+        buckets = self._window
+        if buckets is None or (buckets.t_start, buckets.t_end, buckets.n_buckets) != (t_start, t_end, n_buckets):
+            buckets = _Buckets(t_start, t_end, n_buckets, len(columns))
+            buckets.rows = low
+            self._window = buckets
+        # Body za prvním bodem od t_end se nekreslí
+        buckets.add(times, columns, high)
+        return buckets
+
+    def _on_xlim_changed(self, ax):
+        self.refresh(*ax.get_xlim())
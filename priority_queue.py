@@ -0,0 +1,72 @@
+# priority_queue.py
+
+class IndexedPriorityQueue:
+    def __init__(self, keys):
+        """
+        Inicializuje indexovanou prioritní frontu (binární haldu).
+
+        Každý prvek je určen svým indexem (např. indexem reakce) a klíčem
+        (např. časem příštího proběhnutí reakce). Na rozdíl od modulu heapq
+        umožňuje změnit klíč libovolného prvku v čase O(log n).
+
+        Parameters:
+        - keys: seznam počátečních klíčů, index v seznamu je index prvku
+        """
+        self.keys = list(keys)
+        # Seřazený seznam je platnou haldou
+        self.heap = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+        self.position = [0] * len(self.keys)
+        for pos, index in enumerate(self.heap):
+            self.position[index] = pos
+
+    def __len__(self):
+        return len(self.heap)
+
+    def top(self):
+        """
+        Vrací dvojici (klíč, index) prvku s nejmenším klíčem.
+        """
+        index = self.heap[0]
+        return self.keys[index], index
+
+    def update(self, index, key):
+        """
+        Změní klíč prvku s daným indexem a obnoví vlastnost haldy.
+        """
+        old_key = self.keys[index]
+        self.keys[index] = key
+        if key < old_key:
+            self._sift_up(self.position[index])
+        elif key > old_key:
+            self._sift_down(self.position[index])
+
+    def _swap(self, i, j):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.position[heap[i]] = i
+        self.position[heap[j]] = j
+
+    def _sift_up(self, pos):
+        keys = self.keys
+        heap = self.heap
+        while pos > 0:
+            parent = (pos - 1) // 2
+            if keys[heap[pos]] >= keys[heap[parent]]:
+                break
+            self._swap(pos, parent)
+            pos = parent
+
+    def _sift_down(self, pos):
+        keys = self.keys
+        heap = self.heap
+        size = len(heap)
+        while True:
+            child = 2 * pos + 1
+            if child >= size:
+                break
+            if child + 1 < size and keys[heap[child + 1]] < keys[heap[child]]:
+                child += 1
+            if keys[heap[pos]] <= keys[heap[child]]:
+                break
+            self._swap(pos, child)
+            pos = child
@@ -0,0 +1,80 @@
+# random_buffer.py
+
+import math
+import numpy as np
+
+class UniformBuffer:
+    def __init__(self, rng=None, block_size=4096):
+        """
+        Zásobník náhodných čísel z [0, 1) losovaných po blocích.
+
+        Jedno volání generátoru NumPy stojí mnohem víc než samotný výpočet
+        v kroku simulace, proto se čísla losují po block_size najednou
+        a simulace je odebírá po jednom. Posloupnost závisí jen na generátoru,
+        se stejným seedem je tedy simulace opakovatelná.
+
+        Parameters:
+        - rng: numpy.random.Generator nebo seed (volitelné)
+        - block_size: počet čísel losovaných najednou
+        """
+        self.rng = np.random.default_rng(rng)
+        self.block_size = block_size
+        self._block = []
+        self._index = 0
+
+    def next(self):
+        """
+        Vrací další náhodné číslo z [0, 1).
+        """
+        if self._index == len(self._block):
+            self._block = self.rng.random(self.block_size).tolist()
+            self._index = 0
+        value = self._block[self._index]
+        self._index += 1
+        return value
+
+    def get_state(self):
+        """
+        Vrací stav zásobníku (stav generátoru a dosud nepoužitá čísla) pro
+        uložení do kontrolního bodu (viz checkpoint).
+        """
+        return {'rng': self.rng.bit_generator.state, 'block': self._block[self._index:]}
+
+    def set_state(self, state):
+        """
+        Obnoví stav zásobníku uložený metodou get_state.
+        """
+        self.rng.bit_generator.state = state['rng']
+        self._block = list(state['block'])
+        self._index = 0
+
+    def exponential(self, rate):
+        """
+        Vrací čas do příští události s exponenciálním rozdělením (inverzní transformace).
+
+        Parameters:
+        - rate: intenzita (součet propencí), musí být kladná
+        """
+        return -math.log1p(-self.next()) / rate
+
+def select_linear(propensities, target):
+    """
+    Vybere reakci lineárním hledáním v kumulativních propencích.
+
+    Parameters:
+    - propensities: seznam propencí
+    - target: náhodná hodnota z [0, součet propencí)
+
+    Returns:
+    - index první reakce, u níž kumulativní součet přesáhne target
+      (při zaokrouhlovací chybě poslední reakce s kladnou propencí)
+    """
+    cumulative = 0.0
+    last = -1
+    for index, prop in enumerate(propensities):
+        if prop > 0:
+            cumulative += prop
+            last = index
+            if target < cumulative:
+                return index
+    return last
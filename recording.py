@@ -0,0 +1,284 @@
+# recording.py
+
+import numpy as np
+
+class Recorder:
+    def __init__(self, chunk_size=4096):
+        """
+        Základ záznamu průběhu simulace do předalokovaných polí NumPy.
+
+        Simulační metoda volá start() s počátečním stavem, record() po každé
+        reakci (nebo kroku) a finish() na konci simulace. Podtřídy určují,
+        které stavy se skutečně uloží. Záznam se předává po částech: jakmile
+        je v bufferu chunk_size řádků, metoda ho vyzvedne voláním flush().
+
+        Parameters:
+        - chunk_size: počet řádků jedné části výstupu
+        """
+        self.chunk_size = chunk_size
+
+    def start(self, names, time, state):
+        self.names = list(names)
+        self._times = np.empty(self.chunk_size)
+        self._states = np.empty((self.chunk_size, len(self.names)), dtype=np.int64)
+        self._count = 0
+
+    def record(self, time, state):
+        pass
+
+    def finish(self, time, state):
+        pass
+
+    @property
+    def pending(self):
+        """
+        Počet zaznamenaných, dosud nevyzvednutých řádků.
+        """
+        return self._count
+
+    def full(self):
+        return self._count >= self.chunk_size
+
+    def flush(self):
+        """
+        Vyzvedne zaznamenané řádky a vyprázdní buffer.
+
+        Returns:
+        - times: pole časů tvaru (řádky,)
+        - states: pole stavů tvaru (řádky, látky)
+        """
+        chunk = self._times[:self._count].copy(), self._states[:self._count].copy()
+        self._count = 0
+        return chunk
+
+    def _reserve(self, rows):
+        # Zvětšení bufferu, pokud se jedním voláním zapíše víc řádků, než se vejde
+        needed = self._count + rows
+        if needed > len(self._times):
+            size = max(needed, 2 * len(self._times))
+            times = np.empty(size)
+            states = np.empty((size, self._states.shape[1]), dtype=np.int64)
+            times[:self._count] = self._times[:self._count]
+            states[:self._count] = self._states[:self._count]
+            self._times, self._states = times, states
+
+    def _append(self, time, state):
+        if self._count == len(self._times):
+            self._reserve(1)
+        self._times[self._count] = time
+        self._states[self._count] = state
+        self._count += 1
+
+    def _extend(self, times, state):
+        # Zapíše stejný stav pro všechny zadané časy
+        self._reserve(len(times))
+        end = self._count + len(times)
+        self._times[self._count:end] = times
+        self._states[self._count:end] = state
+        self._count = end
+
+class EventRecorder(Recorder):
+    def __init__(self, every=1, chunk_size=4096):
+        """
+        Zaznamenává stav po každé every-té reakci (výchozí po každé).
+        Počáteční a koncový stav se zaznamenají vždy.
+        """
+        super().__init__(chunk_size)
+        self.every = every
+
+    def start(self, names, time, state):
+        super().start(names, time, state)
+        self._events = 0
+        self._append(time, state)
+
+    def record(self, time, state):
+        self._events += 1
+        if self._events % self.every == 0:
+            self._append(time, state)
+
+    def finish(self, time, state):
+        if self._events % self.every != 0:
+            self._append(time, state)
+
+class GridRecorder(Recorder):
+    def __init__(self, grid, chunk_size=4096):
+        """
+        Zaznamenává stav v pevných časech mřížky. Hodnota v čase mřížky je
+        stav po poslední reakci, která proběhla nejpozději v tomto čase.
+
+        Parameters:
+        - grid: rostoucí posloupnost časů
+        """
+        super().__init__(chunk_size)
+        self.grid = np.asarray(grid, dtype=float)
+
+    def start(self, names, time, state):
+        super().start(names, time, state)
+        self._next = 0
+        self._last = np.array(state, dtype=np.int64)
+
+    def record(self, time, state):
+        # Body mřížky před časem reakce mají předchozí stav
+        grid = self.grid
+        if self._next < len(grid) and grid[self._next] < time:
+            end = np.searchsorted(grid, time, side='left')
+            self._extend(grid[self._next:end], self._last)
+            self._next = end
+        self._last[:] = state
+
+    def finish(self, time, state):
+        self._extend(self.grid[self._next:], state)
+        self._next = len(self.grid)
+
+class ChangeRecorder(Recorder):
+    def __init__(self, species=None, chunk_size=4096):
+        """
+        Zaznamenává stav jen tehdy, když se změní množství některé
+        ze sledovaných látek.
+
+        Parameters:
+        - species: názvy sledovaných látek (výchozí všechny)
+        """
+        super().__init__(chunk_size)
+        self.species = species
+
+    def start(self, names, time, state):
+        super().start(names, time, state)
+        species = self.species if self.species is not None else names
+        self._watched = np.array([self.names.index(name) for name in species], dtype=np.int64)
+        self._last = np.asarray(state)[self._watched].copy()
+        self._append(time, state)
+
+    def record(self, time, state):
+        watched = np.asarray(state)[self._watched]
+        if not np.array_equal(watched, self._last):
+            self._last = watched
+            self._append(time, state)
+
+class FinalStateRecorder(Recorder):
+    def __init__(self):
+        """
+        Nezaznamenává průběh, jen koncový stav simulace.
+        """
+        super().__init__(1)
+
+    def finish(self, time, state):
+        self._append(time, state)
+
+class StreamOutput:
+    def __init__(self, method, names, uniforms, recorder=None, checkpoint=None, stop=None, engine_state=None):
+        """
+        Společná obsluha výstupu simulačních metod: záznam průběhu, kontrolní
+        bod a podmínka předčasného ukončení. Metoda volá start s počátečním
+        stavem, step po každé reakci (nebo kroku) a finish na konci:
+
+            output = StreamOutput('gillespie', names, uniforms, recorder, checkpoint, stop)
+            output.start(time, state)
+            while time < t_max:
+                ...
+                if output.step(time, state) and (yield from output.emit()):
+                    break
+            yield from output.finish(time, state, t_max)
+
+        Kontrolní bod se zachycuje při každé hotové části záznamu (v odloženém
+        režimu jen tehdy, viz checkpoint.Checkpoint) a na konci simulace.
+
+        Parameters:
+        - method: název metody uložený v kontrolním bodě
+        - names: názvy látek v pořadí stavového vektoru
+        - uniforms: zásobník náhodných čísel (viz random_buffer.UniformBuffer)
+        - recorder: způsob záznamu průběhu (výchozí každá reakce)
+        - checkpoint: kontrolní bod (viz checkpoint.Checkpoint), volitelný
+        - stop: podmínka předčasného ukončení (viz stopping), volitelná
+        - engine_state: funkce vracející vnitřní stav metody pro kontrolní bod;
+          volá se jen při jeho zachycení
+        """
+        self.method = method
+        self.names = list(names)
+        self.uniforms = uniforms
+        self.recorder = recorder if recorder is not None else EventRecorder()
+        self.checkpoint = checkpoint
+        self.stop = stop
+        self.engine_state = engine_state
+        self.stopped = False
+
+    def start(self, time, state):
+        self.recorder.start(self.names, time, state)
+        if self.stop is not None:
+            self.stop.start(self.names, time, state)
+
+    def _capture(self, time, state, final=False):
+        engine = self.engine_state() if self.engine_state is not None else None
+        self.checkpoint.capture(self.method, time, self.names, state, self.uniforms, engine, final=final)
+
+    def step(self, time, state):
+        """
+        Zaznamená stav po reakci.
+
+        Returns:
+        - True, je-li hotová část záznamu nebo splněna podmínka ukončení;
+          metoda pak zavolá emit
+        """
+        recorder = self.recorder
+        recorder.record(time, state)
+        full = recorder.full()
+        if full:
+            if self.checkpoint is not None:
+                self._capture(time, state)
+        elif self.checkpoint is not None and self.checkpoint.due():
+            self._capture(time, state)
+        if self.stop is not None and self.stop.check(time, state):
+            self.stopped = True
+            return True
+        return full
+
+    def emit(self):
+        """
+        Vrátí hotovou část záznamu (generátor pro yield from).
+
+        Returns:
+        - True, má-li simulace skončit
+        """
+        if self.recorder.full():
+            yield self.recorder.flush()
+        return self.stopped
+
+    def finish(self, time, state, t_max):
+        """
+        Ukončí záznam, podmínku ukončení a kontrolní bod a vrátí zbytek
+        záznamu (generátor pro yield from).
+        """
+        self.recorder.finish(time, state)
+        if self.stop is not None:
+            self.stop.finish(time, t_max)
+        if self.checkpoint is not None:
+            self._capture(time, state, final=True)
+        if self.recorder.pending:
+            yield self.recorder.flush()
+
+def collect(stream, names):
+    """
+    Spojí části výstupu proudové simulace do jednoho výsledku.
+
+    Parameters:
+    - stream: iterátor dvojic (times, states)
+    - names: názvy látek v pořadí sloupců states
+
+    Returns:
+    - times: pole časů
+    - history: dict {název: pole množství}
+    """
+    time_chunks = []
+    state_chunks = []
+    for times, states in stream:
+        time_chunks.append(times)
+        state_chunks.append(states)
+
+    if time_chunks:
+        times = np.concatenate(time_chunks)
+        states = np.concatenate(state_chunks)
+    else:
+        times = np.empty(0)
+        states = np.empty((0, len(names)), dtype=np.int64)
+    history = {name: states[:, i].copy() for i, name in enumerate(names)}
+    return times, history
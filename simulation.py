@@ -1,38 +1,574 @@
-# simulation.py
-
-import numpy as np
-from reaction import Reaction, ReversibleReaction
-
-def gillespie_simulation(substances, reactions, t_max):
-    time = 0
-    times = [time]
-    history = {substance.name: [substance.amount] for substance in substances.values()}
-
-    while time < t_max:
-        propensities = []
-        for reaction in reactions:
-            prop = reaction.propensity()
-            propensities.append(prop)
-
-        total_propensity = sum(propensities)
-
-        if total_propensity == 0:
-            break
-
-        # Generování času do další reakce
-        tau = np.random.exponential(1 / total_propensity)
-        time += tau
-
-        # Výběr reakce, která proběhne
-        probabilities = [p / total_propensity for p in propensities]
-        reaction_index = np.random.choice(len(reactions), p=probabilities)
-        reaction = reactions[reaction_index]
-
-        # Aktualizace látek
-        reaction.update_substances()
-
-        times.append(time)
-        for substance in substances.values():
-            history[substance.name].append(substance.amount)
-
-    return times, history
+# simulation.py
+
+import math
+from reaction import ReversibleReaction
+from priority_queue import IndexedPriorityQueue
+from sum_tree import SumTree
+from composition_rejection import PropensityGroups
+from model import compile_model
+from codegen import compile_kernels
+from tau_leaping import tau_leaping_stream, tau_leaping_simulation
+from slow_scale import slow_scale_stream, slow_scale_simulation
+from hybrid import hybrid_stream, hybrid_simulation
+from ode import ode_simulation
+from recording import EventRecorder, StreamOutput, collect
+from substance import SubstanceState
+from random_buffer import UniformBuffer, select_linear
+
+def _state_changes(state, reactions, reversible, instrumentation):
+    # Změny stavu při proběhnutí nevratných reakcí jako zápisy do společného
+    # pole; None znamená provedení metodou update_substances (vratné reakce,
+    # a všechny reakce při měření, aby se měřila i doba aktualizace)
+    if instrumentation is not None:
+        return [None] * len(reactions)
+    return [None if is_reversible else state.changes(reaction)
+            for reaction, is_reversible in zip(reactions, reversible)]
+
+def gillespie_stream(substances, reactions, t_max, rng=None, recorder=None,
+                     instrumentation=None, checkpoint=None, stop=None):
+    """
+    Gillespieho přímá metoda jako generátor průběžných výsledků.
+
+    Generátor vrací části záznamu (times, states) o velikosti
+    recorder.chunk_size, sloupce states odpovídají pořadí substances.
+    Simulaci lze kdykoli ukončit uzavřením generátoru (close()).
+
+    Parameters:
+    - substances: dict {název: Substance}
+    - reactions: seznam reakcí
+    - t_max: maximální čas simulace
+    - rng: numpy.random.Generator nebo seed (volitelné)
+    - recorder: způsob záznamu průběhu (viz recording, výchozí každá reakce)
+    - instrumentation: volitelné měření průběhu (viz instrumentation.Instrumentation)
+    - checkpoint: kontrolní bod pro pokračování a prodloužení simulace (viz checkpoint.Checkpoint)
+    - stop: podmínka předčasného ukončení (viz stopping), po skončení obsahuje důvod a čas
+    """
+    uniforms = UniformBuffer(rng)
+    reversible = [isinstance(reaction, ReversibleReaction) for reaction in reactions]
+    state = SubstanceState(substances.values())
+    time = 0
+    if checkpoint is not None and checkpoint.started:
+        time = checkpoint.restore(substances, uniforms)
+    output = StreamOutput('gillespie', state.names, uniforms, recorder, checkpoint, stop)
+    output.start(time, state.array)
+    values = state.values
+    changes = _state_changes(state, reactions, reversible, instrumentation)
+    if instrumentation is not None:
+        reactions = instrumentation.start(reactions)
+
+    while time < t_max:
+        propensities = []
+        for reaction in reactions:
+            prop = reaction.propensity()
+            propensities.append(prop)
+
+        total_propensity = sum(propensities)
+
+        if total_propensity == 0:
+            break
+
+        # Generování času do další reakce
+        tau = uniforms.exponential(total_propensity)
+        time += tau
+
+        # Výběr reakce, která proběhne
+        reaction_index = select_linear(propensities, uniforms.next() * total_propensity)
+        reaction = reactions[reaction_index]
+
+        # Aktualizace látek zápisem do pole, vratné reakce svou metodou
+        # (směr se losuje ze stejného generátoru)
+        change = changes[reaction_index]
+        if change is not None:
+            for index, delta in change:
+                values[index] += delta
+        elif reversible[reaction_index]:
+            reaction.update_substances(uniforms.next())
+        else:
+            reaction.update_substances()
+
+        if instrumentation is not None:
+            instrumentation.event(time, total_propensity, reaction_index)
+        if output.step(time, state.array) and (yield from output.emit()):
+            break
+
+    if instrumentation is not None:
+        instrumentation.finish(time)
+    yield from output.finish(time, state.array, t_max)
+
+def gillespie_simulation(substances, reactions, t_max, rng=None, recorder=None,
+                         instrumentation=None, checkpoint=None, stop=None):
+    names = [substance.name for substance in substances.values()]
+    stream = gillespie_stream(substances, reactions, t_max, rng, recorder, instrumentation,
+                              checkpoint, stop)
+    return collect(stream, names)
+
+def dependency_graph(reactions):
+    """
+    Sestaví graf závislostí mezi reakcemi.
+
+    Parameters:
+    - reactions: seznam reakcí
+
+    Returns:
+    - seznam, jehož i-tý prvek obsahuje indexy reakcí, jejichž propence
+      se může změnit po proběhnutí i-té reakce (včetně reakce i samotné)
+    """
+    # Pro každou látku indexy reakcí, jejichž propence na ní závisí
+    readers = {}
+    for index, reaction in enumerate(reactions):
+        for substance in reaction.dependencies():
+            readers.setdefault(substance, set()).add(index)
+
+    graph = []
+    for index, reaction in enumerate(reactions):
+        dependent = {index}
+        for substance in reaction.stoichiometry():
+            dependent |= readers.get(substance, set())
+        graph.append(sorted(dependent))
+    return graph
+
+def next_reaction_stream(substances, reactions, t_max, rng=None, recorder=None,
+                         instrumentation=None, checkpoint=None, stop=None):
+    """
+    Simulace metodou příští reakce (Gibson–Bruck) jako generátor
+    průběžných výsledků (viz gillespie_stream).
+
+    Po proběhnutí reakce přepočítá jen propence reakcí, které na změněných
+    látkách závisí (podle grafu závislostí), a časy příštích reakcí udržuje
+    v indexované prioritní frontě. Cena jednoho kroku je tak přibližně
+    O(log M) místo O(M) pro M reakcí.
+
+    Parametry jsou stejné jako u gillespie_stream.
+    """
+    uniforms = UniformBuffer(rng)
+    reversible = [isinstance(reaction, ReversibleReaction) for reaction in reactions]
+    state = SubstanceState(substances.values())
+    time = 0
+    if checkpoint is not None and checkpoint.started:
+        time = checkpoint.restore(substances, uniforms)
+    values = state.values
+    changes = _state_changes(state, reactions, reversible, instrumentation)
+
+    graph = dependency_graph(reactions)
+    if instrumentation is not None:
+        reactions = instrumentation.start(reactions)
+    propensities = [reaction.propensity() for reaction in reactions]
+    saved = checkpoint.engine_state('next_reaction') if checkpoint is not None and checkpoint.started else None
+    if saved is not None:
+        # Pokračování s časy příštích reakcí z kontrolního bodu
+        firing_times = list(saved['firing_times'])
+    else:
+        firing_times = [
+            time + uniforms.exponential(prop) if prop > 0 else math.inf
+            for prop in propensities
+        ]
+    queue = IndexedPriorityQueue(firing_times)
+    output = StreamOutput('next_reaction', state.names, uniforms, recorder, checkpoint, stop,
+                          lambda: {'firing_times': list(queue.keys)})
+    output.start(time, state.array)
+
+    while time < t_max:
+        next_time, reaction_index = queue.top()
+        if next_time == math.inf:
+            break
+        time = next_time
+
+        # Aktualizace látek
+        change = changes[reaction_index]
+        if change is not None:
+            for index, delta in change:
+                values[index] += delta
+        elif reversible[reaction_index]:
+            reactions[reaction_index].update_substances(uniforms.next())
+        else:
+            reactions[reaction_index].update_substances()
+
+        # Přepočet propencí a časů jen u závislých reakcí
+        for index in graph[reaction_index]:
+            old_prop = propensities[index]
+            new_prop = reactions[index].propensity()
+            propensities[index] = new_prop
+            if new_prop <= 0:
+                new_time = math.inf
+            elif index == reaction_index or old_prop <= 0:
+                new_time = time + uniforms.exponential(new_prop)
+            else:
+                # Přeškálování zbývajícího času místo nového losování
+                new_time = time + (old_prop / new_prop) * (queue.keys[index] - time)
+            queue.update(index, new_time)
+
+        if instrumentation is not None:
+            instrumentation.event(time, sum(propensities), reaction_index)
+        if output.step(time, state.array) and (yield from output.emit()):
+            break
+
+    if instrumentation is not None:
+        instrumentation.finish(time)
+    yield from output.finish(time, state.array, t_max)
+
+def next_reaction_simulation(substances, reactions, t_max, rng=None, recorder=None,
+                             instrumentation=None, checkpoint=None, stop=None):
+    """
+    Simulace metodou příští reakce (viz next_reaction_stream).
+
+    Returns:
+    - times, history ve stejném tvaru jako gillespie_simulation
+    """
+    names = [substance.name for substance in substances.values()]
+    stream = next_reaction_stream(substances, reactions, t_max, rng, recorder, instrumentation,
+                                  checkpoint, stop)
+    return collect(stream, names)
+
+def sum_tree_stream(substances, reactions, t_max, rng=None, recorder=None,
+                    instrumentation=None, checkpoint=None, stop=None):
+    """
+    Gillespieho přímá metoda se stromem součtů propencí jako generátor
+    průběžných výsledků (viz gillespie_stream).
+
+    Propence jsou uloženy ve stromu součtů (viz sum_tree.SumTree). Po
+    proběhnutí reakce se podle grafu závislostí přepočítají jen propence
+    dotčených reakcí a reakce se vybírá sestupem stromem, jeden krok tak
+    stojí O(log M) místo O(M) pro M reakcí. Vhodné pro sítě s tisíci reakcí.
+
+    Parametry jsou stejné jako u gillespie_stream.
+    """
+    uniforms = UniformBuffer(rng)
+    reversible = [isinstance(reaction, ReversibleReaction) for reaction in reactions]
+    state = SubstanceState(substances.values())
+    time = 0
+    if checkpoint is not None and checkpoint.started:
+        time = checkpoint.restore(substances, uniforms)
+    output = StreamOutput('sum_tree', state.names, uniforms, recorder, checkpoint, stop)
+    output.start(time, state.array)
+    values = state.values
+    changes = _state_changes(state, reactions, reversible, instrumentation)
+
+    graph = dependency_graph(reactions)
+    if instrumentation is not None:
+        reactions = instrumentation.start(reactions)
+    tree = SumTree([reaction.propensity() for reaction in reactions])
+
+    while time < t_max:
+        total_propensity = tree.total
+        if total_propensity <= 0:
+            break
+
+        # Generování času do další reakce a výběr reakce ve stromu
+        time += uniforms.exponential(total_propensity)
+        reaction_index = tree.sample(uniforms.next() * total_propensity)
+
+        change = changes[reaction_index]
+        if change is not None:
+            for index, delta in change:
+                values[index] += delta
+        elif reversible[reaction_index]:
+            reactions[reaction_index].update_substances(uniforms.next())
+        else:
+            reactions[reaction_index].update_substances()
+
+        # Přepočet propencí jen u závislých reakcí
+        for index in graph[reaction_index]:
+            tree.update(index, reactions[index].propensity())
+
+        if instrumentation is not None:
+            instrumentation.event(time, total_propensity, reaction_index)
+        if output.step(time, state.array) and (yield from output.emit()):
+            break
+
+    if instrumentation is not None:
+        instrumentation.finish(time)
+    yield from output.finish(time, state.array, t_max)
+
+def sum_tree_simulation(substances, reactions, t_max, rng=None, recorder=None,
+                        instrumentation=None, checkpoint=None, stop=None):
+    """
+    Gillespieho přímá metoda se stromem součtů propencí (viz sum_tree_stream).
+
+    Returns:
+    - times, history ve stejném tvaru jako gillespie_simulation
+    """
+    names = [substance.name for substance in substances.values()]
+    stream = sum_tree_stream(substances, reactions, t_max, rng, recorder, instrumentation,
+                             checkpoint, stop)
+    return collect(stream, names)
+
+def composition_rejection_stream(substances, reactions, t_max, rng=None, recorder=None,
+                                 instrumentation=None, checkpoint=None, stop=None):
+    """
+    Gillespieho přímá metoda s výběrem reakce složením a zamítáním
+    (Slepoy, Thompson, Plimpton 2008) jako generátor průběžných výsledků
+    (viz gillespie_stream).
+
+    Reakce jsou rozděleny do skupin podle řádu propence (viz
+    composition_rejection.PropensityGroups), po proběhnutí reakce se podle
+    grafu závislostí přepočítají jen propence dotčených reakcí. Výběr
+    reakce stojí v průměru O(1) operací, metoda je tak vhodná pro sítě
+    s desítkami tisíc reakcí, jejichž propence se liší o mnoho řádů.
+
+    Parametry jsou stejné jako u gillespie_stream.
+    """
+    uniforms = UniformBuffer(rng)
+    reversible = [isinstance(reaction, ReversibleReaction) for reaction in reactions]
+    state = SubstanceState(substances.values())
+    time = 0
+    if checkpoint is not None and checkpoint.started:
+        time = checkpoint.restore(substances, uniforms)
+    values = state.values
+    changes = _state_changes(state, reactions, reversible, instrumentation)
+
+    graph = dependency_graph(reactions)
+    if instrumentation is not None:
+        reactions = instrumentation.start(reactions)
+    groups = PropensityGroups([reaction.propensity() for reaction in reactions])
+    saved = checkpoint.engine_state('composition_rejection') if checkpoint is not None and checkpoint.started else None
+    if saved is not None:
+        # Pokračování se stejným pořadím skupin jako v kontrolním bodě
+        groups.set_state(saved)
+    output = StreamOutput('composition_rejection', state.names, uniforms, recorder, checkpoint, stop, groups.get_state)
+    output.start(time, state.array)
+
+    while time < t_max:
+        total_propensity = groups.total
+        if total_propensity <= 0:
+            break
+
+        # Generování času do další reakce a výběr reakce
+        time += uniforms.exponential(total_propensity)
+        reaction_index = groups.sample(uniforms)
+
+        change = changes[reaction_index]
+        if change is not None:
+            for index, delta in change:
+                values[index] += delta
+        elif reversible[reaction_index]:
+            reactions[reaction_index].update_substances(uniforms.next())
+        else:
+            reactions[reaction_index].update_substances()
+
+        # Přepočet propencí jen u závislých reakcí
+        for index in graph[reaction_index]:
+            groups.update(index, reactions[index].propensity())
+
+        if instrumentation is not None:
+            instrumentation.event(time, total_propensity, reaction_index)
+        if output.step(time, state.array) and (yield from output.emit()):
+            break
+
+    if instrumentation is not None:
+        instrumentation.finish(time)
+    yield from output.finish(time, state.array, t_max)
+
+def composition_rejection_simulation(substances, reactions, t_max, rng=None, recorder=None,
+                                     instrumentation=None, checkpoint=None, stop=None):
+    """
+    Simulace s výběrem reakce složením a zamítáním (viz composition_rejection_stream).
+
+    Returns:
+    - times, history ve stejném tvaru jako gillespie_simulation
+    """
+    names = [substance.name for substance in substances.values()]
+    stream = composition_rejection_stream(substances, reactions, t_max, rng, recorder, instrumentation,
+                                          checkpoint, stop)
+    return collect(stream, names)
+
+def compiled_stream(substances, reactions, t_max, rng=None, recorder=None,
+                    instrumentation=None, checkpoint=None, stop=None):
+    """
+    Gillespieho přímá metoda nad kompilovaným modelem jako generátor
+    průběžných výsledků (viz gillespie_stream).
+
+    Reakce se před simulací převedou na pole NumPy (viz model.compile_model).
+    Počáteční propence se vyhodnotí jedním vektorizovaným průchodem, po
+    proběhnutí kanálu se přepočítají jen propence kanálů, které čtou
+    změněné látky (viz CompiledModel.dependents), a to po jednotlivých
+    kanálech nad čísly Pythonu bez přístupu k objektům Substance.
+
+    Parametry jsou stejné jako u gillespie_stream.
+    """
+    model = compile_model(substances, reactions)
+    uniforms = UniformBuffer(rng)
+    changes = model.channel_changes
+    dependents = model.dependents()
+    channel_propensity = model.channel_propensity
+
+    # Stav sdílený s objekty Substance, změny se do látek zapisují přímo
+    state = SubstanceState(model.substances)
+    values = state.values
+    time = 0
+    if checkpoint is not None and checkpoint.started:
+        time = checkpoint.restore(substances, uniforms)
+    output = StreamOutput('compiled', model.names, uniforms, recorder, checkpoint, stop)
+    output.start(time, state.array)
+    if instrumentation is not None:
+        # Propence se počítají z modelu, měří se jen počty podle zdrojových reakcí
+        instrumentation.start(reactions, wrap=False)
+        sources = model.sources.tolist()
+
+    propensities = model.propensities(state.array).tolist()
+
+    while time < t_max:
+        total_propensity = sum(propensities)
+        if total_propensity <= 0:
+            break
+
+        # Generování času do další reakce a výběr kanálu
+        time += uniforms.exponential(total_propensity)
+        channel = select_linear(propensities, uniforms.next() * total_propensity)
+        for i, delta in changes[channel]:
+            values[i] += delta
+        for k in dependents[channel]:
+            propensities[k] = channel_propensity(values, k)
+
+        if instrumentation is not None:
+            instrumentation.event(time, total_propensity, sources[channel])
+        if output.step(time, state.array) and (yield from output.emit()):
+            break
+
+    if instrumentation is not None:
+        instrumentation.finish(time)
+    yield from output.finish(time, state.array, t_max)
+
+def compiled_simulation(substances, reactions, t_max, rng=None, recorder=None,
+                        instrumentation=None, checkpoint=None, stop=None):
+    """
+    Gillespieho přímá metoda nad kompilovaným modelem (viz compiled_stream).
+
+    Returns:
+    - times, history ve stejném tvaru jako gillespie_simulation
+    """
+    names = [substance.name for substance in substances.values()]
+    stream = compiled_stream(substances, reactions, t_max, rng, recorder, instrumentation,
+                             checkpoint, stop)
+    return collect(stream, names)
+
+def generated_stream(substances, reactions, t_max, rng=None, recorder=None,
+                     instrumentation=None, checkpoint=None, stop=None):
+    """
+    Gillespieho přímá metoda s jádry generovanými pro konkrétní síť jako
+    generátor průběžných výsledků (viz gillespie_stream).
+
+    Pro kanály kompilovaného modelu se vygeneruje a zkompiluje Python kód
+    (viz codegen.compile_kernels): propence každého kanálu je jeden
+    rozvinutý výraz a proběhnutí kanálu je jedna funkce, která zapíše změny
+    do stavu a přepočítá propence jen závislých kanálů. V hlavní smyčce tak
+    nejsou cykly přes reaktanty, slovníky ani skaláry NumPy. Kód se pro
+    stejnou strukturu sítě kompiluje jen jednou.
+
+    Parametry jsou stejné jako u gillespie_stream.
+    """
+    model = compile_model(substances, reactions)
+    compute_propensities, fires = compile_kernels(model)
+    uniforms = UniformBuffer(rng)
+
+    # Stav sdílený s objekty Substance, jádra zapisují přímo do jeho prvků
+    state = SubstanceState(model.substances)
+    values = state.values
+    time = 0
+    if checkpoint is not None and checkpoint.started:
+        time = checkpoint.restore(substances, uniforms)
+    output = StreamOutput('generated', model.names, uniforms, recorder, checkpoint, stop)
+    output.start(time, state.array)
+    if instrumentation is not None:
+        # Propence počítají jádra, měří se jen počty podle zdrojových reakcí
+        instrumentation.start(reactions, wrap=False)
+        sources = model.sources.tolist()
+
+    propensities = [0.0] * model.n_channels
+    compute_propensities(values, propensities)
+
+    while time < t_max:
+        total_propensity = sum(propensities)
+        if total_propensity <= 0:
+            break
+
+        # Generování času do další reakce a výběr kanálu
+        time += uniforms.exponential(total_propensity)
+        channel = select_linear(propensities, uniforms.next() * total_propensity)
+        fires[channel](values, propensities)
+
+        if instrumentation is not None:
+            instrumentation.event(time, total_propensity, sources[channel])
+        if output.step(time, state.array) and (yield from output.emit()):
+            break
+
+    if instrumentation is not None:
+        instrumentation.finish(time)
+    yield from output.finish(time, state.array, t_max)
+
+def generated_simulation(substances, reactions, t_max, rng=None, recorder=None,
+                         instrumentation=None, checkpoint=None, stop=None):
+    """
+    Gillespieho přímá metoda s jádry generovanými pro síť (viz generated_stream).
+
+    Returns:
+    - times, history ve stejném tvaru jako gillespie_simulation
+    """
+    names = [substance.name for substance in substances.values()]
+    stream = generated_stream(substances, reactions, t_max, rng, recorder, instrumentation,
+                              checkpoint, stop)
+    return collect(stream, names)
+
+# Dostupné simulační metody podle názvu
+SIMULATION_METHODS = {
+    'gillespie': gillespie_simulation,
+    'next_reaction': next_reaction_simulation,
+    'sum_tree': sum_tree_simulation,
+    'composition_rejection': composition_rejection_simulation,
+    'compiled': compiled_simulation,
+    'generated': generated_simulation,
+    'tau_leaping': tau_leaping_simulation,
+    'slow_scale': slow_scale_simulation,
+    'hybrid': hybrid_simulation,
+    'ode': ode_simulation,
+}
+
+# Metody, které umí vracet výsledky průběžně
+STREAM_METHODS = {
+    'gillespie': gillespie_stream,
+    'next_reaction': next_reaction_stream,
+    'sum_tree': sum_tree_stream,
+    'composition_rejection': composition_rejection_stream,
+    'compiled': compiled_stream,
+    'generated': generated_stream,
+    'tau_leaping': tau_leaping_stream,
+    'slow_scale': slow_scale_stream,
+    'hybrid': hybrid_stream,
+}
+
+def simulate(substances, reactions, t_max, method='gillespie', **options):
+    """
+    Spustí simulaci zvolenou metodou.
+
+    Parameters:
+    - substances: dict {název: Substance}
+    - reactions: seznam reakcí
+    - t_max: maximální čas simulace
+    - method: název metody ze SIMULATION_METHODS
+    - options: další parametry předané simulační metodě
+
+    Returns:
+    - times, history
+    """
+    if method not in SIMULATION_METHODS:
+        raise ValueError(f"Neznámá metoda simulace: {method}")
+    return SIMULATION_METHODS[method](substances, reactions, t_max, **options)
+
+def simulation_stream(substances, reactions, t_max, method='gillespie', chunk_size=4096, **options):
+    """
+    Spustí simulaci zvolenou metodou jako generátor, který během běhu vrací
+    části záznamu (times, states) jako pole NumPy. Sloupce states odpovídají
+    pořadí látek v substances. Uzavřením generátoru se simulace ukončí.
+
+    Parameters:
+    - substances: dict {název: Substance}
+    - reactions: seznam reakcí
+    - t_max: maximální čas simulace
+    - method: název metody ze STREAM_METHODS
+    - chunk_size: počet řádků jedné části (nepoužije se, je-li zadán recorder)
+    - options: další parametry předané simulační metodě (např. rng, recorder)
+    """
+    if method not in STREAM_METHODS:
+        raise ValueError(f"Metoda {method} nepodporuje průběžný výstup.")
+    if options.get('recorder') is None:
+        options['recorder'] = EventRecorder(chunk_size=chunk_size)
+    return STREAM_METHODS[method](substances, reactions, t_max, **options)
@@ -0,0 +1,332 @@
+# slow_scale.py
+
+import itertools
+import numpy as np
+from model import compile_model
+from reaction import ReversibleReaction
+from recording import StreamOutput, collect
+from random_buffer import UniformBuffer
+
+def _read_matrix(model):
+    # Matice tvaru (kanály, látky): látky, na kterých závisí propence kanálu
+    reads = np.zeros((model.n_channels, model.n_species), dtype=bool)
+    used = (model.factor_orders > 0) | (model.factor_powers > 0) | (model.factor_reactants > 0)
+    reads[np.nonzero(used)[0], model.factor_species[used]] = True
+    rows = np.flatnonzero(model.modifiers >= 0)
+    reads[rows, model.modifiers[rows]] = True
+    return reads
+
+class FastSubsystem:
+    def __init__(self, model, source, forward, reverse):
+        """
+        Rychlá vratná reakce a látky, které mění.
+
+        Stavy dosažitelné jen touto reakcí tvoří řetězec x + xi * nu
+        (nu je změna přímým směrem, xi celé číslo). Kvazistacionární
+        rozdělení na řetězci plyne z detailní rovnováhy:
+        P(xi + 1) / P(xi) = a_přímá(x_xi) / a_zpětná(x_(xi + 1)),
+        počítá se přesně pro libovolnou stechiometrii.
+
+        Parameters:
+        - model: CompiledModel
+        - source: index reakce v seznamu reakcí
+        - forward, reverse: indexy kanálů přímého a zpětného směru
+        """
+        self.source = source
+        self.forward = forward
+        self.reverse = reverse
+        self.species, self.nu = model.changes[forward]
+
+    def chain(self, model, state):
+        """
+        Vrací stavy řetězce se současným stavem a jejich kvazistacionární
+        pravděpodobnosti.
+
+        Returns:
+        - batch: pole tvaru (stavy řetězce, látky), ostatní látky z state
+        - probabilities: pravděpodobnosti stavů
+        - propensities: propence všech kanálů ve stavech řetězce
+        """
+        amounts = state[self.species]
+        # Rozsah xi, ve kterém žádná látka neklesne pod nulu
+        positive = self.nu > 0
+        low = -int(np.min(amounts[positive] // self.nu[positive])) if positive.any() else 0
+        high = int(np.min(amounts[~positive] // -self.nu[~positive])) if (~positive).any() else 0
+        xi = np.arange(low, high + 1)
+        batch = np.repeat(state[None, :], len(xi), axis=0)
+        batch[:, self.species] = amounts + xi[:, None] * self.nu
+        propensities = model.propensities(batch)
+
+        # Souvislá část řetězce se současným stavem (xi = 0)
+        forward = propensities[:-1, self.forward]
+        reverse = propensities[1:, self.reverse]
+        broken = np.flatnonzero((forward <= 0) | (reverse <= 0))
+        current = -low
+        start = broken[broken < current].max() + 1 if (broken < current).any() else 0
+        end = broken[broken >= current].min() + 1 if (broken >= current).any() else len(xi)
+
+        log_ratio = np.log(forward[start:end - 1]) - np.log(reverse[start:end - 1])
+        log_weights = np.concatenate([[0.0], np.cumsum(log_ratio)])
+        weights = np.exp(log_weights - log_weights.max())
+        return batch[start:end], weights / weights.sum(), propensities[start:end]
+
+def detect_fast_reactions(model, reactions, state, separation=100.0, horizon=None):
+    """
+    Najde vratné reakce, jejichž tok v kvazirovnováze je aspoň
+    separation-krát větší než součet propencí ostatních (pomalých) reakcí.
+    Rychlosti se odhadují ze střední hodnoty přes kvazistacionární rozdělení
+    (viz FastSubsystem), nezávisí tedy na tom, zda je počáteční stav
+    v rovnováze (např. nulové množství komplexu). Reakce, které by sdílely
+    látky s rychlejší nalezenou reakcí, se vynechají (rychlé podsystémy
+    musí být nezávislé).
+
+    Při zadaném horizontu musí rychlá reakce navíc dospět do rovnováhy
+    za zlomek 1 / separation horizontu, jinak by se zahodil její přechodový
+    děj (bez pomalých reakcí by byla rychlá každá vratná reakce). Rychlost
+    ustálení se odhaduje jako tok dělený rozptylem polohy na řetězci
+    (pro A ⇌ B je to k_přímá + k_zpětná).
+
+    Parameters:
+    - model: CompiledModel
+    - reactions: seznam reakcí
+    - state: stavový vektor
+    - separation: poměr toku rychlé reakce a součtu propencí pomalých reakcí
+    - horizon: zbývající doba simulace (volitelné)
+
+    Returns:
+    - indexy rychlých reakcí v seznamu reakcí
+    """
+    current = model.propensities(state)
+    reads = _read_matrix(model)
+    candidates = [i for i, reaction in enumerate(reactions) if isinstance(reaction, ReversibleReaction)]
+    subsystems = {}
+    speeds = {}
+    relaxation = {}
+    # Odhad propence každého kanálu: nejvyšší z hodnoty v současném stavu
+    # a středních hodnot v kvazirovnováze kandidátů, na kterých závisí
+    estimates = current.copy()
+    for source in candidates:
+        forward, reverse = np.flatnonzero(model.sources == source)
+        subsystem = FastSubsystem(model, source, forward, reverse)
+        _, probabilities, propensities = subsystem.chain(model, state)
+        subsystems[source] = subsystem
+        speeds[source] = probabilities @ propensities[:, forward]
+        position = np.arange(len(probabilities))
+        variance = probabilities @ (position - probabilities @ position) ** 2
+        relaxation[source] = speeds[source] / variance if variance > 0 else np.inf
+        dependent = reads[:, subsystem.species].any(axis=1)
+        estimates[dependent] = np.maximum(estimates[dependent], probabilities @ propensities[:, dependent])
+
+    if horizon is not None and horizon > 0:
+        candidates = [source for source in candidates if relaxation[source] * horizon >= separation]
+    while True:
+        slow_total = estimates[~np.isin(model.sources, candidates)].sum()
+        kept = [source for source in candidates if speeds[source] > 0 and speeds[source] >= separation * slow_total]
+        if kept == candidates:
+            break
+        candidates = kept
+
+    # Nezávislost: rychlejší reakce mají přednost
+    fast = []
+    used = np.zeros(model.n_species, dtype=bool)
+    for source in sorted(candidates, key=lambda source: -speeds[source]):
+        subsystem = subsystems[source]
+        touched = reads[[subsystem.forward, subsystem.reverse]].any(axis=0)
+        touched[subsystem.species] = True
+        if not (touched & used).any():
+            fast.append(source)
+            used |= touched
+    return sorted(fast)
+
+def _subsystems(model, reactions, fast):
+    subsystems = []
+    used = np.zeros(model.n_species, dtype=bool)
+    reads = _read_matrix(model)
+    for source in fast:
+        if not isinstance(reactions[source], ReversibleReaction):
+            raise ValueError("Rychlá může být jen vratná reakce (jiné reakce nemají kvazirovnováhu).")
+        forward, reverse = np.flatnonzero(model.sources == source)
+        touched = reads[[forward, reverse]].any(axis=0)
+        touched[model.changes[forward][0]] = True
+        if (touched & used).any():
+            raise ValueError("Rychlé reakce nesmí sdílet látky, každá musí tvořit samostatný podsystém.")
+        used |= touched
+        subsystems.append(FastSubsystem(model, source, forward, reverse))
+    return subsystems
+
+def _sample(probabilities, uniform):
+    cumulative = np.cumsum(probabilities)
+    return min(int(np.searchsorted(cumulative, uniform * cumulative[-1], side='right')), len(cumulative) - 1)
+
+def slow_scale_stream(substances, reactions, t_max, fast=None, separation=100.0, rng=None, recorder=None,
+                      instrumentation=None, checkpoint=None, stop=None):
+    """
+    Pomalá stochastická simulace (slow-scale SSA, Cao, Gillespie, Petzold
+    2005) jako generátor průběžných výsledků (viz simulation.gillespie_stream).
+
+    Rychlé vratné reakce (např. vazba enzymu na substrát) se nesimulují
+    po jednotlivých reakcích. Jejich látky se považují za rozdělené podle
+    kvazistacionárního rozdělení rychlé reakce (viz FastSubsystem), které
+    se přepočítá po každé pomalé reakci. Pomalé reakce probíhají s efektivní
+    propencí rovnou střední hodnotě propence přes toto rozdělení, stav
+    rychlých látek v okamžiku pomalé reakce se losuje podmíněně na ni a po
+    ní se znovu vylosuje z kvazirovnováhy. Je to stochastický protějšek
+    redukce, kterou ručně zavádí MichaelisMentenReaction.
+
+    Počet kroků je úměrný jen počtu pomalých reakcí, zrychlení proti přesné
+    simulaci je zhruba poměr rychlostí rychlých a pomalých reakcí. Každá
+    pomalá reakce ale stojí výpočet propencí ve všech stavech řetězců
+    rychlých reakcí, tedy O(počet molekul) pro velké zásoby látek rychlých
+    reakcí (tisíce molekul znamenají tisíce stavů na reakci). Chyba
+    rozdělení pomalých veličin je řádově 1/separation (poměr časových
+    škál), rychlé látky mají v záznamu správné rozdělení, ale ne časovou
+    korelaci na rychlé škále.
+
+    Parameters:
+    - substances: dict {název: Substance}
+    - reactions: seznam reakcí
+    - t_max: maximální čas simulace
+    - fast: rychlé reakce (objekty nebo indexy vratných reakcí, které
+      nesdílejí látky); výchozí se najdou v počátečním stavu funkcí
+      detect_fast_reactions
+    - separation: požadovaný poměr rychlosti rychlých a pomalých reakcí
+      při automatickém výběru
+    - rng, recorder, instrumentation, checkpoint, stop: viz simulation.gillespie_stream
+      (záznam výchozí po každé pomalé reakci)
+    """
+    model = compile_model(substances, reactions)
+    uniforms = UniformBuffer(rng)
+    changes = model.changes
+
+    # Stav sdílený s objekty Substance, změny se do látek zapisují přímo
+    state = model.shared_state()
+    time = 0
+    saved = None
+    if checkpoint is not None and checkpoint.started:
+        time = checkpoint.restore(substances, uniforms)
+        saved = checkpoint.engine_state('slow_scale')
+
+    if saved is not None:
+        fast = saved['fast']
+    elif fast is None:
+        fast = detect_fast_reactions(model, reactions, state, separation, t_max - time)
+    else:
+        fast = sorted(int(reaction) if isinstance(reaction, (int, np.integer)) else reactions.index(reaction)
+                      for reaction in fast)
+    subsystems = _subsystems(model, reactions, fast)
+    # Čas pomalé reakce vylosovaný za koncem simulace, při prodloužení se použije
+    next_time = saved.get('next_time') if saved is not None else None
+    engine_state = {'fast': fast, 'next_time': None}
+
+    slow = ~np.isin(model.sources, fast)
+    slow_channels = np.flatnonzero(slow)
+    reads = _read_matrix(model)
+    # Podsystémy, na jejichž látkách závisí propence pomalého kanálu
+    dependencies = {
+        channel: [s for s, subsystem in enumerate(subsystems) if reads[channel, subsystem.species].any()]
+        for channel in slow_channels
+    }
+
+    output = StreamOutput('slow_scale', model.names, uniforms, recorder, checkpoint, stop, lambda: engine_state)
+    output.start(time, state)
+    if instrumentation is not None:
+        instrumentation.start(reactions, wrap=False)
+        sources = model.sources
+
+    def relax(sample=True):
+        # Kvazirovnovážná rozdělení v současném stavu a vylosování rychlých látek
+        chains = [subsystem.chain(model, state) for subsystem in subsystems]
+        if sample:
+            for subsystem, (batch, probabilities, _) in zip(subsystems, chains):
+                state[subsystem.species] = batch[_sample(probabilities, uniforms.next()), subsystem.species]
+        return chains
+
+    def joint(channel, chains, involved):
+        # Stavy a váhy pro kanál závislý na více podsystémech (všechny kombinace)
+        combinations = list(itertools.product(*(range(len(chains[s][1])) for s in involved)))
+        batch = np.repeat(state[None, :], len(combinations), axis=0)
+        weights = np.ones(len(combinations))
+        for k, s in enumerate(involved):
+            rows = np.array([combination[k] for combination in combinations])
+            species = subsystems[s].species
+            batch[:, species] = chains[s][0][rows][:, species]
+            weights *= chains[s][1][rows]
+        return batch, weights * model.propensities(batch)[:, channel]
+
+    # Stav obnovený z kontrolního bodu už obsahuje vylosované rychlé látky
+    # a rozdělení na řetězci na poloze v něm nezávisí, pokračování je tak
+    # totožné s nepřerušenou simulací
+    chains = relax(sample=saved is None)
+    if saved is None and subsystems:
+        # Vylosovaný stav rychlých látek se zaznamená v počátečním čase
+        if output.step(time, state):
+            yield from output.emit()
+    while time < t_max and not output.stopped:
+        # Efektivní propence pomalých kanálů
+        current = model.propensities(state)
+        effective = np.zeros(len(slow_channels))
+        for k, channel in enumerate(slow_channels):
+            involved = dependencies[channel]
+            if not involved:
+                effective[k] = current[channel]
+            elif len(involved) == 1:
+                _, probabilities, propensities = chains[involved[0]]
+                effective[k] = probabilities @ propensities[:, channel]
+            else:
+                effective[k] = joint(channel, chains, involved)[1].sum()
+        cumulative = np.cumsum(effective)
+        total_propensity = cumulative[-1] if len(cumulative) else 0
+        if total_propensity <= 0:
+            # Rychlé reakce běží dál, stav zůstává v kvazirovnováze až do t_max,
+            # kde se zaznamená
+            if any(len(probabilities) > 1 for _, probabilities, _ in chains):
+                time = t_max
+                if output.step(time, state):
+                    yield from output.emit()
+            break
+
+        # Pomalých reakcí je málo, reakce až po t_max by zkreslila koncový
+        # stav, proto se neprovede; její čas se uloží do kontrolního bodu
+        if next_time is not None:
+            event_time, next_time = next_time, None
+        else:
+            event_time = time + uniforms.exponential(total_propensity)
+        if event_time > t_max:
+            engine_state['next_time'] = event_time
+            time = t_max
+            break
+        time = event_time
+        channel = slow_channels[_sample(effective, uniforms.next())]
+
+        # Stav rychlých látek v okamžiku pomalé reakce, podmíněný na ni
+        involved = dependencies[channel]
+        if len(involved) == 1:
+            batch, probabilities, propensities = chains[involved[0]]
+            row = _sample(probabilities * propensities[:, channel], uniforms.next())
+            species = subsystems[involved[0]].species
+            state[species] = batch[row, species]
+        elif involved:
+            batch, weights = joint(channel, chains, involved)
+            state[:] = batch[_sample(weights, uniforms.next())]
+        species, deltas = changes[channel]
+        state[species] += deltas
+        chains = relax()
+
+        if instrumentation is not None:
+            instrumentation.event(time, total_propensity, sources[channel])
+        if output.step(time, state) and (yield from output.emit()):
+            break
+
+    if instrumentation is not None:
+        instrumentation.finish(time)
+    yield from output.finish(time, state, t_max)
+
+def slow_scale_simulation(substances, reactions, t_max, **options):
+    """
+    Pomalá stochastická simulace s kvazirovnováhou rychlých reakcí (viz slow_scale_stream).
+
+    Returns:
+    - times, history ve stejném tvaru jako gillespie_simulation
+    """
+    names = [substance.name for substance in substances.values()]
+    return collect(slow_scale_stream(substances, reactions, t_max, **options), names)
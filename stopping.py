@@ -0,0 +1,254 @@
+# stopping.py
+
+import numpy as np
+
+class StopCondition:
+    # Parametry konstruktoru uvedené v popisu podmínky (viz describe)
+    parameters = ()
+
+    def __init__(self):
+        """
+        Základ podmínek předčasného ukončení simulace.
+
+        Simulační metoda volá start na začátku, check po každé reakci
+        (vrací True, má-li simulace skončit) a finish na konci. Po skončení
+        obsahuje reason důvod ukončení a time čas ukončení. Pokud podmínka
+        nenastala, reason je 't_max' (dosažen konec simulace) nebo
+        'no_reactions' (žádná reakce už nemůže proběhnout).
+        """
+        self.reason = None
+        self.time = None
+
+    def start(self, names, time, state):
+        self.names = list(names)
+        self.reason = None
+        self.time = None
+
+    def check(self, time, state):
+        return False
+
+    def _index(self, species):
+        # Indexy látek ve stavovém vektoru (výchozí všechny)
+        if species is None:
+            return np.arange(len(self.names))
+        if isinstance(species, str):
+            species = [species]
+        try:
+            return np.array([self.names.index(name) for name in species], dtype=np.int64)
+        except ValueError:
+            raise ValueError(f"Neznámá látka v podmínce ukončení: {species}") from None
+
+    def triggered(self, time, reason):
+        self.time = float(time)
+        self.reason = reason
+        return True
+
+    def finish(self, time, t_max):
+        """
+        Zaznamená konec simulace, pokud ho nezpůsobila podmínka.
+        """
+        if self.reason is None:
+            self.time = float(time)
+            self.reason = 't_max' if time >= t_max else 'no_reactions'
+
+    def describe(self):
+        """
+        Popis podmínky serializovatelný do JSON (typ a parametry), např. pro
+        klíč mezipaměti průzkumu parametrů (viz sweep.point_key).
+        """
+        description = {'type': type(self).__name__}
+        for name in self.parameters:
+            value = getattr(self, name)
+            description[name] = list(value) if isinstance(value, tuple) else value
+        return description
+
+    def __repr__(self):
+        if self.reason is None:
+            return f"{type(self).__name__}()"
+        return f"{type(self).__name__}(důvod {self.reason!r}, čas {self.time:.6g})"
+
+class Extinction(StopCondition):
+    parameters = ('species',)
+
+    def __init__(self, species):
+        """
+        Ukončí simulaci, když množství některé ze zadaných látek klesne na nulu.
+
+        Parameters:
+        - species: název látky nebo seznam názvů
+        """
+        super().__init__()
+        self.species = species
+
+    def start(self, names, time, state):
+        super().start(names, time, state)
+        self._watched = self._index(self.species)
+
+    def check(self, time, state):
+        if not state[self._watched].all():
+            extinct = [self.names[i] for i in self._watched if state[i] == 0]
+            return self.triggered(time, f"extinction:{','.join(extinct)}")
+        return False
+
+class Fixation(StopCondition):
+    parameters = ('species', 'level')
+
+    def __init__(self, species, level):
+        """
+        Ukončí simulaci, když množství látky dosáhne zadané hodnoty
+        (např. celé populace).
+
+        Parameters:
+        - species: název látky
+        - level: hodnota, při které simulace skončí
+        """
+        super().__init__()
+        self.species = species
+        self.level = level
+
+    def start(self, names, time, state):
+        super().start(names, time, state)
+        self._watched = int(self._index(self.species)[0])
+
+    def check(self, time, state):
+        if state[self._watched] >= self.level:
+            return self.triggered(time, f"fixation:{self.species}")
+        return False
+
+class Stationarity(StopCondition):
+    parameters = ('species', 'window', 'tolerance', 'samples', 'patience')
+
+    def __init__(self, species=None, window=1.0, tolerance=0.02, samples=20, patience=2):
+        """
+        Ukončí simulaci, když se průběh vybraných látek ustálí.
+
+        Stav se vzorkuje v pravidelných časech (samples vzorků na okno délky
+        window) a porovnávají se průměry po sobě jdoucích oken. Simulace
+        skončí, když se průměr každé látky v patience po sobě jdoucích
+        oknech změní nejvýše o tolerance (relativně, u malých množství
+        absolutně vůči 1). V kroku simulace stojí kontrola jedno porovnání
+        času, vzorek se bere jen při překročení času vzorku.
+
+        Parameters:
+        - species: sledované látky (výchozí všechny)
+        - window: délka okna (v čase simulace)
+        - tolerance: největší relativní změna průměru mezi okny
+        - samples: počet vzorků v okně
+        - patience: počet po sobě jdoucích ustálených oken
+        """
+        super().__init__()
+        self.species = species
+        self.window = window
+        self.tolerance = tolerance
+        self.samples = samples
+        self.patience = patience
+
+    def start(self, names, time, state):
+        super().start(names, time, state)
+        self._watched = self._index(self.species)
+        self._step = self.window / self.samples
+        self._next_sample = time + self._step
+        self._sum = np.zeros(len(self._watched))
+        self._count = 0
+        self._previous = None
+        self._stable = 0
+
+    def check(self, time, state):
+        if time < self._next_sample:
+            return False
+        # Všechny překročené časy vzorků dostanou aktuální stav
+        crossed = int((time - self._next_sample) // self._step) + 1
+        self._next_sample += crossed * self._step
+        self._sum += crossed * state[self._watched]
+        self._count += crossed
+        if self._count < self.samples:
+            return False
+
+        mean = self._sum / self._count
+        self._sum[:] = 0
+        self._count = 0
+        if self._previous is not None:
+            change = np.abs(mean - self._previous)
+            if np.all(change <= self.tolerance * np.maximum(np.abs(self._previous), 1.0)):
+                self._stable += 1
+            else:
+                self._stable = 0
+        self._previous = mean
+        if self._stable >= self.patience:
+            return self.triggered(time, 'stationarity')
+        return False
+
+class Predicate(StopCondition):
+    parameters = ('every', 'label')
+
+    def __init__(self, function, every=1, reason='predicate', key=None):
+        """
+        Ukončí simulaci, když uživatelská funkce stavu vrátí True.
+
+        Parameters:
+        - function: funkce function(time, amounts), amounts je dict {název: množství}
+        - every: funkce se volá jen po každé N-té reakci
+        - reason: důvod ukončení uvedený ve výsledku
+        - key: název funkce v popisu podmínky (povinný pro lambda funkce,
+          vnořené funkce a uzávěry, které nelze určit jménem)
+        """
+        super().__init__()
+        self.function = function
+        self.key = key
+        self.every = every
+        self.label = reason
+
+    def start(self, names, time, state):
+        super().start(names, time, state)
+        self._events = 0
+
+    def check(self, time, state):
+        self._events += 1
+        if self._events % self.every:
+            return False
+        if self.function(time, dict(zip(self.names, state.tolist()))):
+            return self.triggered(time, self.label)
+        return False
+
+    def describe(self):
+        # Funkce se v popisu určuje jménem (modul a kvalifikovaný název);
+        # lambda funkce, vnořené funkce a uzávěry by se jménem nerozlišily
+        description = super().describe()
+        if self.key is not None:
+            description['function'] = self.key
+            return description
+        name = getattr(self.function, '__qualname__', None)
+        if (name is None or '<lambda>' in name or '<locals>' in name
+                or getattr(self.function, '__closure__', None)):
+            raise TypeError(f"Funkci podmínky {name or type(self.function).__name__} nelze určit "
+                            f"jménem, zadejte parametr key.")
+        description['function'] = f"{self.function.__module__}.{name}"
+        return description
+
+class AnyOf(StopCondition):
+    def __init__(self, *conditions):
+        """
+        Ukončí simulaci, když nastane kterákoli z podmínek.
+        Důvod a čas ukončení se převezmou z podmínky, která nastala.
+        """
+        super().__init__()
+        self.conditions = list(conditions)
+
+    def start(self, names, time, state):
+        super().start(names, time, state)
+        for condition in self.conditions:
+            condition.start(names, time, state)
+
+    def check(self, time, state):
+        for condition in self.conditions:
+            if condition.check(time, state):
+                return self.triggered(time, condition.reason)
+        return False
+
+    def finish(self, time, t_max):
+        super().finish(time, t_max)
+        for condition in self.conditions:
+            condition.finish(time, t_max)
+
+    def describe(self):
+        return {'type': 'AnyOf', 'conditions': [condition.describe() for condition in self.conditions]}
@@ -1,9 +1,77 @@
-# substance.py
-
-class Substance:
-    def __init__(self, name, amount):
-        self.name = name          # Název látky
-        self.amount = amount      # Množství látky (počet molekul)
-
-    def __repr__(self):
-        return f"{self.name}: {self.amount}"
+# substance.py
+
+from array import array
+import numpy as np
+
+def _count(value):
+    # Množství se ukládá jako celé číslo, přijme se i celočíselná hodnota
+    # jiného typu (např. 10.0 nebo numpy.int64)
+    count = int(value)
+    if count != value:
+        raise ValueError(f"Množství látky musí být celé číslo, ne {value!r}.")
+    return count
+
+class Substance:
+    __slots__ = ('name', '_values', '_index')
+
+    def __init__(self, name, amount):
+        self.name = name          # Název látky
+        # Množství látky (počet molekul) je prvek celočíselného pole, samostatná
+        # látka má vlastní pole o jednom prvku, látky v simulaci sdílejí jedno
+        # pole (viz SubstanceState)
+        self._values = array('q', [_count(amount)])
+        self._index = 0
+
+    @property
+    def amount(self):
+        return self._values[self._index]
+
+    @amount.setter
+    def amount(self, value):
+        self._values[self._index] = _count(value)
+
+    def __repr__(self):
+        return f"{self.name}: {self.amount}"
+
+class SubstanceState:
+    def __init__(self, substances):
+        """
+        Společný stav látek v jednom souvislém celočíselném poli.
+
+        Látky se na pole navážou, takže čtení i zápis substance.amount
+        pracují přímo s prvkem pole. Celý stav je zároveň dostupný jako pole
+        NumPy bez kopírování (array), záznam stavu je tak jedna kopie pole.
+
+        Parameters:
+        - substances: látky v pořadí prvků stavu
+        """
+        self.substances = list(substances)
+        self.values = array('q', [substance.amount for substance in self.substances])
+        for index, substance in enumerate(self.substances):
+            substance._values = self.values
+            substance._index = index
+        self.array = np.frombuffer(self.values, dtype=np.int64)
+        self.index = {substance: index for index, substance in enumerate(self.substances)}
+
+    @property
+    def names(self):
+        return [substance.name for substance in self.substances]
+
+    def changes(self, reaction):
+        """
+        Převede čistou změnu množství látek při proběhnutí reakce na zápisy do pole.
+
+        Returns:
+        - seznam dvojic (index, změna), nebo None, pokud reakce mění látku,
+          která do stavu nepatří
+        """
+        try:
+            return [(self.index[substance], delta) for substance, delta in reaction.stoichiometry().items()]
+        except KeyError:
+            return None
+
+    def snapshot(self):
+        """
+        Vrací kopii aktuálního stavu jako pole NumPy.
+        """
+        return self.array.copy()
@@ -0,0 +1,79 @@
+# sum_tree.py
+
+class SumTree:
+    def __init__(self, values):
+        """
+        Úplný binární strom součtů propencí. Listy obsahují propence reakcí,
+        každý vnitřní uzel součet svých dvou potomků, kořen celkový součet.
+
+        Změna jedné propence i výběr reakce podle kumulativní hodnoty stojí
+        O(log M) operací pro M reakcí místo O(M) při procházení seznamu.
+        Součty na cestě ke kořeni se při změně počítají znovu z potomků
+        (ne přičtením rozdílu), takže se zaokrouhlovací chyby nehromadí
+        a součet samých nul je přesně nula.
+
+        Parameters:
+        - values: počáteční propence
+        """
+        n = len(values)
+        size = 1
+        while size < n:
+            size *= 2
+        self.n = n
+        self.size = size
+        self.tree = [0.0] * (2 * size)
+        self.tree[size:size + n] = [float(value) for value in values]
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Přepočítá všechny vnitřní uzly z listů.
+        """
+        tree = self.tree
+        for i in range(self.size - 1, 0, -1):
+            tree[i] = tree[2 * i] + tree[2 * i + 1]
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, index):
+        return self.tree[self.size + index]
+
+    def update(self, index, value):
+        """
+        Nastaví propenci reakce a přepočítá součty na cestě ke kořeni.
+        """
+        tree = self.tree
+        i = self.size + index
+        tree[i] = float(value)
+        i //= 2
+        while i:
+            tree[i] = tree[2 * i] + tree[2 * i + 1]
+            i //= 2
+
+    def sample(self, target):
+        """
+        Najde reakci, v jejímž úseku kumulativních propencí leží target.
+
+        Parameters:
+        - target: hodnota z [0, total)
+
+        Returns:
+        - index reakce (vždy s kladnou propencí, je-li total kladný)
+        """
+        tree = self.tree
+        size = self.size
+        i = 1
+        while i < size:
+            left = tree[2 * i]
+            # Do pravého podstromu jen tehdy, když v něm je kladná propence
+            if target < left or tree[2 * i + 1] <= 0:
+                i = 2 * i
+            else:
+                target -= left
+                i = 2 * i + 1
+        return i - size
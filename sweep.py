@@ -0,0 +1,347 @@
+# sweep.py
+
+import copy
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from model_file import parse_model
+from ensemble import run_ensemble
+from simulation import simulate, SIMULATION_METHODS
+from stopping import StopCondition
+
+# Výchozí horní mez velikosti mezipaměti výsledků (bajty)
+DEFAULT_CACHE_SIZE = 100 * 1024 * 1024
+
+def set_parameter(data, path, value):
+    """
+    Nastaví hodnotu v popisu modelu (viz model_file.parse_model) podle cesty.
+
+    Cesta je řetězec klíčů oddělených tečkou, čísla jsou indexy v seznamu,
+    např. 'reactions.0.k_forward' (rychlostní konstanta první reakce) nebo
+    'substances.S' (počáteční množství látky S).
+
+    Parameters:
+    - data: popis modelu (mění se na místě)
+    - path: cesta k parametru
+    - value: nová hodnota
+    """
+    keys = path.split('.')
+    target = data
+    try:
+        for key in keys[:-1]:
+            target = target[int(key)] if isinstance(target, list) else target[key]
+        last = keys[-1]
+        if isinstance(target, list):
+            target[int(last)] = value
+        elif last in target:
+            target[last] = value
+        else:
+            raise KeyError(last)
+    except (KeyError, IndexError, ValueError, TypeError):
+        raise ValueError(f"Parametr {path} v modelu neexistuje.") from None
+
+def parameter_grid(axes):
+    """
+    Vytvoří body mřížky parametrů (všechny kombinace hodnot).
+
+    Parameters:
+    - axes: dict {cesta parametru: seznam hodnot}
+
+    Returns:
+    - seznam bodů, každý jako dict {cesta parametru: hodnota}
+    """
+    paths = list(axes)
+    return [dict(zip(paths, values)) for values in itertools.product(*(axes[path] for path in paths))]
+
+def parameter_samples(ranges, n_samples, seed=None, log=False):
+    """
+    Vytvoří náhodné body parametrů rovnoměrně rozložené v zadaných mezích.
+
+    Parameters:
+    - ranges: dict {cesta parametru: (dolní mez, horní mez)}
+    - n_samples: počet bodů
+    - seed: seed generátoru náhodných čísel
+    - log: rovnoměrně v logaritmu (vhodné pro rychlostní konstanty
+      v rozsahu několika řádů)
+
+    Returns:
+    - seznam bodů, každý jako dict {cesta parametru: hodnota}
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for path, (low, high) in ranges.items():
+        if log:
+            columns[path] = np.exp(rng.uniform(np.log(low), np.log(high), n_samples))
+        else:
+            columns[path] = rng.uniform(low, high, n_samples)
+    return [{path: float(columns[path][i]) for path in ranges} for i in range(n_samples)]
+
+class ResultCache:
+    def __init__(self, directory, max_size=DEFAULT_CACHE_SIZE):
+        """
+        Mezipaměť výsledků na disku, jeden soubor JSON na výsledek.
+
+        Při překročení max_size se mažou nejdéle nepoužité výsledky (LRU),
+        čas posledního použití je čas změny souboru.
+
+        Parameters:
+        - directory: adresář mezipaměti (vytvoří se)
+        - max_size: horní mez celkové velikosti souborů (bajty)
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def get(self, key):
+        """
+        Vrací uložený výsledek, nebo None, pokud v mezipaměti není.
+        """
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return value
+
+    def put(self, key, value):
+        """
+        Uloží výsledek a případně odstraní nejdéle nepoužité výsledky.
+        """
+        path = self._path(key)
+        temporary = path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(value, f)
+        os.replace(temporary, path)
+        self.evict()
+
+    def evict(self):
+        """
+        Odstraní nejdéle nepoužité výsledky, dokud velikost nepřesahuje max_size.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                try:
+                    info = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, name))
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, name in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            size -= entry_size
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.directory, name))
+
+def _option_description(name, value):
+    # Parametr simulace v klíči mezipaměti: podmínka ukončení svým popisem,
+    # ostatní hodnoty musí být serializovatelné do JSON
+    if isinstance(value, StopCondition):
+        return value.describe()
+    try:
+        json.dumps(value)
+    except TypeError:
+        raise TypeError(f"Parametr simulace {name} (typ {type(value).__name__}) nelze použít "
+                        f"v průzkumu parametrů, jeho hodnotu nelze zapsat do klíče mezipaměti.") from None
+    return value
+
+def point_key(data, t_max, method, n_replicates, n_points, seed, options):
+    """
+    Klíč výsledku v mezipaměti: hash popisu modelu s dosazenými parametry,
+    nastavení simulace, seed a metody. Podmínka ukončení (viz stopping)
+    se do klíče zapíše svým popisem (StopCondition.describe).
+    """
+    description = {
+        'model': {'substances': data['substances'], 'reactions': data.get('reactions', [])},
+        't_max': t_max,
+        'method': method,
+        'n_replicates': n_replicates,
+        'n_points': n_points,
+        'seed': seed,
+        'options': {name: _option_description(name, value) for name, value in options.items()},
+    }
+    text = json.dumps(description, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def _run_point(data, t_max, method, n_replicates, n_points, key, options):
+    # Spouští se v pracovním procesu; seed replikací je odvozen z klíče,
+    # výsledek bodu tak nezávisí na jeho pořadí v průzkumu
+    substances, reactions, _ = parse_model(data)
+    names = list(substances)
+    grid = np.linspace(0, t_max, n_points)
+    if method == 'ode':
+        _, history = simulate(substances, reactions, t_max, method='ode', n_points=n_points, **options)
+        mean = {name: np.asarray(history[name], dtype=float) for name in names}
+        std = {name: np.zeros(n_points) for name in names}
+    else:
+        result = run_ensemble(substances, reactions, t_max, n_replicates=n_replicates, method=method,
+                              grid=grid, percentiles=(50,), seed=int(key[:16], 16), n_workers=1, **options)
+        mean = result.mean
+        std = {name: np.sqrt(result.variance[name]) for name in names}
+
+    metrics = {}
+    if options.get('stop') is not None:
+        # Podíl replikací podle důvodu ukončení a průměrný čas ukončení
+        for reason in sorted(set(result.stop_reasons)):
+            name = reason.replace(',', '+')
+            metrics[f'stop_{name}_fraction'] = result.stop_reasons.count(reason) / n_replicates
+        metrics['stop_time_mean'] = float(result.stop_times.mean())
+    for name in names:
+        metrics[f'{name}_final_mean'] = float(mean[name][-1])
+        metrics[f'{name}_final_std'] = float(std[name][-1])
+        values = mean[name]
+        if t_max > 0:
+            # Lichoběžníkové pravidlo na mřížce
+            metrics[f'{name}_time_mean'] = float(np.sum((values[1:] + values[:-1]) * np.diff(grid)) / (2 * t_max))
+        else:
+            metrics[f'{name}_time_mean'] = float(values[0])
+    return metrics
+
+class SweepResult:
+    def __init__(self, parameters, points, metrics, n_cached):
+        """
+        Tabulka souhrnných metrik pro body průzkumu parametrů.
+
+        Parameters:
+        - parameters: cesty parametrů (sloupce s hodnotami parametrů)
+        - points: seznam bodů {cesta parametru: hodnota}
+        - metrics: seznam slovníků metrik ve stejném pořadí jako points
+          (metrika, která v bodě chybí, např. důvod ukončení, který v něm
+          nenastal, má hodnotu 0)
+        - n_cached: počet bodů převzatých z mezipaměti
+        """
+        self.parameters = list(parameters)
+        self.metrics = list(dict.fromkeys(name for row in metrics for name in row))
+        self.n_cached = n_cached
+        self.columns = {path: np.array([point[path] for point in points], dtype=float) for path in self.parameters}
+        for name in self.metrics:
+            self.columns[name] = np.array([row.get(name, 0.0) for row in metrics], dtype=float)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __repr__(self):
+        return (f"SweepResult({len(self)} bodů, {len(self.parameters)} parametrů, "
+                f"{len(self.metrics)} metrik, {self.n_cached} z mezipaměti)")
+
+    def table(self):
+        """
+        Vrací tabulku jako pole tvaru (body, sloupce) a názvy sloupců.
+        """
+        names = list(self.columns)
+        return np.column_stack([self.columns[name] for name in names]), names
+
+    def to_csv(self, path):
+        """
+        Zapíše tabulku do souboru CSV.
+        """
+        table, names = self.table()
+        np.savetxt(path, table, fmt='%.10g', delimiter=',', header=','.join(names), comments='')
+
+def run_sweep(model, points, t_max, method='gillespie', n_replicates=20, n_points=200, seed=0,
+              cache_dir=None, cache_size=DEFAULT_CACHE_SIZE, n_workers=None, **options):
+    """
+    Spustí simulace pro body parametrů paralelně ve více procesech
+    a vrátí tabulku souhrnných metrik.
+
+    Pro každý bod se spustí n_replicates replikací (viz ensemble.run_ensemble)
+    a spočítá se střední hodnota a směrodatná odchylka množství každé látky
+    v čase t_max a časový průměr střední hodnoty. Výsledky se ukládají do
+    mezipaměti na disku pod hashem modelu, parametrů, seed a metody, takže
+    opakovaný nebo překrývající se průzkum spočítá jen nové body. Na systémech
+    bez fork je nutné volat funkci pod podmínkou if __name__ == '__main__'.
+
+    Parameters:
+    - model: popis modelu (viz model_file.parse_model) nebo cesta k souboru JSON
+    - points: seznam bodů {cesta parametru: hodnota} (viz parameter_grid,
+      parameter_samples a set_parameter)
+    - t_max: maximální čas simulace
+    - method: název metody ze SIMULATION_METHODS
+    - n_replicates: počet replikací v každém bodě (u 'ode' se nepoužije)
+    - n_points: počet časů mřížky pro časový průměr
+    - seed: seed průzkumu (výsledky jsou reprodukovatelné)
+    - cache_dir: adresář mezipaměti (výchozí bez mezipaměti)
+    - cache_size: horní mez velikosti mezipaměti (bajty)
+    - n_workers: počet procesů (výchozí počet jader, 1 = bez paralelizace)
+    - options: další parametry předané simulační metodě; podmínka ukončení
+      stop se kopíruje pro každou replikaci a podíly důvodů ukončení jsou
+      metrikami stop_<důvod>_fraction, průměrný čas ukončení stop_time_mean
+
+    Returns:
+    - SweepResult
+    """
+    if method not in SIMULATION_METHODS:
+        raise ValueError(f"Neznámá metoda simulace: {method}")
+    if method == 'ode' and options.get('stop') is not None:
+        raise ValueError("Deterministickou metodu 'ode' nelze kombinovat s podmínkou ukončení (stop).")
+    if isinstance(model, str):
+        with open(model, encoding='utf-8') as f:
+            model = json.load(f)
+    cache = ResultCache(cache_dir, cache_size) if cache_dir is not None else None
+    parameters = list(points[0]) if points else []
+
+    # Popis modelu a klíč pro každý bod
+    tasks = []
+    for point in points:
+        data = copy.deepcopy(model)
+        for path, value in point.items():
+            # Hodnoty NumPy (např. z numpy.linspace) jako čísla Pythonu kvůli JSON
+            set_parameter(data, path, value.item() if isinstance(value, np.generic) else value)
+        tasks.append((data, point_key(data, t_max, method, n_replicates, n_points, seed, options)))
+
+    metrics = [None] * len(points)
+    pending = []
+    for i, (data, key) in enumerate(tasks):
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            metrics[i] = cached
+        else:
+            pending.append(i)
+    n_cached = len(points) - len(pending)
+
+    # Stejné body se počítají jen jednou
+    first = {}
+    for i in pending:
+        first.setdefault(tasks[i][1], i)
+    unique = list(first.values())
+    n_workers = min(n_workers or os.cpu_count() or 1, max(1, len(unique)))
+
+    def store(i, value):
+        if cache is not None:
+            cache.put(tasks[i][1], value)
+        metrics[i] = value
+
+    if n_workers == 1:
+        for i in unique:
+            store(i, _run_point(tasks[i][0], t_max, method, n_replicates, n_points, tasks[i][1], options))
+    elif unique:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = {
+                executor.submit(_run_point, tasks[i][0], t_max, method, n_replicates, n_points,
+                                tasks[i][1], options): i
+                for i in unique
+            }
+            # Hotové body se ukládají hned, přerušený průzkum o ně nepřijde
+            for future in as_completed(futures):
+                store(futures[future], future.result())
+    for i in pending:
+        if metrics[i] is None:
+            metrics[i] = metrics[first[tasks[i][1]]]
+
+    return SweepResult(parameters, points, metrics, n_cached)
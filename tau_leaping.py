@@ -0,0 +1,225 @@
+# tau_leaping.py
+
+import math
+import numpy as np
+from model import compile_model
+from recording import StreamOutput, collect
+from substance import SubstanceState
+from random_buffer import UniformBuffer, select_linear
+
+def highest_orders(model):
+    """
+    Určí pro každou látku nejvyšší řád reakce, ve které vystupuje jako
+    reaktant, a největší stechiometrický koeficient látky v reakcích
+    tohoto řádu (Cao, Gillespie, Petzold 2006).
+
+    Returns:
+    - hor, hor_stoich: celočíselná pole tvaru (látky,)
+    """
+    reactants = model.factor_reactants
+    channel_orders = reactants.sum(axis=1)
+    hor = np.zeros(model.n_species, dtype=np.int64)
+    hor_stoich = np.zeros(model.n_species, dtype=np.int64)
+    for j, order in enumerate(channel_orders):
+        for k in np.flatnonzero(reactants[j]):
+            s = model.factor_species[j, k]
+            if order > hor[s]:
+                hor[s] = order
+                hor_stoich[s] = reactants[j, k]
+            elif order == hor[s]:
+                hor_stoich[s] = max(hor_stoich[s], reactants[j, k])
+    return hor, hor_stoich
+
+def _g_factors(state, hor, hor_stoich):
+    # Funkce g_i z výběru kroku podle Cao, Gillespie, Petzold
+    x1 = np.maximum(state - 1, 1)
+    x2 = np.maximum(state - 2, 1)
+    g = np.where(hor > 0, hor, 1).astype(float)
+    g = np.where((hor == 2) & (hor_stoich == 2), 2 + 1 / x1, g)
+    g = np.where((hor == 3) & (hor_stoich == 2), 1.5 * (2 + 1 / x1), g)
+    g = np.where((hor == 3) & (hor_stoich >= 3), 3 + 1 / x1 + 2 / x2, g)
+    return g
+
+def select_tau(model, state, propensities, noncritical, epsilon, hor, hor_stoich):
+    """
+    Vybere délku kroku tak, aby se relativní změna propencí nekritických
+    reakcí během kroku udržela zhruba pod epsilon.
+
+    Returns:
+    - délka kroku (math.inf, pokud nejsou nekritické reakce)
+    """
+    a = np.where(noncritical, propensities, 0.0)
+    mu = model.net_change(a)
+    sigma2 = model.gross_change(a, 2)
+
+    reactant = hor > 0
+    bound = np.maximum(epsilon * state / _g_factors(state, hor, hor_stoich), 1.0)
+    with np.errstate(divide='ignore'):
+        tau = np.minimum(bound / np.abs(mu), bound ** 2 / sigma2)
+    tau = tau[reactant]
+    return float(tau.min()) if tau.size else math.inf
+
+def _implicit_counts(model, state, propensities, counts, tau, noncritical, max_iterations=20):
+    """
+    Upraví Poissonovy počty nekritických reakcí podle implicitního
+    tau-leapingu (Rathinam a kol. 2003). Rovnice
+    y = x + V^T (P + tau a(y) - tau a(x)) se řeší Newtonovou metodou.
+    """
+    stoichiometry = model.stoichiometry
+    x = state.astype(float)
+    mask = noncritical.astype(float)
+    explicit = x + model.net_change(counts - tau * propensities * mask)
+    y = x + model.net_change(counts)
+    identity = np.eye(model.n_species)
+
+    for _ in range(max_iterations):
+        residual = y - explicit - tau * model.net_change(model.propensities(y) * mask)
+        jacobian = identity - tau * stoichiometry.T @ (model.propensity_jacobian(y) * mask[:, None])
+        try:
+            step = np.linalg.solve(jacobian, residual)
+        except np.linalg.LinAlgError:
+            return counts
+        y -= step
+        if np.all(np.abs(step) <= 1e-6 * (1 + np.abs(y))):
+            break
+    else:
+        # Bez konvergence zůstávají explicitní počty
+        return counts
+
+    implicit = np.rint(counts + tau * (model.propensities(y) - propensities) * mask)
+    return np.where(noncritical, np.maximum(implicit, 0), counts)
+
+def tau_leaping_stream(substances, reactions, t_max, epsilon=0.03, n_critical=10,
+                       implicit=False, ssa_factor=10, ssa_steps=100, rng=None, recorder=None, instrumentation=None,
+                       checkpoint=None, stop=None):
+    """
+    Přibližná simulace metodou tau-leaping s výběrem kroku podle
+    Cao, Gillespie, Petzold (2006).
+
+    V každém kroku délky tau proběhne každá nekritická reakce náhodný
+    (Poissonův) počet krát. Kritické reakce, jejichž reaktanty by mohly
+    dojít, probíhají nejvýše jednou za krok. Je-li zvolený krok kratší
+    než ssa_factor / a0, provede se místo skoku ssa_steps přesných kroků
+    Gillespieho algoritmu. Množství látek tak nikdy neklesne pod nulu.
+
+    Generátor průběžně vrací části záznamu (times, states) stejně jako
+    simulation.gillespie_stream.
+
+    Parameters:
+    - substances: dict {název: Substance}
+    - reactions: seznam reakcí
+    - t_max: maximální čas simulace
+    - epsilon: povolená relativní změna propencí během kroku
+    - n_critical: reakce, která může proběhnout méně než n_critical krát, je kritická
+    - implicit: použít implicitní tau-leaping pro tuhé systémy
+    - ssa_factor, ssa_steps: podmínka a délka přechodu na přesné kroky
+    - rng, recorder, instrumentation, checkpoint, stop: viz simulation.gillespie_stream
+      (záznam výchozí po každém kroku)
+    """
+    model = compile_model(substances, reactions)
+    rng = np.random.default_rng(rng)
+    uniforms = UniformBuffer(rng)
+    channel_changes = model.channel_changes
+    dependents = model.dependents()
+    channel_propensity = model.channel_propensity
+    # Spotřebované látky kanálů (doplněná pole, viz model.CompiledModel.finalize)
+    consumed = model.change_deltas < 0
+    used = np.where(consumed, -model.change_deltas, 1)
+    hor, hor_stoich = highest_orders(model)
+    n_channels = model.n_channels
+
+    # Stav sdílený s objekty Substance, změny se do látek zapisují přímo
+    # (skoky přes pole NumPy, přesné kroky přes prvky values)
+    shared = SubstanceState(model.substances)
+    state = shared.array
+    values = shared.values
+    time = 0
+    if checkpoint is not None and checkpoint.started:
+        time = checkpoint.restore(substances, uniforms)
+    output = StreamOutput('tau_leaping', model.names, uniforms, recorder, checkpoint, stop)
+    output.start(time, state)
+    if instrumentation is not None:
+        instrumentation.start(reactions, wrap=False)
+        sources = model.sources
+        n_reactions = len(reactions)
+
+    while time < t_max:
+        propensities = model.propensities(state)
+        total_propensity = propensities.sum()
+        if total_propensity <= 0:
+            break
+
+        # Kritické reakce: mohou proběhnout jen několikrát, než dojde reaktant
+        with np.errstate(divide='ignore'):
+            remaining = np.where(consumed, state[model.change_species] // used, np.inf).min(axis=1, initial=np.inf)
+        critical = (propensities > 0) & (remaining < n_critical)
+        noncritical = (propensities > 0) & ~critical
+
+        tau_noncritical = select_tau(model, state, propensities, noncritical, epsilon, hor, hor_stoich)
+
+        if tau_noncritical < ssa_factor / total_propensity:
+            # Přesné kroky Gillespieho algoritmu nad čísly Pythonu, po proběhnutí
+            # kanálu se přepočítají jen propence závislých kanálů
+            exact = propensities.tolist()
+            for _ in range(ssa_steps):
+                total_propensity = sum(exact)
+                if total_propensity <= 0 or time >= t_max:
+                    break
+                time += uniforms.exponential(total_propensity)
+                channel = select_linear(exact, uniforms.next() * total_propensity)
+                for i, delta in channel_changes[channel]:
+                    values[i] += delta
+                for k in dependents[channel]:
+                    exact[k] = channel_propensity(values, k)
+                if instrumentation is not None:
+                    instrumentation.event(time, total_propensity, sources[channel])
+                if output.step(time, state) and (yield from output.emit()):
+                    break
+            if output.stopped:
+                break
+            continue
+
+        critical_propensity = propensities[critical].sum()
+        while True:
+            tau_critical = uniforms.exponential(critical_propensity) if critical_propensity > 0 else math.inf
+            fire_critical = tau_critical <= tau_noncritical
+            tau = tau_critical if fire_critical else tau_noncritical
+            if time + tau > t_max:
+                tau = t_max - time
+                fire_critical = False
+
+            counts = np.where(noncritical, rng.poisson(propensities * tau * noncritical), 0)
+            if implicit:
+                counts = _implicit_counts(model, state, propensities, counts, tau, noncritical)
+            if fire_critical:
+                weights = np.cumsum(np.where(critical, propensities, 0.0))
+                channel = min(np.searchsorted(weights, uniforms.next() * weights[-1], side='right'),
+                              n_channels - 1)
+                counts[channel] += 1
+
+            new_state = state + np.rint(model.net_change(counts)).astype(np.int64)
+            if np.all(new_state >= 0):
+                break
+            # Záporné množství: zkrácení kroku a nový pokus
+            tau_noncritical /= 2
+
+        state[:] = new_state
+        time += tau
+        if instrumentation is not None:
+            instrumentation.leap(time, total_propensity, np.bincount(sources, counts, n_reactions))
+        if output.step(time, state) and (yield from output.emit()):
+            break
+
+    if instrumentation is not None:
+        instrumentation.finish(time)
+    yield from output.finish(time, state, t_max)
+
+def tau_leaping_simulation(substances, reactions, t_max, **options):
+    """
+    Přibližná simulace metodou tau-leaping (viz tau_leaping_stream).
+
+    Returns:
+    - times, history ve stejném tvaru jako gillespie_simulation
+    """
+    names = [substance.name for substance in substances.values()]
+    return collect(tau_leaping_stream(substances, reactions, t_max, **options), names)
@@ -0,0 +1,52 @@
+# test_checkpoint.py
+
+import numpy as np
+import pytest
+from benchmark import sequential_network, reversible_network
+from checkpoint import Checkpoint, load_checkpoint
+from recording import GridRecorder
+from simulation import simulate, simulation_stream, STREAM_METHODS
+
+@pytest.mark.parametrize('method', list(STREAM_METHODS))
+def test_extension_matches_uninterrupted_run(method):
+    # Prodloužení z kontrolního bodu pokračuje přesně jako nepřerušená simulace
+    substances, reactions, t_max = sequential_network()
+    _, whole = simulate(substances, reactions, t_max, method=method, rng=5,
+                        recorder=GridRecorder(np.linspace(0, t_max, 21)))
+
+    substances, reactions, t_max = sequential_network()
+    checkpoint = Checkpoint()
+    _, first = simulate(substances, reactions, t_max / 2, method=method, rng=5, checkpoint=checkpoint,
+                        recorder=GridRecorder(np.linspace(0, t_max / 2, 11)))
+    _, second = simulate(substances, reactions, t_max, method=method, checkpoint=checkpoint,
+                         recorder=GridRecorder(np.linspace(t_max / 2, t_max, 11)))
+    for name in whole:
+        assert np.array_equal(whole[name], np.concatenate([first[name], second[name][1:]]))
+
+@pytest.mark.parametrize('method', ['gillespie', 'next_reaction', 'sum_tree', 'composition_rejection',
+                                    'compiled', 'generated'])
+def test_resume_after_interruption(method, tmp_path):
+    # Simulace přerušená po několika částech výstupu pokračuje z kontrolního
+    # bodu v souboru stejně jako nepřerušená simulace
+    substances, reactions, t_max = reversible_network()
+    names = list(substances)
+    whole_times, whole = simulate(substances, reactions, t_max, method=method, rng=9)
+
+    path = str(tmp_path / 'stav.json')
+    substances, reactions, t_max = reversible_network()
+    stream = simulation_stream(substances, reactions, t_max, method=method, rng=9, chunk_size=50,
+                               checkpoint=Checkpoint(path, interval=0))
+    chunks = [next(stream) for _ in range(3)]
+    stream.close()
+
+    checkpoint = load_checkpoint(path)
+    resume_time = checkpoint.time
+    assert checkpoint.method == method and resume_time == chunks[-1][0][-1]
+    substances, reactions, t_max = reversible_network()
+    times, history = simulate(substances, reactions, t_max, method=method, checkpoint=checkpoint)
+    # Pokračování začíná stavem z kontrolního bodu, tj. posledním vráceným řádkem
+    assert times[0] == resume_time
+    assert np.array_equal(whole_times, np.concatenate([chunk[0] for chunk in chunks] + [times[1:]]))
+    for i, name in enumerate(names):
+        resumed = np.concatenate([chunk[1][:, i] for chunk in chunks] + [history[name][1:]])
+        assert np.array_equal(whole[name], resumed)
@@ -0,0 +1,73 @@
+# test_cli.py
+
+import os
+import numpy as np
+import pytest
+from cli import main
+from model_file import load_model
+from simulation import simulate
+from trajectory_file import TrajectoryReader
+
+MODEL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples',
+                     'michaelis_menten.json')
+
+def _reference(**options):
+    substances, reactions, settings = load_model(MODEL)
+    return simulate(substances, reactions, settings['t_max'], method=settings['method'], rng=11, **options)
+
+def test_csv_output_matches_simulation(tmp_path, capsys):
+    path = str(tmp_path / 'vysledek.csv')
+    main([MODEL, '--seed', '11', '--output', path])
+    assert "Metoda gillespie" in capsys.readouterr().err
+    with open(path) as file:
+        assert file.readline().strip() == 'time,S,P,E'
+    table = np.loadtxt(path, delimiter=',', skiprows=1)
+    times, history = _reference()
+    assert np.allclose(table[:, 0], times, rtol=1e-9)
+    for i, name in enumerate(['S', 'P', 'E']):
+        assert np.array_equal(table[:, i + 1], history[name])
+
+def test_csv_on_stdout(capsys):
+    main([MODEL, '--seed', '11', '--grid', '5'])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == 'time,S,P,E' and len(lines) == 6
+    assert lines[1].split(',') == ['0', '100', '0', '10']
+
+def test_npz_output_on_grid(tmp_path):
+    path = str(tmp_path / 'vysledek.npz')
+    main([MODEL, '--seed', '11', '--grid', '21', '--method', 'next_reaction', '--output', path])
+    data = np.load(path)
+    assert np.array_equal(data['time'], np.linspace(0, 200, 21))
+    # Látka se jen přeměňuje, enzym se nespotřebuje
+    assert np.all(data['S'] + data['P'] == 100) and np.all(data['E'] == 10)
+    assert np.all(np.diff(data['P']) >= 0)
+
+def test_trajectory_output_resumes_from_checkpoint(tmp_path, capsys):
+    path = str(tmp_path / 'vysledek.traj')
+    state = str(tmp_path / 'stav.json')
+    main([MODEL, '--seed', '11', '--t-max', '50', '--output', path, '--checkpoint', state,
+          '--checkpoint-interval', '0'])
+    assert os.path.exists(state)
+    # Druhé spuštění pokračuje z kontrolního bodu do nové doby simulace
+    main([MODEL, '--t-max', '200', '--output', path, '--checkpoint', state, '--checkpoint-interval', '0'])
+    assert "Pokračování z kontrolního bodu" in capsys.readouterr().err
+
+    reader = TrajectoryReader(path)
+    assert reader.complete
+    times, history = _reference()
+    assert np.array_equal(reader.times, times)
+    for name in history:
+        assert np.array_equal(reader.column(name), history[name])
+
+def test_stop_condition_and_plot(tmp_path, capsys):
+    pytest.importorskip('matplotlib')
+    plot = str(tmp_path / 'graf.png')
+    main([MODEL, '--seed', '11', '--t-max', '1e6', '--stop-extinction', 'S', '--output',
+          str(tmp_path / 'vysledek.csv'), '--plot', plot])
+    assert "Důvod ukončení: extinction:S" in capsys.readouterr().err
+    assert os.path.getsize(plot) > 0
+
+def test_invalid_arguments_are_rejected(capsys):
+    with pytest.raises(SystemExit):
+        main([MODEL, '--method', 'ode', '--checkpoint', 'stav.json'])
+    assert "nepodporuje kontrolní body" in capsys.readouterr().err
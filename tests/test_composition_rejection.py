@@ -0,0 +1,47 @@
+# test_composition_rejection.py
+
+import numpy as np
+from benchmark import synthetic_network
+from composition_rejection import PropensityGroups
+from random_buffer import UniformBuffer
+from recording import FinalStateRecorder
+from simulation import gillespie_simulation, composition_rejection_simulation
+
+def test_sampling_frequencies():
+    # Propence v rozsahu šesti řádů, po změnách se reakce přesouvají mezi skupinami
+    values = 10 ** np.random.default_rng(1).uniform(-3, 3, 50)
+    groups = PropensityGroups(values)
+    for index in range(0, 50, 5):
+        values[index] *= 7.3
+        groups.update(index, values[index])
+    groups.update(3, 0.0)
+    values[3] = 0.0
+
+    uniforms = UniformBuffer(2)
+    n = 200000
+    counts = np.bincount([groups.sample(uniforms) for _ in range(n)], minlength=len(values))
+    expected = n * values / values.sum()
+    assert counts[3] == 0
+    assert abs(groups.total - values.sum()) < 1e-9 * values.sum()
+    # Odchylky v jednotkách směrodatné odchylky binomického rozdělení
+    deviation = (counts - expected) / np.sqrt(np.maximum(expected * (1 - values / values.sum()), 1e-12))
+    assert np.abs(deviation).max() < 5
+
+def _final_states(simulation, seeds):
+    finals = []
+    for seed in seeds:
+        substances, reactions, t_max = synthetic_network(20, 60, 100, 0.5, rate_decades=4)
+        times, history = simulation(substances, reactions, t_max, rng=seed, recorder=FinalStateRecorder())
+        finals.append([values[-1] for values in history.values()])
+    return np.array(finals, dtype=float)
+
+def test_final_state_matches_gillespie():
+    seeds = range(200)
+    exact = _final_states(gillespie_simulation, seeds)
+    grouped = _final_states(composition_rejection_simulation, [seed + 10000 for seed in seeds])
+    # Shoda průměrů koncových stavů na síti s propencemi v rozsahu několika řádů
+    error = np.sqrt((exact.var(axis=0, ddof=1) + grouped.var(axis=0, ddof=1)) / len(seeds))
+    difference = np.abs(exact.mean(axis=0) - grouped.mean(axis=0))
+    assert np.all(difference <= 4 * error + 1e-9)
+    # Molekul v síti neubývá ani nepřibývá
+    assert np.all(grouped.sum(axis=1) == 2000)
@@ -0,0 +1,113 @@
+# test_engines.py
+
+import numpy as np
+import pytest
+from substance import Substance
+from reaction import (
+    UnimolecularReaction, ReversibleReaction, CatalyticReaction,
+    MichaelisMentenReaction, InhibitoryReaction
+)
+from benchmark import side_network
+from batch import batch_simulation
+from ensemble import run_ensemble
+from recording import FinalStateRecorder
+from simulation import simulate, ode_simulation
+
+def mixed_network(scale=1):
+    # Síť se všemi typy rychlostních zákonů kompilovaného modelu
+    s = {
+        'A': Substance('A', 60 * scale), 'B': Substance('B', 40 * scale), 'C': Substance('C', 0),
+        'D': Substance('D', 0), 'E': Substance('E', 5), 'I': Substance('I', 3),
+    }
+    reactions = [
+        ReversibleReaction({s['A']: 1, s['B']: 1}, {s['C']: 1}, 0.002 / scale, 0.05),
+        CatalyticReaction({s['C']: 1}, {s['D']: 1}, s['E'], 0.01),
+        MichaelisMentenReaction(s['D'], s['A'], s['E'], 0.5 * scale, 10 * scale),
+        InhibitoryReaction({s['B']: 1}, {s['D']: 1}, s['I'], 0.02),
+        UnimolecularReaction({s['D']: 1}, {s['B']: 1}, 0.05),
+    ]
+    return s, reactions, 20
+
+def _final_states(method, seeds, network=mixed_network, **options):
+    finals = []
+    for seed in seeds:
+        substances, reactions, t_max = network()
+        _, history = simulate(substances, reactions, t_max, method=method, rng=seed,
+                              recorder=FinalStateRecorder(), **options)
+        finals.append([values[-1] for values in history.values()])
+    return np.array(finals, dtype=float)
+
+def _assert_means_agree(exact, other, relative=0.0):
+    # Shoda průměrů v jednotkách směrodatné chyby rozdílu, u přibližných
+    # metod navíc s povolenou relativní odchylkou
+    error = np.sqrt((exact.var(axis=0, ddof=1) + other.var(axis=0, ddof=1)) / len(exact))
+    difference = np.abs(exact.mean(axis=0) - other.mean(axis=0))
+    assert np.all(difference <= 4 * error + relative * np.abs(exact.mean(axis=0)) + 1e-9)
+
+@pytest.mark.parametrize('method', ['next_reaction', 'sum_tree', 'compiled', 'generated'])
+def test_exact_engine_matches_gillespie(method):
+    seeds = range(200)
+    exact = _final_states('gillespie', seeds)
+    _assert_means_agree(exact, _final_states(method, [seed + 10000 for seed in seeds]))
+
+@pytest.mark.parametrize('method, options', [
+    ('tau_leaping', {}),
+    ('tau_leaping', {'implicit': True}),
+    ('hybrid', {'threshold': 50}),
+])
+def test_approximate_engine_matches_gillespie(method, options):
+    # Při desetinásobných množstvích přibližné metody skutečně skáčou
+    seeds = range(100)
+    network = lambda: mixed_network(scale=10)
+    exact = _final_states('gillespie', seeds, network)
+    approximate = _final_states(method, [seed + 10000 for seed in seeds], network, **options)
+    _assert_means_agree(exact, approximate, relative=0.03)
+
+def enzyme_network():
+    # Rychlá vazba enzymu na substrát, pomalá přeměna komplexu
+    s = {'S': Substance('S', 50), 'E': Substance('E', 10), 'C': Substance('C', 0), 'P': Substance('P', 0)}
+    reactions = [
+        ReversibleReaction({s['E']: 1, s['S']: 1}, {s['C']: 1}, 1.0, 50.0),
+        UnimolecularReaction({s['C']: 1}, {s['E']: 1, s['P']: 1}, 0.5),
+    ]
+    return s, reactions, 5
+
+def test_slow_scale_matches_gillespie():
+    seeds = range(200)
+    exact = _final_states('gillespie', seeds, enzyme_network)
+    reduced = _final_states('slow_scale', [seed + 10000 for seed in seeds], enzyme_network, separation=20)
+    _assert_means_agree(exact, reduced, relative=0.03)
+
+def test_slow_scale_without_slow_reactions():
+    # Pomalá vratná reakce se simuluje přesně, rychlá skočí do rovnováhy
+    # a konečný stav se zaznamená v t_max
+    for k_forward, k_reverse, rows in ((0.05, 0.02, 'many'), (50.0, 20.0, 'few')):
+        s = {'A': Substance('A', 100), 'B': Substance('B', 0)}
+        reactions = [ReversibleReaction({s['A']: 1}, {s['B']: 1}, k_forward, k_reverse)]
+        times, history = simulate(s, reactions, 100, method='slow_scale', rng=1)
+        assert history['A'][-1] + history['B'][-1] == 100
+        if rows == 'few':
+            assert list(times) == [0, 0, 100] and history['A'][1] < 100
+        else:
+            assert len(times) > 100
+
+def test_batch_matches_gillespie_ensemble():
+    grid = np.linspace(0, 20, 5)
+    substances, reactions, t_max = mixed_network()
+    exact = run_ensemble(substances, reactions, t_max, n_replicates=200, grid=grid, seed=1, n_workers=1)
+    _, history = batch_simulation(substances, reactions, t_max, n_trajectories=200, grid=grid, rng=2)
+    for name in substances:
+        error = np.sqrt((exact.variance[name] + history[name].var(axis=0, ddof=1)) / 200)
+        assert np.all(np.abs(exact.mean[name] - history[name].mean(axis=0)) <= 4 * error + 1e-9)
+
+def test_ode_matches_ensemble_mean_of_linear_network():
+    # U lineární sítě je střední hodnota stochastického modelu řešením ODR
+    substances, reactions, t_max = side_network()
+    grid = np.linspace(0, t_max, 11)
+    exact = run_ensemble(substances, reactions, t_max, n_replicates=200, grid=grid, seed=3, n_workers=1)
+    times, history = ode_simulation(substances, reactions, t_max, n_points=11)
+    assert np.allclose(times, grid)
+    for name in substances:
+        error = np.sqrt(exact.variance[name] / 200)
+        # Kde všechny replikace vymřely, zbývá jen malý zbytek řešení ODR
+        assert np.all(np.abs(exact.mean[name] - history[name]) <= 4 * error + 0.02)
@@ -0,0 +1,113 @@
+# test_model.py
+
+import numpy as np
+from substance import Substance
+from reaction import (
+    UnimolecularReaction, BimolecularReaction, TrimolecularReaction,
+    ReversibleReaction, CatalyticReaction, MichaelisMentenReaction,
+    AutocatalyticReaction, InhibitoryReaction
+)
+from model import compile_model
+from codegen import compile_kernels, structure_key
+
+def all_kinds_network(k=1.0):
+    s = {name: Substance(name, 0) for name in 'ABCDEFGI'}
+    reactions = [
+        UnimolecularReaction({s['A']: 2}, {s['B']: 1}, 0.3 * k),
+        BimolecularReaction({s['A']: 1, s['B']: 1}, {s['C']: 1}, 0.02 * k),
+        TrimolecularReaction({s['A']: 1, s['B']: 1, s['C']: 1}, {s['D']: 1}, 0.001 * k),
+        ReversibleReaction({s['C']: 1, s['D']: 1}, {s['F']: 2}, 0.05 * k, 0.4),
+        CatalyticReaction({s['D']: 1}, {s['G']: 1}, s['E'], 0.1 * k),
+        MichaelisMentenReaction(s['G'], s['A'], s['E'], 2.0 * k, 15),
+        AutocatalyticReaction({s['F']: 1, s['G']: 1}, {s['G']: 2}, 0.01 * k),
+        InhibitoryReaction({s['B']: 1}, {s['D']: 1}, s['I'], 0.2 * k),
+    ]
+    return s, reactions
+
+def _states(n_species, seed, count=100):
+    rng = np.random.default_rng(seed)
+    states = rng.integers(0, 40, (count, n_species))
+    # Zahrnout i stavy s nedostatkem reaktantů
+    states[::7] = rng.integers(0, 2, (len(states[::7]), n_species))
+    return states
+
+def test_propensities_match_reactions():
+    substances, reactions = all_kinds_network()
+    model = compile_model(substances, reactions)
+    for state in _states(model.n_species, 1):
+        for substance, amount in zip(substances.values(), state):
+            substance.amount = int(amount)
+        expected = [reaction.propensity() for reaction in reactions]
+        grouped = np.bincount(model.sources, model.propensities(state), len(reactions))
+        assert np.allclose(grouped, expected, rtol=1e-12, atol=0)
+
+def test_scalar_and_generated_propensities_match_vectorized():
+    substances, reactions = all_kinds_network()
+    model = compile_model(substances, reactions)
+    compute_propensities, _ = compile_kernels(model)
+    for state in _states(model.n_species, 2):
+        vectorized = model.propensities(state)
+        values = state.tolist()
+        scalar = [model.channel_propensity(values, j) for j in range(model.n_channels)]
+        # Součiny ve stejném pořadí, hodnoty jsou shodné
+        assert np.array_equal(scalar, vectorized)
+        generated = [0.0] * model.n_channels
+        compute_propensities(values, generated)
+        assert np.allclose(generated, vectorized, rtol=1e-12, atol=0)
+
+def test_fired_channels_update_dependent_propensities():
+    substances, reactions = all_kinds_network()
+    model = compile_model(substances, reactions)
+    _, fires = compile_kernels(model)
+    dependents = model.dependents()
+    for state in _states(model.n_species, 3, count=20):
+        before = model.propensities(state)
+        # Simulace provádí jen kanály s kladnou propencí
+        for channel in np.flatnonzero(before > 0):
+            values = state.tolist()
+            propensities = before.tolist()
+            fires[channel](values, propensities)
+            expected_state = state + model.net_change(np.eye(model.n_channels)[channel]).astype(np.int64)
+            assert values == expected_state.tolist()
+            after = model.propensities(expected_state)
+            assert np.allclose(propensities, after, rtol=1e-12, atol=0)
+            # Mimo závislé kanály se propence nezmění
+            unchanged = np.setdiff1d(np.arange(model.n_channels), dependents[channel])
+            assert np.array_equal(after[unchanged], before[unchanged])
+
+def test_sparse_changes_match_dense_stoichiometry():
+    substances, reactions = all_kinds_network()
+    model = compile_model(substances, reactions)
+    counts = np.arange(1, model.n_channels + 1, dtype=float)
+    assert np.array_equal(model.net_change(counts), model.stoichiometry.T @ counts)
+    assert np.array_equal(model.gross_change(counts, 2), (model.stoichiometry ** 2).T @ counts)
+    for j, (species, deltas) in enumerate(model.changes):
+        dense = np.zeros(model.n_species, dtype=np.int64)
+        dense[species] = deltas
+        assert np.array_equal(dense, model.stoichiometry[j])
+        assert list(model.channel_changes[j]) == list(zip(species.tolist(), deltas.tolist()))
+
+def test_propensity_jacobian_matches_finite_differences():
+    substances, reactions = all_kinds_network()
+    model = compile_model(substances, reactions)
+    x = np.linspace(5.5, 30.5, model.n_species)
+    for deterministic in (False, True):
+        rates = model.deterministic_rates if deterministic else model.propensities
+        jacobian = model.propensity_jacobian(x, deterministic)
+        step = 1e-6
+        for i in range(model.n_species):
+            shift = np.zeros(model.n_species)
+            shift[i] = step
+            numeric = (rates(x + shift) - rates(x - shift)) / (2 * step)
+            assert np.allclose(jacobian[:, i], numeric, rtol=1e-5, atol=1e-8)
+
+def test_kernels_are_shared_by_networks_with_the_same_structure():
+    first = compile_model(*all_kinds_network(1.0))
+    second = compile_model(*all_kinds_network(3.0))
+    assert structure_key(first) == structure_key(second)
+    state = _states(first.n_species, 4, count=1)[0] + 5
+    for model in (first, second):
+        compute_propensities, _ = compile_kernels(model)
+        propensities = [0.0] * model.n_channels
+        compute_propensities(state.tolist(), propensities)
+        assert np.allclose(propensities, model.propensities(state), rtol=1e-12, atol=0)
@@ -0,0 +1,70 @@
+# test_online_stats.py
+
+import numpy as np
+from benchmark import sequential_network
+from ensemble import run_ensemble, accumulate_ensemble
+from online_stats import GridAccumulator, GridSampler
+from recording import GridRecorder
+from simulation import simulate, simulation_stream
+
+GRID = np.linspace(0, 10, 6)
+NAMES = ['A', 'B']
+
+def _samples(n, seed):
+    # Hodnoty s velkým průměrem a malým rozptylem (zkouška numerické stability)
+    rng = np.random.default_rng(seed)
+    return 1e6 + rng.normal(0, 3, (n, len(NAMES), len(GRID))).round()
+
+def test_welford_matches_numpy():
+    samples = _samples(500, 1)
+    accumulator = GridAccumulator(GRID, NAMES, percentiles=(10, 50, 90), rng=0)
+    for values in samples:
+        accumulator.add_grid({name: values[i] for i, name in enumerate(NAMES)})
+    assert accumulator.n_replicates == 500
+    for i, name in enumerate(NAMES):
+        assert np.allclose(accumulator.mean[name], samples[:, i].mean(axis=0), rtol=0, atol=1e-8)
+        assert np.allclose(accumulator.variance[name], samples[:, i].var(axis=0, ddof=1), rtol=1e-9)
+        assert np.array_equal(accumulator.minimum[name], samples[:, i].min(axis=0))
+        assert np.array_equal(accumulator.maximum[name], samples[:, i].max(axis=0))
+        # Kvantily jsou přibližné, chyba v řádu jednotek směrodatné odchylky
+        exact = np.percentile(samples[:, i], 50, axis=0)
+        assert np.all(np.abs(accumulator.percentiles[50][name] - exact) <= 3)
+
+def test_merge_matches_single_accumulator():
+    samples = _samples(300, 2)
+    single = GridAccumulator(GRID, NAMES, rng=0)
+    parts = [GridAccumulator(GRID, NAMES, rng=seed) for seed in range(3)]
+    for k, values in enumerate(samples):
+        single.add_grid(values)
+        # Nestejně velké části
+        parts[0 if k < 20 else 1 if k < 250 else 2].add_grid(values)
+    merged = parts[0].merge(parts[1]).merge(parts[2]).merge(GridAccumulator(GRID, NAMES))
+    assert merged.n_replicates == 300
+    for name in NAMES:
+        assert np.allclose(merged.mean[name], single.mean[name], rtol=0, atol=1e-8)
+        assert np.allclose(merged.variance[name], single.variance[name], rtol=1e-9)
+        assert np.array_equal(merged.minimum[name], single.minimum[name])
+        assert np.array_equal(merged.maximum[name], single.maximum[name])
+
+def test_grid_sampler_matches_grid_recorder():
+    substances, reactions, t_max = sequential_network()
+    grid = np.linspace(0, t_max, 23)
+    _, recorded = simulate(substances, reactions, t_max, rng=6, recorder=GridRecorder(grid))
+    substances, reactions, t_max = sequential_network()
+    sampler = GridSampler(grid, len(substances))
+    for times, states in simulation_stream(substances, reactions, t_max, rng=6, chunk_size=7):
+        sampler.add(times, states)
+    values = sampler.finish()
+    for i, name in enumerate(substances):
+        assert np.array_equal(values[i], recorded[name])
+
+def test_accumulated_ensemble_matches_stored_ensemble():
+    # Stejné seedy replikací, statistiky bez uložení trajektorií se shodují
+    substances, reactions, t_max = sequential_network()
+    grid = np.linspace(0, t_max, 11)
+    stored = run_ensemble(substances, reactions, t_max, n_replicates=40, grid=grid, seed=8, n_workers=1)
+    accumulated = accumulate_ensemble(substances, reactions, t_max, n_replicates=40, grid=grid, seed=8,
+                                      n_workers=1)
+    for name in substances:
+        assert np.allclose(accumulated.mean[name], stored.mean[name])
+        assert np.allclose(accumulated.variance[name], stored.variance[name])
@@ -0,0 +1,69 @@
+# test_recording.py
+
+import numpy as np
+from benchmark import sequential_network
+from recording import EventRecorder, GridRecorder, ChangeRecorder, FinalStateRecorder, collect
+from simulation import simulate, simulation_stream
+
+NAMES = ['A', 'B']
+# Počáteční stav v čase 0 a reakce (čas, stav po reakci)
+EVENTS = [(0.5, [9, 1]), (2.0, [8, 2]), (2.5, [8, 3]), (2.7, [7, 3]), (3.2, [7, 4])]
+
+def _run(recorder, t_end=3.7):
+    # Volání záznamu stejně jako ze simulační metody
+    recorder.start(NAMES, 0.0, np.array([10, 0]))
+    chunks = []
+    for time, state in EVENTS:
+        recorder.record(time, np.array(state))
+        if recorder.full():
+            chunks.append(recorder.flush())
+    recorder.finish(t_end, np.array(EVENTS[-1][1]))
+    if recorder.pending:
+        chunks.append(recorder.flush())
+    return collect(iter(chunks), NAMES)
+
+def test_event_recorder_keeps_every_nth_event_and_final_state():
+    times, history = _run(EventRecorder(every=2, chunk_size=2))
+    assert list(times) == [0.0, 2.0, 2.7, 3.7]
+    assert list(history['A']) == [10, 8, 7, 7]
+    assert list(history['B']) == [0, 2, 3, 4]
+
+def test_grid_recorder_takes_state_after_last_event_at_or_before_grid_time():
+    times, history = _run(GridRecorder([0.0, 1.0, 2.0, 3.0, 4.0], chunk_size=2))
+    assert list(times) == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert list(history['A']) == [10, 9, 8, 7, 7]
+    assert list(history['B']) == [0, 1, 2, 3, 4]
+
+def test_change_recorder_records_changes_of_watched_species():
+    times, history = _run(ChangeRecorder(species=['A']))
+    assert list(times) == [0.0, 0.5, 2.0, 2.7]
+    assert list(history['A']) == [10, 9, 8, 7]
+    assert list(history['B']) == [0, 1, 2, 3]
+
+def test_final_state_recorder():
+    times, history = _run(FinalStateRecorder())
+    assert list(times) == [3.7]
+    assert list(history['A']) == [7] and list(history['B']) == [4]
+
+def test_grid_recorder_samples_the_event_trajectory():
+    # Záznam na mřížce je schodovitý průběh úplného záznamu v časech mřížky
+    substances, reactions, t_max = sequential_network()
+    times, history = simulate(substances, reactions, t_max, rng=4)
+    grid = np.linspace(0, t_max, 37)
+    substances, reactions, t_max = sequential_network()
+    grid_times, grid_history = simulate(substances, reactions, t_max, rng=4, recorder=GridRecorder(grid))
+    assert np.array_equal(grid_times, grid)
+    rows = np.searchsorted(times, grid, side='right') - 1
+    for name in history:
+        assert np.array_equal(grid_history[name], history[name][rows])
+
+def test_stream_chunks_concatenate_to_the_whole_run():
+    substances, reactions, t_max = sequential_network()
+    times, history = simulate(substances, reactions, t_max, method='sum_tree', rng=2)
+    substances, reactions, t_max = sequential_network()
+    chunks = list(simulation_stream(substances, reactions, t_max, method='sum_tree', rng=2, chunk_size=16))
+    assert all(len(chunk_times) == 16 for chunk_times, _ in chunks[:-1])
+    chunk_times, chunk_history = collect(iter(chunks), list(substances))
+    assert np.array_equal(times, chunk_times)
+    for name in history:
+        assert np.array_equal(history[name], chunk_history[name])
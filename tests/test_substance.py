@@ -0,0 +1,33 @@
+# test_substance.py
+
+import numpy as np
+import pytest
+from substance import Substance, SubstanceState
+
+def test_amount_accepts_integral_values():
+    substance = Substance('A', 10.0)
+    assert substance.amount == 10 and type(substance.amount) is int
+    substance.amount = np.int64(7)
+    assert substance.amount == 7
+    substance.amount = np.float64(3.0)
+    assert substance.amount == 3
+
+@pytest.mark.parametrize('value', [2.5, np.float64(0.1), float('nan')])
+def test_amount_rejects_non_integral_values(value):
+    substance = Substance('A', 1)
+    with pytest.raises((ValueError, TypeError)):
+        substance.amount = value
+    assert substance.amount == 1
+    with pytest.raises((ValueError, TypeError)):
+        Substance('B', value)
+
+def test_state_shares_amounts_with_substances():
+    a, b = Substance('A', 5), Substance('B', 2)
+    state = SubstanceState([a, b])
+    assert state.names == ['A', 'B'] and list(state.array) == [5, 2]
+    a.amount -= 1
+    state.values[1] += 3
+    assert list(state.array) == [4, 5] and b.amount == 5
+    snapshot = state.snapshot()
+    b.amount = 0
+    assert list(snapshot) == [4, 5] and list(state.array) == [4, 0]
@@ -0,0 +1,52 @@
+# test_sum_tree.py
+
+import numpy as np
+from priority_queue import IndexedPriorityQueue
+from random_buffer import UniformBuffer, select_linear
+from sum_tree import SumTree
+
+def test_sum_tree_selects_the_same_reaction_as_linear_search():
+    rng = np.random.default_rng(1)
+    values = rng.random(13) * (rng.random(13) < 0.7)
+    tree = SumTree(values)
+    for _ in range(200):
+        index = int(rng.integers(13))
+        values[index] = 0.0 if rng.random() < 0.3 else rng.random()
+        tree.update(index, values[index])
+        assert np.isclose(tree.total, values.sum(), rtol=1e-12, atol=0)
+        target = rng.random() * tree.total
+        selected = tree.sample(target)
+        assert values[selected] > 0
+        cumulative = np.cumsum(values)
+        # Výběr se shoduje s lineárním hledáním mimo okolí hranic úseků
+        if np.min(np.abs(cumulative - target)) > 1e-12:
+            assert selected == select_linear(values.tolist(), target)
+
+def test_sum_tree_of_zeros_is_exactly_zero():
+    tree = SumTree([0.5, 0.25, 0.125])
+    for index in range(3):
+        tree.update(index, 0.0)
+    assert tree.total == 0.0
+
+def test_priority_queue_returns_the_minimum():
+    rng = np.random.default_rng(2)
+    keys = rng.random(17)
+    queue = IndexedPriorityQueue(keys)
+    for _ in range(200):
+        index = int(rng.integers(17))
+        keys[index] = rng.random()
+        queue.update(index, keys[index])
+        assert queue.top() == (keys.min(), int(keys.argmin()))
+
+def test_uniform_buffer_is_reproducible_and_restorable():
+    buffer = UniformBuffer(3, block_size=8)
+    first = [buffer.next() for _ in range(5)]
+    state = buffer.get_state()
+    expected = [buffer.next() for _ in range(20)]
+    again = UniformBuffer(3, block_size=8)
+    assert [again.next() for _ in range(25)] == first + expected
+
+    restored = UniformBuffer(0, block_size=8)
+    restored.set_state(state)
+    assert [restored.next() for _ in range(20)] == expected
+    assert all(0.0 <= value < 1.0 for value in first + expected)
@@ -0,0 +1,61 @@
+# test_sweep.py
+
+import pytest
+from sweep import run_sweep, point_key
+from stopping import Extinction, Stationarity, AnyOf, Predicate
+
+MODEL = {
+    'substances': {'S': 100, 'P': 0, 'E': 10},
+    'reactions': [
+        {'type': 'MichaelisMenten', 'substrate': 'S', 'product': 'P', 'enzyme': 'E', 'vmax': 1.0, 'km': 10},
+    ],
+}
+
+def test_sweep_with_stop_condition(tmp_path):
+    points = [{'reactions.0.vmax': 1.0}, {'reactions.0.vmax': 2.0}]
+    stop = Extinction('S')
+    result = run_sweep(MODEL, points, 500, n_replicates=3, n_points=20, cache_dir=str(tmp_path),
+                       n_workers=1, stop=stop)
+    assert len(result) == 2
+    assert list(result.columns['S_final_mean']) == [0, 0]
+    assert list(result.columns['P_final_mean']) == [100, 100]
+    # Každá replikace má vlastní kopii podmínky, důvody jsou metrikami bodu
+    assert list(result.columns['stop_extinction:S_fraction']) == [1, 1]
+    assert result.columns['stop_time_mean'][1] < result.columns['stop_time_mean'][0] < 500
+    assert stop.reason is None
+
+    # Stejná podmínka ukončení vede na stejný klíč a výsledek z mezipaměti
+    again = run_sweep(MODEL, points, 500, n_replicates=3, n_points=20, cache_dir=str(tmp_path),
+                      n_workers=1, stop=Extinction('S'))
+    assert again.n_cached == 2
+
+def test_stop_condition_in_point_key():
+    def key(stop):
+        return point_key(MODEL, 10, 'gillespie', 3, 20, 0, {'stop': stop})
+
+    assert key(Stationarity(window=2.0)) == key(Stationarity(window=2.0))
+    assert key(Stationarity(window=2.0)) != key(Stationarity(window=3.0))
+    assert key(Extinction('S')) != key(AnyOf(Extinction('S'), Stationarity()))
+
+def _half_converted(time, amounts):
+    return amounts['P'] >= 50
+
+def test_predicate_in_point_key():
+    def key(stop):
+        return point_key(MODEL, 10, 'gillespie', 3, 20, 0, {'stop': stop})
+
+    assert key(Predicate(_half_converted)) == key(Predicate(_half_converted))
+    assert key(Predicate(lambda time, amounts: amounts['S'] < 10, key='S<10')) != \
+        key(Predicate(lambda time, amounts: amounts['S'] < 20, key='S<20'))
+    # Lambda funkce a uzávěry se jménem nerozliší, bez klíče se odmítnou
+    for limit in (10, 20):
+        with pytest.raises(TypeError, match='key'):
+            key(Predicate(lambda time, amounts: amounts['S'] < limit))
+
+def test_sweep_rejects_ode_with_stop_condition():
+    with pytest.raises(ValueError, match='ode'):
+        run_sweep(MODEL, [{'reactions.0.vmax': 1.0}], 10, method='ode', n_workers=1, stop=Extinction('S'))
+
+def test_sweep_rejects_unserializable_option():
+    with pytest.raises(TypeError, match='recorder'):
+        run_sweep(MODEL, [{'reactions.0.vmax': 1.0}], 10, n_replicates=2, n_workers=1, recorder=object())
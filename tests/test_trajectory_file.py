@@ -0,0 +1,96 @@
+# test_trajectory_file.py
+
+import numpy as np
+import pytest
+from benchmark import reversible_network
+from checkpoint import Checkpoint, load_checkpoint
+from simulation import simulate, simulation_stream
+from trajectory_file import TrajectoryWriter, TrajectoryReader, write_stream
+
+NAMES = ['A', 'B', 'C']
+
+def _chunks():
+    rng = np.random.default_rng(0)
+    times = np.cumsum(rng.exponential(1.0, 30))
+    states = rng.integers(0, 1000, (30, len(NAMES)))
+    return times, states
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'run.traj')
+    times, states = _chunks()
+    with TrajectoryWriter(path, NAMES) as writer:
+        for start in range(0, 30, 7):
+            writer.write(times[start:start + 7], states[start:start + 7])
+
+    reader = TrajectoryReader(path)
+    assert reader.complete and len(reader) == 30 and reader.names == NAMES
+    assert np.array_equal(reader.times, times)
+    for i, name in enumerate(NAMES):
+        assert np.array_equal(reader.column(name), states[:, i])
+
+    # Výběr podle času je uzavřený interval [t_start, t_end]
+    part_times, part = reader.slice(times[5], times[12], species=['B'])
+    assert np.array_equal(part_times, times[5:13]) and list(part) == ['B']
+    assert np.array_equal(part['B'], states[5:13, 1])
+    part_times, part_states = reader.states(t_end=times[3])
+    assert np.array_equal(part_states, states[:4])
+
+def test_unfinished_file_is_readable(tmp_path):
+    path = str(tmp_path / 'run.traj')
+    times, states = _chunks()
+    writer = TrajectoryWriter(path, NAMES)
+    writer.write(times[:10], states[:10])
+    writer.flush()
+    reader = TrajectoryReader(path)
+    assert not reader.complete and len(reader) == 10
+    writer.close()
+
+def test_resume_truncates_rows_from_resume_time(tmp_path):
+    path = str(tmp_path / 'run.traj')
+    times, states = _chunks()
+    with TrajectoryWriter(path, NAMES) as writer:
+        writer.write(times, states)
+
+    # Řádky od resume_time zapíše pokračující simulace znovu
+    with TrajectoryWriter(path, NAMES, resume_time=times[20]) as writer:
+        assert writer.rows == 20
+        writer.write(times[20:25], states[20:25] + 1)
+    reader = TrajectoryReader(path)
+    assert np.array_equal(reader.times, times[:25])
+    assert np.array_equal(reader.states()[1], np.vstack([states[:20], states[20:25] + 1]))
+
+    with pytest.raises(ValueError):
+        TrajectoryWriter(path, ['A', 'B'], resume_time=times[10])
+
+def test_resumed_stream_matches_uninterrupted_file(tmp_path):
+    substances, reactions, t_max = reversible_network()
+    names = list(substances)
+    whole = str(tmp_path / 'whole.traj')
+    write_stream(simulation_stream(substances, reactions, t_max, rng=3, chunk_size=40), whole, names)
+
+    # Přerušený zápis s odloženým kontrolním bodem a jeho pokračování
+    path = str(tmp_path / 'run.traj')
+    state = str(tmp_path / 'stav.json')
+    substances, reactions, t_max = reversible_network()
+    checkpoint = Checkpoint(state, interval=0, deferred=True)
+    stream = simulation_stream(substances, reactions, t_max, rng=3, chunk_size=40, checkpoint=checkpoint)
+    with TrajectoryWriter(path, names) as writer:
+        for _ in range(3):
+            writer.write(*next(stream))
+            writer.flush()
+            checkpoint.commit()
+    stream.close()
+
+    checkpoint = load_checkpoint(state, interval=0, deferred=True)
+    substances, reactions, t_max = reversible_network()
+    write_stream(simulation_stream(substances, reactions, t_max, checkpoint=checkpoint, chunk_size=40),
+                 path, names, checkpoint=checkpoint)
+
+    expected, resumed = TrajectoryReader(whole), TrajectoryReader(path)
+    assert np.array_equal(expected.times, resumed.times)
+    for name in names:
+        assert np.array_equal(expected.column(name), resumed.column(name))
+    # Záznam odpovídá i výsledku simulace v paměti
+    substances, reactions, t_max = reversible_network()
+    times, history = simulate(substances, reactions, t_max, rng=3)
+    assert np.array_equal(times, resumed.times)
@@ -0,0 +1,212 @@
+# trajectory_file.py
+
+import json
+import os
+import numpy as np
+
+META_FILE = 'meta.json'
+TIME_FILE = 'time.bin'
+
+def _column_file(index):
+    return f'species_{index}.bin'
+
+class TrajectoryWriter:
+    def __init__(self, path, names, dtype=np.int64, resume_time=None):
+        """
+        Zápis průběhu simulace do sloupcového binárního souboru.
+
+        Záznam je adresář se souborem meta.json (názvy látek, datové typy,
+        počet řádků) a jedním binárním souborem pro čas a pro každou látku.
+        Části výstupu se do sloupců připisují během simulace, v paměti tak
+        nikdy není celý průběh.
+
+        Parameters:
+        - path: cesta k adresáři záznamu (vytvoří se)
+        - names: názvy látek
+        - dtype: datový typ množství (int64 pro stochastické, float64 pro ODR)
+        - resume_time: pokračování simulace z kontrolního bodu; existující
+          záznam se zachová a připisuje se za jeho řádky s časem před
+          resume_time (pozdější řádky zapíše pokračující simulace znovu)
+        """
+        self.path = path
+        self.names = list(names)
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        os.makedirs(path, exist_ok=True)
+        mode = 'wb'
+        if resume_time is not None and os.path.exists(os.path.join(path, META_FILE)):
+            self.rows = self._truncate(resume_time)
+            mode = 'ab'
+        self._time_file = open(os.path.join(path, TIME_FILE), mode)
+        self._column_files = [open(os.path.join(path, _column_file(i)), mode) for i in range(len(self.names))]
+        self._write_meta(complete=False)
+
+    def _truncate(self, resume_time):
+        # Zkrácení existujícího záznamu na řádky před resume_time
+        reader = TrajectoryReader(self.path)
+        if reader.names != self.names or reader.dtype != self.dtype.newbyteorder('<'):
+            raise ValueError(f"Záznam {self.path} má jiné látky nebo datový typ, nelze v něm pokračovat.")
+        rows, _ = reader.rows(t_start=resume_time)
+        del reader
+        with open(os.path.join(self.path, TIME_FILE), 'r+b') as f:
+            f.truncate(rows * 8)
+        for i in range(len(self.names)):
+            with open(os.path.join(self.path, _column_file(i)), 'r+b') as f:
+                f.truncate(rows * self.dtype.itemsize)
+        return rows
+
+    def _write_meta(self, complete):
+        meta = {
+            'names': self.names,
+            'time_dtype': '<f8',
+            'dtype': self.dtype.newbyteorder('<').str,
+            'rows': self.rows,
+            'complete': complete,
+        }
+        with open(os.path.join(self.path, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    def write(self, times, states):
+        """
+        Připíše část průběhu.
+
+        Parameters:
+        - times: pole časů tvaru (řádky,)
+        - states: pole stavů tvaru (řádky, látky)
+        """
+        times = np.asarray(times, dtype='<f8')
+        states = np.asarray(states)
+        self._time_file.write(times.tobytes())
+        for i, column_file in enumerate(self._column_files):
+            column_file.write(np.ascontiguousarray(states[:, i], dtype=self.dtype.newbyteorder('<')).tobytes())
+        self.rows += len(times)
+
+    def flush(self):
+        """
+        Předá zapsané části operačnímu systému (např. před uložením
+        kontrolního bodu, aby záznam po pádu programu obsahoval vše,
+        co kontrolní bod předpokládá).
+        """
+        for f in [self._time_file] + self._column_files:
+            f.flush()
+
+    def close(self):
+        for f in [self._time_file] + self._column_files:
+            f.close()
+        self._write_meta(complete=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_stream(stream, path, names, dtype=np.int64, checkpoint=None):
+    """
+    Zapíše celý výstup proudové simulace (viz simulation.simulation_stream) do souboru.
+
+    Kontrolní bod simulace v odloženém režimu (viz checkpoint.Checkpoint) se
+    ukládá až po zápisu každé části, záznam tak po pádu programu obsahuje
+    všechny řádky do času kontrolního bodu. Je-li kontrolní bod už naplněný
+    (pokračování simulace), připisuje se k existujícímu záznamu.
+
+    Returns:
+    - počet zapsaných řádků
+    """
+    resume_time = checkpoint.time if checkpoint is not None and checkpoint.started else None
+    with TrajectoryWriter(path, names, dtype, resume_time) as writer:
+        for times, states in stream:
+            writer.write(times, states)
+            if checkpoint is not None:
+                writer.flush()
+                checkpoint.commit()
+        if checkpoint is not None:
+            writer.flush()
+            checkpoint.commit(final=True)
+    return writer.rows
+
+class TrajectoryReader:
+    def __init__(self, path):
+        """
+        Čtení záznamu průběhu simulace (viz TrajectoryWriter) mapováním do paměti.
+
+        Sloupce se nenačítají, operační systém přečte jen ty části souboru,
+        ke kterým se skutečně přistupuje. Otevření je tak okamžité
+        i u záznamů větších než operační paměť. Lze číst i záznam, do kterého
+        se ještě zapisuje (počet řádků se určí z velikosti sloupců).
+
+        Parameters:
+        - path: cesta k adresáři záznamu
+        """
+        self.path = path
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        self.names = meta['names']
+        self.complete = meta['complete']
+        self.dtype = np.dtype(meta['dtype'])
+        time_dtype = np.dtype(meta['time_dtype'])
+        if self.complete:
+            rows = meta['rows']
+        else:
+            # Záznam se ještě zapisuje, platné jsou řádky zapsané do všech sloupců
+            sizes = [os.path.getsize(os.path.join(path, TIME_FILE)) // time_dtype.itemsize]
+            sizes += [os.path.getsize(os.path.join(path, _column_file(i))) // self.dtype.itemsize
+                      for i in range(len(self.names))]
+            rows = min(sizes)
+        self.times = self._map(TIME_FILE, time_dtype, rows)
+        self._columns = {name: self._map(_column_file(i), self.dtype, rows) for i, name in enumerate(self.names)}
+
+    def _map(self, filename, dtype, rows):
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, filename), dtype=dtype, mode='r', shape=(rows,))
+
+    def __len__(self):
+        return len(self.times)
+
+    def column(self, name):
+        """
+        Vrací průběh množství látky (pole mapované do paměti).
+        """
+        return self._columns[name]
+
+    @property
+    def history(self):
+        """
+        Průběh všech látek jako dict {název: pole}, ve stejném tvaru jako
+        výsledek gillespie_simulation.
+        """
+        return dict(self._columns)
+
+    def rows(self, t_start=None, t_end=None):
+        """
+        Vrací rozsah řádků se záznamy v časovém úseku [t_start, t_end]
+        (binární vyhledávání v poli časů).
+        """
+        start = 0 if t_start is None else int(np.searchsorted(self.times, t_start, side='left'))
+        end = len(self.times) if t_end is None else int(np.searchsorted(self.times, t_end, side='right'))
+        return start, end
+
+    def slice(self, t_start=None, t_end=None, species=None):
+        """
+        Vybere část záznamu podle času a látek.
+
+        Parameters:
+        - t_start, t_end: časový úsek (výchozí celý záznam)
+        - species: názvy látek (výchozí všechny)
+
+        Returns:
+        - times, history; pole jsou pohledy do mapovaného souboru
+        """
+        start, end = self.rows(t_start, t_end)
+        species = self.names if species is None else species
+        return self.times[start:end], {name: self._columns[name][start:end] for name in species}
+
+    def states(self, t_start=None, t_end=None, species=None):
+        """
+        Vybere část záznamu jako matici stavů tvaru (řádky, látky) (kopie v paměti).
+        """
+        times, history = self.slice(t_start, t_end, species)
+        if not history:
+            return np.asarray(times), np.empty((len(times), 0), dtype=self.dtype)
+        return np.asarray(times), np.column_stack(list(history.values()))